@@ -10,13 +10,29 @@ import threading
 import sys
 import os
 import time
+import atexit
+import asyncio
+import collections
+import concurrent.futures
+import errno
+import selectors
+import struct
+import ipaddress
+import json
+import multiprocessing
+import multiprocessing.connection
+import queue
+import tempfile
+from dataclasses import dataclass, asdict
+from typing import Optional
 from datetime import datetime
 
 # =============================================================================
 # EJERCICIO 1: Escaner de puertos
 # =============================================================================
 
-def scan_ports(host, start_port=1, end_port=1024):
+def scan_ports(host, start_port=1, end_port=1024, concurrency=None,
+               adaptive=False, retries=2, banner_bytes=0, rate=None, burst=None):
     """
     Escanea puertos abiertos en un host específico.
     
@@ -27,854 +43,4501 @@ def scan_ports(host, start_port=1, end_port=1024):
         host (str): Dirección del host a escanear
         start_port (int): Puerto inicial del rango
         end_port (int): Puerto final del rango
+        concurrency (int): Si se indica, usa el motor asyncio manteniendo
+            ese número de conexiones en vuelo (ver scan_ports_async)
+        adaptive (bool): Deriva el timeout del RTT medido al host (ver
+            RttEstimator) y reintenta solo los puertos que no respondieron
+        retries (int): Rondas de reintento en modo adaptativo
+        banner_bytes (int): Si es mayor que 0, lee el banner de cada puerto
+            abierto durante el mismo barrido (usa siempre el motor asyncio)
+        rate (float): Conexiones por segundo máximas (ver ScanPacer); usa
+            siempre el motor asyncio
+        burst (int): Ráfaga máxima de conexiones por encima del ritmo
+    
+    Returns:
+        list: Puertos abiertos encontrados
     """
+    if concurrency or banner_bytes or rate:
+        return scan_ports_async(host, start_port, end_port, concurrency or 500,
+                                adaptive=adaptive, retries=retries,
+                                banner_bytes=banner_bytes, rate=rate, burst=burst)
+    
     print(f"\n=== Escaneando puertos en {host} ===")
     print(f"Rango: {start_port} - {end_port}")
     
+    estimator = get_rtt_estimator(host, initial_timeout=0.1) if adaptive else None
+    
     open_ports = []
+    ports = range(start_port, end_port + 1)
+    attempt = 0
     
-    for port in range(start_port, end_port + 1):
-        try:
-            # Intentamos establecer conexión con timeout corto
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(0.1)  # 100ms timeout para acelerar el escaneo
+    while ports:
+        timed_out = []
+        # 100ms de timeout fijo para acelerar el escaneo, salvo en modo adaptativo
+        timeout = estimator.timeout_for(attempt) if estimator else 0.1
+        
+        for port in ports:
+            try:
+                state, rtt = _probe_port(host, port, timeout)
+            except socket.gaierror:
+                print(f"Error: No se pudo resolver el host {host}")
+                ports = []
+                break
             
-            result = sock.connect_ex((host, port))
+            if estimator and rtt is not None:
+                estimator.add_sample(rtt)
+                timeout = estimator.timeout_for(attempt)
             
-            if result == 0:  # Conexión exitosa
+            if state == "open":
                 open_ports.append(port)
                 print(f"Puerto {port}: ABIERTO")
-            
-            sock.close()
-            
-        except socket.gaierror:
-            print(f"Error: No se pudo resolver el host {host}")
+            elif state == "timeout":
+                timed_out.append(port)
+        
+        if not estimator or attempt >= retries or not ports:
             break
-        except Exception as e:
-            # Puerto cerrado o error de conexión
-            pass
+        
+        attempt += 1
+        ports = timed_out
+        if ports:
+            print(f"Reintentando {len(ports)} puertos sin respuesta "
+                  f"(timeout {estimator.timeout_for(attempt) * 1000:.0f} ms)")
+    
+    if estimator:
+        print(f"Timeout adaptativo para {host}: {estimator.timeout * 1000:.1f} ms "
+              f"({estimator.describe()})")
     
+    open_ports.sort()
     print(f"\nPuertos abiertos encontrados: {open_ports}")
     return open_ports
 
-# =============================================================================
-# EJERCICIO 2: Información de conexión
-# =============================================================================
-
-def connection_info(host, port):
+def _probe_port(host, port, timeout):
     """
-    Se conecta a un host y muestra información detallada de la conexión.
+    Intenta una conexión TCP bloqueante y clasifica el resultado.
     
-    Implementa el Ejercicio 2, mostrando información usando métodos
-    equivalentes a getInetAddress() y getPort() de Java.
+    Se usa la primera dirección IPv4 del host y, si no tiene ninguna, la
+    primera IPv6, así que los destinos solo IPv6 también se pueden probar.
     
     Args:
-        host (str): Host al que conectarse
-        port (int): Puerto de conexión
+        host (str): Host destino
+        port (int): Puerto destino
+        timeout (float): Tiempo límite de la conexión en segundos
+    
+    Returns:
+        tuple: (estado, rtt) donde estado es "open", "closed" o "timeout" y
+            rtt es el tiempo de ida y vuelta medido (None si no hubo respuesta)
+    
+    Raises:
+        socket.gaierror: Si el host no se puede resolver
     """
-    print(f"\n=== Información de conexión a {host}:{port} ===")
+    candidates = dns_cache.resolve(host, port, family=socket.AF_UNSPEC)
+    family, address = next((candidate for candidate in candidates
+                             if candidate[0] == socket.AF_INET), candidates[0])
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
     
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
-        
-        # Información del socket remoto
-        remote_addr = sock.getpeername()
-        print(f"Dirección remota: {remote_addr[0]}")
-        print(f"Puerto remoto: {remote_addr[1]}")
-        
-        # Información del socket local
-        local_addr = sock.getsockname()
-        print(f"Dirección local: {local_addr[0]}")
-        print(f"Puerto local: {local_addr[1]}")
-        
-        # Información adicional del socket
-        print(f"Familia de direcciones: {sock.family}")
-        print(f"Tipo de socket: {sock.type}")
-        
+        started = time.perf_counter()
+        result = sock.connect_ex(address)
+        elapsed = time.perf_counter() - started
+    except socket.gaierror:
+        raise
+    except Exception:
+        # Error de conexión no clasificable
+        return "closed", None
+    finally:
         sock.close()
-        print("Conexión cerrada exitosamente")
-        
-    except socket.error as e:
-        print(f"Error de conexión: {e}")
-
-# =============================================================================
-# EJERCICIO 3: Cliente Daytime (Recibir datos)
-# =============================================================================
+    
+    if result == 0:  # Conexión exitosa
+        return "open", elapsed
+    if result == errno.ECONNREFUSED:  # El host respondió con RST
+        return "closed", elapsed
+    if result in (errno.EAGAIN, errno.EWOULDBLOCK, errno.ETIMEDOUT):
+        return "timeout", None
+    return "closed", None
 
-def daytime_client(host, port=13):
+def scan_ports_async(host, start_port=1, end_port=1024, concurrency=500, timeout=0.1,
+                     adaptive=False, retries=2, banner_bytes=0, banner_timeout=1.0,
+                     rate=None, burst=None):
     """
-    Cliente que se conecta al servicio daytime para obtener fecha y hora.
+    Variante concurrente del escaner de puertos basada en asyncio.
     
-    Implementa el ejemplo del protocolo daytime del documento.
-    El servidor envía la fecha y hora actual cuando se establece la conexión.
+    En lugar de probar un puerto tras otro, mantiene hasta `concurrency`
+    conexiones en vuelo simultáneamente, de modo que el tiempo total depende
+    del tamaño del rango dividido por la concurrencia y no de la suma de
+    todos los timeouts. Un barrido completo 1-65535 termina en segundos.
     
     Args:
-        host (str): Servidor daytime
-        port (int): Puerto del servicio (por defecto 13)
+        host (str): Dirección del host a escanear
+        start_port (int): Puerto inicial del rango
+        end_port (int): Puerto final del rango
+        concurrency (int): Conexiones simultáneas en vuelo (ej: 500-5000)
+        timeout (float): Tiempo límite de cada intento de conexión en segundos
+            (en modo adaptativo es solo el valor inicial)
+        adaptive (bool): Deriva el timeout del RTT medido y reintenta los
+            puertos que no respondieron
+        retries (int): Rondas de reintento en modo adaptativo
+        banner_bytes (int): Bytes de banner a leer de cada puerto abierto
+            (0 = no identificar servicios)
+        banner_timeout (float): Plazo máximo de lectura de cada banner
+        rate (float): Conexiones por segundo máximas; el ritmo se reduce
+            automáticamente ante errores de congestión (ver ScanPacer)
+        burst (int): Ráfaga máxima de conexiones por encima del ritmo
+    
+    Returns:
+        list: Puertos abiertos encontrados, ordenados
     """
-    print(f"\n=== Cliente Daytime conectando a {host}:{port} ===")
+    concurrency = _clamp_concurrency(concurrency)
+    estimator = get_rtt_estimator(host, initial_timeout=timeout) if adaptive else None
+    pacer = ScanPacer(rate, burst) if rate else None
+    
+    print(f"\n=== Escaneando puertos en {host} ===")
+    print(f"Rango: {start_port} - {end_port} (concurrencia: {concurrency})")
     
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
-        
-        # Información de conexión
-        remote_addr = sock.getpeername()
-        print(f"Conectado a: {remote_addr[0]}")
-        print(f"Puerto: {remote_addr[1]}")
-        
-        # Recibir datos del servidor
-        data = sock.recv(1024).decode('ascii').strip()
-        print(f"Día y hora del servidor: {data}")
-        
-        sock.close()
-        
-    except socket.error as e:
-        print(f"Error en cliente daytime: {e}")
-
-# =============================================================================
-# EJERCICIO 4: Cliente Echo (Enviar y recibir datos)
-# =============================================================================
+        open_ports = asyncio.run(
+            _async_scan(host, range(start_port, end_port + 1), concurrency, timeout,
+                        estimator=estimator, retries=retries,
+                        banner_bytes=banner_bytes, banner_timeout=banner_timeout,
+                        pacer=pacer)
+        )
+    except socket.gaierror:
+        print(f"Error: No se pudo resolver el host {host}")
+        open_ports = []
+    
+    if estimator:
+        print(f"Timeout adaptativo para {host}: {estimator.timeout * 1000:.1f} ms "
+              f"({estimator.describe()})")
+    if pacer:
+        print(f"Ritmo de conexión: {pacer.describe()}")
+    
+    print(f"\nPuertos abiertos encontrados: {open_ports}")
+    return open_ports
 
-def echo_client(host, port=7):
+@dataclass
+class ScanResult:
     """
-    Cliente interactivo que implementa el protocolo echo.
+    Resultado del escaneo de un puerto.
     
-    El usuario puede escribir mensajes que se envían al servidor,
-    y el servidor responde con el mismo mensaje (eco).
-    Implementa el ejemplo del documento con protocolo RFC862.
+    Es la unidad que producen los iteradores de escaneo (iter_open_ports,
+    aiter_open_ports) y la que se serializa en la salida JSON Lines.
+    """
+    host: str
+    port: int
+    state: str  # "open", "closed", "timeout" o "error" (congestión local)
+    rtt: Optional[float] = None  # Segundos hasta la respuesta, si la hubo
+    banner: Optional[str] = None  # Primeros bytes enviados por el servicio
+    service: Optional[str] = None  # Servicio identificado por banner o puerto
+    
+    def to_json(self) -> str:
+        """Serializa el resultado como una línea JSON."""
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+async def _async_scan(host, ports, concurrency, timeout, estimator=None, retries=0,
+                      report=True, banner_bytes=0, banner_timeout=1.0, pacer=None):
+    """
+    Ejecuta el motor de escaneo y reúne los puertos abiertos.
     
     Args:
-        host (str): Servidor echo
-        port (int): Puerto del servicio (por defecto 7)
+        host (str): Host a escanear (se resuelve una sola vez)
+        ports: Secuencia de puertos a probar
+        concurrency (int): Número de tareas trabajadoras
+        timeout (float): Tiempo límite de cada conexión
+        estimator (RttEstimator): Estimador para el modo adaptativo
+        retries (int): Rondas de reintento de puertos sin respuesta
+        report (bool): Imprime cada puerto abierto al encontrarlo
+        banner_bytes (int): Si es mayor que 0, lee hasta esa cantidad de bytes
+            de cada puerto abierto para identificar el servicio
+        banner_timeout (float): Tiempo máximo de lectura de cada banner
+        pacer (ScanPacer): Limitador de ritmo de conexiones
+    
+    Returns:
+        list: Puertos abiertos, ordenados
     """
-    print(f"\n=== Cliente Echo conectando a {host}:{port} ===")
-    print("Escriba mensajes (escriba '.' para salir)")
+    open_ports = []
     
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
-        
-        print(f"Conectado exitosamente a {host}:{port}")
-        
-        while True:
-            # Leer entrada del usuario
-            message = input("Mensaje: ")
-            
-            if message == ".":
-                break
-            
-            # Enviar mensaje al servidor
-            sock.send((message + "\n").encode('ascii'))
-            
-            # Recibir respuesta del servidor
-            response = sock.recv(1024).decode('ascii').strip()
-            print(f"Echo del servidor: {response}")
-        
-        sock.close()
-        print("Conexión cerrada")
-        
-    except socket.error as e:
-        print(f"Error en cliente echo: {e}")
-
-# =============================================================================
-# EJERCICIOS 5-6: Servidor básico con mensaje
-# =============================================================================
+    async for result in _scan_results(host, ports, concurrency, timeout,
+                                      estimator=estimator, retries=retries,
+                                      report=report, banner_bytes=banner_bytes,
+                                      banner_timeout=banner_timeout, pacer=pacer):
+        if result.state == "open":
+            open_ports.append(result.port)
+            if report and banner_bytes:
+                detail = f" - {result.banner!r}" if result.banner else ""
+                print(f"Puerto {result.port}: ABIERTO ({result.service or 'desconocido'}){detail}")
+            elif report:
+                print(f"Puerto {result.port}: ABIERTO")
+    
+    return sorted(open_ports)
 
-def basic_server(port):
+async def _scan_results(host, ports, concurrency, timeout, estimator=None, retries=0,
+                        report=False, banner_bytes=0, banner_timeout=1.0, pacer=None):
     """
-    Servidor básico que acepta conexiones y envía un mensaje de bienvenida.
+    Motor del escaneo concurrente.
     
-    Implementa los ejercicios 5 y 6 del documento.
-    El servidor acepta conexiones, envía un mensaje y cierra la conexión.
+    Lanza un número fijo de tareas trabajadoras que consumen puertos de un
+    iterador compartido; así nunca hay más de `concurrency` sockets abiertos
+    ni se crean decenas de miles de tareas a la vez. Cada resultado se
+    entrega en cuanto se conoce, sin esperar al resto del barrido.
+    
+    Con un estimador de RTT, cada conexión usa el timeout vigente del host y
+    alimenta el estimador; al terminar la ronda se reintentan únicamente los
+    puertos que agotaron el timeout.
+    
+    Si se piden banners, la conexión de cada puerto abierto no se cierra:
+    pasa a una tarea de lectura independiente mientras el trabajador sigue
+    descubriendo puertos, de modo que identificación y descubrimiento se
+    solapan y no hace falta una segunda ronda de conexiones.
+    
+    Con un limitador de ritmo, cada conexión espera su turno en el
+    limitador y le informa si terminó en timeout o error de congestión; los
+    puertos afectados por congestión local también se reintentan.
     
     Args:
-        port (int): Puerto en el que el servidor escuchará
+        host (str): Host a escanear (se resuelve una sola vez)
+        ports: Secuencia de puertos a probar
+        concurrency (int): Número de tareas trabajadoras
+        timeout (float): Tiempo límite de cada conexión
+        estimator (RttEstimator): Estimador para el modo adaptativo
+        retries (int): Rondas de reintento de puertos sin respuesta
+        report (bool): Imprime un aviso al comenzar cada ronda de reintentos
+        banner_bytes (int): Presupuesto de bytes de banner por conexión (0 = no leer)
+        banner_timeout (float): Plazo máximo de lectura de cada banner
+        pacer (ScanPacer): Limitador de ritmo de conexiones
+    
+    Yields:
+        ScanResult: Estado final de cada puerto (los timeouts que se van a
+            reintentar no se entregan hasta la última ronda)
     """
-    print(f"\n=== Servidor básico iniciando en puerto {port} ===")
+    loop = asyncio.get_running_loop()
     
-    try:
-        # Crear socket servidor
-        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        
-        # Permitir reutilizar la dirección (evita errores de "Address already in use")
-        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Resolver el host una única vez para todo el rango (a través de la caché DNS)
+    address = (await loop.run_in_executor(None, resolve_address, host, 0))[0]
+    
+    # Limita las conexiones retenidas para leer banners (cada una ocupa un descriptor)
+    banner_slots = asyncio.Semaphore(max(1, concurrency // 4))
+    attempt = 0
+    
+    while ports:
+        final_round = not (estimator or pacer) or attempt >= retries
+        pending_ports = iter(ports)
+        timed_out = []
+        results = asyncio.Queue()
+        tasks = []
+        # Sockets entregados a grab, cada uno con una plaza de banner_slots.
+        # Una tarea cancelada antes de empezar no ejecuta su finally: lo que
+        # quede aquí al terminar la ronda se cierra y se libera abajo
+        banner_socks = set()
         
-        # Vincular el socket al puerto
-        server_sock.bind(('', port))
+        async def grab(result, sock):
+            try:
+                data = await _async_read_banner(loop, sock, banner_bytes, banner_timeout)
+                result.banner = data.decode('utf-8', errors='replace').strip() or None
+                result.service = identify_service(result.port, data)
+                results.put_nowait(result)
+            finally:
+                banner_socks.discard(sock)
+                sock.close()
+                banner_slots.release()
+                results.put_nowait(None)
         
-        # Escuchar conexiones (máximo 5 en cola)
-        server_sock.listen(5)
+        async def worker():
+            try:
+                # El iterador es compartido: cada trabajador toma el siguiente puerto libre
+                for port in pending_ports:
+                    if pacer:
+                        await pacer.acquire()
+                    
+                    probe_timeout = estimator.timeout_for(attempt) if estimator else timeout
+                    state, rtt, sock = await _async_probe_port(
+                        loop, address, port, probe_timeout, keep_open=banner_bytes > 0
+                    )
+                    
+                    if estimator and rtt is not None:
+                        estimator.add_sample(rtt)
+                    if pacer:
+                        pacer.record(congested=state in ("timeout", "error"))
+                    
+                    if sock is not None:
+                        # El banner se lee en paralelo; el trabajador sigue escaneando
+                        try:
+                            await banner_slots.acquire()
+                        except BaseException:
+                            sock.close()
+                            raise
+                        banner_socks.add(sock)
+                        tasks.append(asyncio.create_task(grab(ScanResult(host, port, state, rtt), sock)))
+                    elif state in ("timeout", "error") and not final_round:
+                        timed_out.append(port)
+                    else:
+                        results.put_nowait(ScanResult(host, port, state, rtt))
+            finally:
+                # Marca de fin de este trabajador
+                results.put_nowait(None)
         
-        print(f"Servidor atendiendo en el puerto {port}")
-        print("Presione Ctrl+C para detener el servidor")
+        tasks.extend(asyncio.create_task(worker())
+                     for _ in range(max(1, min(concurrency, len(ports)))))
         
-        while True:
-            try:
-                # Aceptar conexión entrante
-                client_sock, client_addr = server_sock.accept()
-                
-                print(f"Nueva conexión desde {client_addr[0]}:{client_addr[1]}")
-                
-                # Enviar mensaje de bienvenida
-                welcome_msg = f"Se ha conectado al socket servidor en puerto {port}\n"
-                welcome_msg += f"Hora de conexión: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                
-                client_sock.send(welcome_msg.encode('ascii'))
-                
-                # Cerrar conexión con el cliente
-                client_sock.close()
-                print(f"Conexión con {client_addr[0]}:{client_addr[1]} cerrada")
-                
-            except KeyboardInterrupt:
-                print("\nDeteniendo servidor...")
-                break
-            except socket.error as e:
-                print(f"Error en conexión: {e}")
+        try:
+            # Cada tarea (trabajador o lectura de banner) deja una marca al terminar
+            finished = 0
+            while finished < len(tasks):
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                else:
+                    yield result
+            # Propagar cualquier excepción inesperada de las tareas
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for sock in banner_socks:
+                sock.close()
+                banner_slots.release()
         
-        server_sock.close()
+        if final_round:
+            break
         
-    except socket.error as e:
-        print(f"Error del servidor: {e}")
+        attempt += 1
+        ports = timed_out
+        if ports and report:
+            retry_timeout = estimator.timeout_for(attempt) if estimator else timeout
+            print(f"Reintentando {len(ports)} puertos sin respuesta "
+                  f"(timeout {retry_timeout * 1000:.0f} ms)")
 
-def basic_client(host, port):
+async def aiter_open_ports(host, start_port=1, end_port=1024, concurrency=500,
+                           timeout=0.1, adaptive=False, retries=2,
+                           banner_bytes=0, banner_timeout=1.0, rate=None, burst=None):
     """
-    Cliente que se conecta al servidor básico y muestra el mensaje recibido.
+    Iterador asíncrono que entrega los puertos abiertos a medida que aparecen.
     
-    Complementa el ejercicio 6, actuando como cliente del servidor básico.
+    A diferencia de scan_ports, no acumula resultados ni imprime nada: cada
+    puerto abierto se entrega apenas se establece la conexión, de modo que el
+    consumidor puede empezar a trabajar (banners, alertas) durante el barrido.
     
     Args:
-        host (str): Dirección del servidor
-        port (int): Puerto del servidor
+        host (str): Dirección del host a escanear
+        start_port (int): Puerto inicial del rango
+        end_port (int): Puerto final del rango
+        concurrency (int): Conexiones simultáneas en vuelo
+        timeout (float): Tiempo límite de cada conexión en segundos
+        adaptive (bool): Usa timeouts adaptativos (ver RttEstimator)
+        retries (int): Rondas de reintento en modo adaptativo
+        banner_bytes (int): Bytes de banner a leer de cada puerto abierto;
+            el resultado se entrega con `banner` y `service` completados
+        banner_timeout (float): Plazo máximo de lectura de cada banner
+        rate (float): Conexiones por segundo máximas (ver ScanPacer)
+        burst (int): Ráfaga máxima de conexiones por encima del ritmo
+    
+    Yields:
+        ScanResult: Un resultado por cada puerto abierto
+    
+    Raises:
+        socket.gaierror: Si el host no se puede resolver
     """
-    print(f"\n=== Cliente básico conectando a {host}:{port} ===")
+    concurrency = _clamp_concurrency(concurrency)
+    estimator = get_rtt_estimator(host, initial_timeout=timeout) if adaptive else None
+    pacer = ScanPacer(rate, burst) if rate else None
     
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
-        
-        # Recibir mensaje del servidor
-        data = sock.recv(1024).decode('ascii')
-        print("Mensaje del servidor:")
-        print(data)
-        
-        sock.close()
-        
-    except socket.error as e:
-        print(f"Error del cliente básico: {e}")
-
-# =============================================================================
-# EJERCICIO 7: Sistema de mensajería
-# =============================================================================
+    async for result in _scan_results(host, range(start_port, end_port + 1),
+                                      concurrency, timeout,
+                                      estimator=estimator, retries=retries,
+                                      banner_bytes=banner_bytes,
+                                      banner_timeout=banner_timeout, pacer=pacer):
+        if result.state == "open":
+            yield result
 
-class MessageServer:
+def iter_open_ports(host, start_port=1, end_port=1024, concurrency=500,
+                    timeout=0.1, adaptive=False, retries=2,
+                    banner_bytes=0, banner_timeout=1.0, rate=None, burst=None):
     """
-    Servidor de mensajería que permite comunicación entre múltiples clientes.
+    Generador síncrono equivalente a aiter_open_ports.
     
-    Implementa el Ejercicio 7 del documento.
-    Los clientes pueden enviar mensajes que se retransmiten a otros clientes conectados.
+    El escaneo se ejecuta en un bucle de eventos propio dentro de un hilo de
+    fondo, así que avanza mientras el consumidor procesa cada resultado. Si
+    el consumidor deja de iterar, el escaneo se cancela.
+    
+    Args:
+        Los mismos que aiter_open_ports.
+    
+    Yields:
+        ScanResult: Un resultado por cada puerto abierto
+    
+    Raises:
+        socket.gaierror: Si el host no se puede resolver
     """
+    results = queue.Queue()
+    finished = object()
+    loop = asyncio.new_event_loop()
     
-    def __init__(self, port):
-        self.port = port
-        self.clients = []  # Lista de sockets de clientes conectados
-        self.running = True
-        self.lock = threading.Lock()  # Para acceso seguro a la lista de clientes
+    async def produce():
+        async for result in aiter_open_ports(host, start_port, end_port, concurrency,
+                                             timeout, adaptive, retries,
+                                             banner_bytes, banner_timeout, rate, burst):
+            results.put(result)
     
-    def handle_client(self, client_sock, client_addr):
-        """
-        Maneja la comunicación con un cliente específico.
-        
-        Args:
-            client_sock: Socket del cliente
-            client_addr: Dirección del cliente
-        """
-        print(f"Cliente {client_addr[0]}:{client_addr[1]} conectado")
-        
-        # Enviar mensaje de bienvenida
-        welcome = f"Bienvenido al servidor de mensajería\nClientes conectados: {len(self.clients)}\n"
-        welcome += "Comandos disponibles:\n"
-        welcome += "  /list - Ver clientes conectados\n"
-        welcome += "  /quit - Desconectarse\n"
-        welcome += "  Cualquier otro texto se enviará como mensaje\n\n"
-        
+    main_task = loop.create_task(produce())
+    
+    def run_loop():
         try:
-            client_sock.send(welcome.encode('utf-8'))
-            
-            while self.running:
-                # Recibir mensaje del cliente
-                data = client_sock.recv(1024)
-                if not data:
-                    break
-                
-                message = data.decode('utf-8').strip()
-                
-                if message == "/quit":
-                    break
-                elif message == "/list":
-                    client_list = f"Clientes conectados: {len(self.clients)}\n"
-                    client_sock.send(client_list.encode('utf-8'))
-                else:
-                    # Retransmitir mensaje a todos los otros clientes
-                    full_message = f"[{client_addr[0]}:{client_addr[1]}]: {message}\n"
-                    self.broadcast_message(full_message, exclude=client_sock)
-        
-        except socket.error as e:
-            print(f"Error con cliente {client_addr[0]}:{client_addr[1]}: {e}")
-        
+            loop.run_until_complete(main_task)
+        except asyncio.CancelledError:
+            pass
+        except BaseException as e:
+            results.put(e)
         finally:
-            # Remover cliente de la lista
-            with self.lock:
-                if client_sock in self.clients:
-                    self.clients.remove(client_sock)
-            
-            client_sock.close()
-            print(f"Cliente {client_addr[0]}:{client_addr[1]} desconectado")
+            loop.close()
+            results.put(finished)
     
-    def broadcast_message(self, message, exclude=None):
-        """
-        Envía un mensaje a todos los clientes conectados.
-        
-        Args:
-            message (str): Mensaje a enviar
-            exclude: Socket a excluir del broadcast (generalmente el remitente)
-        """
-        with self.lock:
-            clients_to_remove = []
-            
-            for client in self.clients:
-                if client != exclude:
-                    try:
-                        client.send(message.encode('utf-8'))
-                    except socket.error:
-                        # Cliente desconectado, marcar para eliminación
-                        clients_to_remove.append(client)
-            
-            # Remover clientes desconectados
-            for client in clients_to_remove:
-                self.clients.remove(client)
+    producer = threading.Thread(target=run_loop)
+    producer.daemon = True
+    producer.start()
     
-    def start(self):
-        """Inicia el servidor de mensajería."""
+    try:
+        while True:
+            item = results.get()
+            if item is finished:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        if producer.is_alive():
+            try:
+                loop.call_soon_threadsafe(main_task.cancel)
+            except RuntimeError:
+                # El bucle ya terminó por su cuenta
+                pass
+
+async def _async_probe_port(loop, address, port, timeout, keep_open=False):
+    """
+    Intenta una conexión TCP no bloqueante a un puerto.
+    
+    Args:
+        keep_open (bool): Si la conexión se establece, devuelve el socket
+            abierto en lugar de cerrarlo (el llamador debe cerrarlo)
+    
+    Returns:
+        tuple: (estado, rtt, socket) donde estado es "open", "closed" o
+            "timeout", rtt es el tiempo de ida y vuelta medido (None si no hubo
+            respuesta) y socket es la conexión abierta o None
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    started = loop.time()
+    
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+        rtt = loop.time() - started
+        if keep_open:
+            opened, sock = sock, None
+            return "open", rtt, opened
+        return "open", rtt, None
+    except ConnectionRefusedError:
+        # El host respondió con RST: es una muestra de RTT válida
+        return "closed", loop.time() - started, None
+    except asyncio.TimeoutError:
+        return "timeout", None, None
+    except OSError as e:
+        if e.errno in CONGESTION_ERRNOS:
+            # Fallo local por saturación (puertos efímeros, buffers, conntrack)
+            return "error", None, None
+        # Host inalcanzable u otro error de conexión
+        return "closed", None, None
+    finally:
+        if sock is not None:
+            sock.close()
+
+async def _async_read_banner(loop, sock, max_bytes, deadline):
+    """
+    Lee los primeros bytes que envía un servicio tras la conexión.
+    
+    La lectura termina al alcanzar `max_bytes`, al cerrar el servidor la
+    conexión o al vencer el plazo `deadline`, lo que ocurra primero. Muchos
+    servicios (HTTP, por ejemplo) no envían nada hasta recibir una petición;
+    en ese caso se devuelve lo leído hasta el plazo, posiblemente vacío.
+    
+    Args:
+        loop: Bucle de eventos en ejecución
+        sock: Socket conectado en modo no bloqueante
+        max_bytes (int): Presupuesto máximo de bytes a leer
+        deadline (float): Tiempo máximo total de lectura en segundos
+    
+    Returns:
+        bytes: Datos recibidos
+    """
+    data = bytearray()
+    end = loop.time() + deadline
+    
+    while len(data) < max_bytes:
+        remaining = end - loop.time()
+        if remaining <= 0:
+            break
         try:
-            server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            server_sock.bind(('', self.port))
-            server_sock.listen(10)
-            
-            print(f"Servidor de mensajería iniciado en puerto {self.port}")
-            print("Presione Ctrl+C para detener")
-            
-            while self.running:
-                try:
-                    client_sock, client_addr = server_sock.accept()
-                    
-                    # Agregar cliente a la lista
-                    with self.lock:
-                        self.clients.append(client_sock)
-                    
-                    # Crear hilo para manejar el cliente
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_sock, client_addr)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                
-                except KeyboardInterrupt:
-                    print("\nDeteniendo servidor de mensajería...")
-                    self.running = False
-                    break
-            
-            server_sock.close()
-            
-        except socket.error as e:
-            print(f"Error del servidor de mensajería: {e}")
+            chunk = await asyncio.wait_for(loop.sock_recv(sock, max_bytes - len(data)),
+                                           remaining)
+        except (asyncio.TimeoutError, OSError):
+            break
+        if not chunk:
+            break
+        data += chunk
+        # Los protocolos de texto suelen enviar el saludo en una sola línea
+        if b"\n" in chunk:
+            break
+    
+    return bytes(data)
+
+# Firmas de banners conocidos: (prefijo, servicio)
+BANNER_SIGNATURES = [
+    (b"SSH-", "ssh"),
+    (b"HTTP/", "http"),
+    (b"+OK", "pop3"),
+    (b"* OK", "imap"),
+    (b"RFB ", "vnc"),
+    (b"AMQP", "amqp"),
+    (b"-ERR", "redis"),
+]
 
-def message_client(host, port):
+def identify_service(port, banner):
     """
-    Cliente para el sistema de mensajería.
+    Identifica el servicio de un puerto a partir de su banner.
     
-    Permite al usuario enviar y recibir mensajes en tiempo real.
+    Primero se comparan los primeros bytes con firmas conocidas; si no hay
+    coincidencia se recurre al nombre registrado para el puerto en el sistema
+    (equivalente a /etc/services).
     
     Args:
-        host (str): Dirección del servidor
-        port (int): Puerto del servidor
+        port (int): Puerto del servicio
+        banner (bytes): Primeros bytes recibidos (puede estar vacío)
+    
+    Returns:
+        str: Nombre del servicio o None si no se pudo identificar
     """
-    print(f"\n=== Cliente de mensajería conectando a {host}:{port} ===")
+    for prefix, service in BANNER_SIGNATURES:
+        if banner.startswith(prefix):
+            return service
+    
+    if banner.startswith(b"220"):
+        # FTP y SMTP comparten el código de saludo 220
+        upper = banner.upper()
+        if b"FTP" in upper:
+            return "ftp"
+        if b"SMTP" in upper or b"MAIL" in upper:
+            return "smtp"
+        return "ftp/smtp"
+    
+    # Saludo inicial de MySQL: longitud (3 bytes), secuencia 0 y versión 10
+    if len(banner) > 4 and banner[3] == 0 and banner[4] == 10:
+        return "mysql"
     
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
+        return socket.getservbyport(port, "tcp")
+    except (OSError, OverflowError):
+        return None
+
+class ScanCache:
+    """
+    Caché en disco de resultados de escaneo por host y puerto.
+    
+    Guarda el último estado conocido de cada puerto junto con el momento en
+    que se comprobó. Un resultado deja de ser válido cuando supera el TTL;
+    los puertos abiertos se consideran siempre a verificar, porque son los
+    que interesa vigilar. El archivo es JSON y se reescribe de forma atómica.
+    """
+    
+    def __init__(self, path="scan_cache.json", ttl=3600):
+        """
+        Args:
+            path (str): Archivo donde se persiste la caché
+            ttl (float): Segundos durante los que un resultado se considera vigente
+        """
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}  # host -> {puerto (str): [estado, momento de la comprobación]}
         
-        # Función para recibir mensajes en un hilo separado
-        def receive_messages():
-            while True:
-                try:
-                    data = sock.recv(1024)
-                    if not data:
-                        break
-                    print(data.decode('utf-8'), end='')
-                except socket.error:
-                    break
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Aviso: caché de escaneo ilegible ({e}), se empieza de cero")
+    
+    def get(self, host, port):
+        """
+        Devuelve el estado en caché de un puerto.
         
-        # Iniciar hilo receptor
-        receive_thread = threading.Thread(target=receive_messages)
-        receive_thread.daemon = True
-        receive_thread.start()
+        Returns:
+            tuple: (estado, momento) o None si el puerto no está en caché
+        """
+        entry = self.entries.get(host, {}).get(str(port))
+        return tuple(entry) if entry else None
+    
+    def update(self, host, port, state, checked=None):
+        """Registra el estado de un puerto comprobado en el momento `checked`."""
+        checked = time.time() if checked is None else checked
+        self.entries.setdefault(host, {})[str(port)] = [state, checked]
+    
+    def open_ports(self, host):
+        """Puertos registrados como abiertos para un host, ordenados."""
+        return sorted(int(port) for port, (state, _) in self.entries.get(host, {}).items()
+                      if state == "open")
+    
+    def ports_to_rescan(self, host, ports, now=None):
+        """
+        Filtra los puertos que deben volver a escanearse.
         
-        # Bucle principal para enviar mensajes
-        print("Conectado al servidor de mensajería")
-        print("Escriba sus mensajes (Ctrl+C para salir):")
+        Son los que no están en caché, los que vencieron y los que estaban
+        abiertos la última vez.
         
-        while True:
+        Args:
+            host (str): Host escaneado
+            ports: Puertos candidatos
+            now (float): Momento de referencia (por defecto, ahora)
+        
+        Returns:
+            list: Puertos a escanear
+        """
+        now = now or time.time()
+        cached = self.entries.get(host, {})
+        rescan = []
+        
+        for port in ports:
+            entry = cached.get(str(port))
+            if entry is None or entry[0] == "open" or now - entry[1] > self.ttl:
+                rescan.append(port)
+        
+        return rescan
+    
+    def save(self):
+        """
+        Escribe la caché en disco (archivo temporal + reemplazo atómico).
+        
+        El archivo temporal tiene un nombre único en el mismo directorio, de
+        modo que dos escaneos simultáneos no se pisan el uno al otro.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory,
+                                         prefix=os.path.basename(self.path) + ".",
+                                         suffix=".tmp", delete=False) as f:
+            temp_path = f.name
             try:
-                message = input()
-                if message:
-                    sock.send((message + "\n").encode('utf-8'))
-                    if message == "/quit":
-                        break
-            except KeyboardInterrupt:
-                sock.send("/quit\n".encode('utf-8'))
-                break
+                json.dump(self.entries, f, separators=(",", ":"))
+            except BaseException:
+                f.close()
+                os.unlink(temp_path)
+                raise
+        try:
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+def incremental_scan(host, start_port=1, end_port=1024, cache_path="scan_cache.json",
+                     ttl=3600, concurrency=500, timeout=0.1, adaptive=False, retries=2,
+                     rate=None, burst=None, cache=None):
+    """
+    Escaneo incremental apoyado en ScanCache.
+    
+    Solo se vuelven a probar los puertos sin resultado vigente en caché y los
+    que estaban abiertos; el resto conserva el estado guardado. En lugar de
+    la lista completa se reportan las diferencias con el escaneo anterior.
+    Solo "open" y "closed" quedan vigentes durante el TTL: un timeout se
+    guarda ya vencido y un error (congestión local, no una respuesta del
+    puerto) no se guarda, así que ambos se vuelven a probar en la próxima
+    ejecución.
+    
+    Args:
+        host (str): Dirección del host a escanear
+        start_port (int): Puerto inicial del rango
+        end_port (int): Puerto final del rango
+        cache_path (str): Archivo de la caché
+        ttl (float): Vigencia de cada resultado en segundos
+        concurrency (int): Conexiones simultáneas en vuelo
+        timeout (float): Tiempo límite de cada conexión en segundos
+        adaptive (bool): Usa timeouts adaptativos (ver RttEstimator)
+        retries (int): Rondas de reintento en modo adaptativo
+        rate (float): Conexiones por segundo máximas (ver ScanPacer)
+        burst (int): Ráfaga máxima de conexiones
+        cache (ScanCache): Caché ya cargada, para escanear varios hosts con
+            una sola lectura y escritura del archivo; en ese caso se ignoran
+            `cache_path` y `ttl` y guardarla queda a cargo del llamador
+    
+    Returns:
+        dict: {"opened": puertos nuevos abiertos, "closed": puertos que
+            dejaron de estar abiertos, "open": puertos abiertos actuales,
+            "scanned": cantidad de puertos escaneados}
+    """
+    owns_cache = cache is None
+    if owns_cache:
+        cache = ScanCache(cache_path, ttl)
+    ports = range(start_port, end_port + 1)
+    previously_open = set(cache.open_ports(host))
+    to_scan = cache.ports_to_rescan(host, ports)
+    
+    print(f"\n=== Escaneo incremental de {host} ===")
+    print(f"Rango: {start_port} - {end_port}, a escanear: {len(to_scan)} "
+          f"(en caché vigente: {len(ports) - len(to_scan)})")
+    
+    concurrency = _clamp_concurrency(concurrency)
+    estimator = get_rtt_estimator(host, initial_timeout=timeout) if adaptive else None
+    pacer = ScanPacer(rate, burst) if rate else None
+    
+    async def collect():
+        return [result async for result in _scan_results(
+            host, to_scan, concurrency, timeout, estimator=estimator,
+            retries=retries, pacer=pacer
+        )]
+    
+    try:
+        results = asyncio.run(collect()) if to_scan else []
+    except socket.gaierror:
+        print(f"Error: No se pudo resolver el host {host}")
+        return {"opened": [], "closed": [], "open": sorted(previously_open), "scanned": 0}
+    
+    now = time.time()
+    for result in results:
+        if result.state == "error":
+            # Congestión local: no dice nada del puerto, se conserva lo anterior
+            continue
+        # Un timeout no es definitivo: se registra como ya vencido
+        cache.update(host, result.port, result.state,
+                     now if result.state in ("open", "closed") else 0.0)
+    if owns_cache:
+        cache.save()
+    
+    in_range = set(ports)
+    current_open = set(cache.open_ports(host)) & in_range
+    opened = sorted(current_open - previously_open)
+    closed = sorted((previously_open & in_range) - current_open)
+    
+    for port in opened:
+        print(f"+ Puerto {port}: ABIERTO (nuevo)")
+    for port in closed:
+        print(f"- Puerto {port}: CERRADO (antes abierto)")
+    if not opened and not closed:
+        print("Sin cambios respecto al escaneo anterior")
+    
+    print(f"\nPuertos abiertos actuales: {sorted(current_open)}")
+    return {"opened": opened, "closed": closed, "open": sorted(current_open),
+            "scanned": len(to_scan)}
+
+def expand_targets(specs):
+    """
+    Expande una lista de objetivos de escaneo a hosts individuales.
+    
+    Cada elemento puede ser un nombre de host, una dirección IP, una red en
+    notación CIDR (ej: 192.168.0.0/22), varios objetivos separados por comas
+    o @archivo con un objetivo por línea. Los duplicados se eliminan
+    conservando el orden.
+    
+    Args:
+        specs (list): Objetivos tal como los escribe el usuario
+    
+    Returns:
+        list: Hosts a escanear
+    
+    Raises:
+        ValueError: Si una red CIDR no es válida
+    """
+    hosts = []
+    seen = set()
+    
+    for spec in specs:
+        for item in spec.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            
+            if item.startswith("@"):
+                with open(item[1:], encoding="utf-8") as f:
+                    lines = [line.split("#", 1)[0].strip() for line in f]
+                expanded = expand_targets([line for line in lines if line])
+            elif "/" in item:
+                network = ipaddress.ip_network(item, strict=False)
+                if network.num_addresses == 1:
+                    expanded = [str(network.network_address)]
+                else:
+                    expanded = [str(address) for address in network.hosts()]
+            else:
+                expanded = [item]
+            
+            for host in expanded:
+                if host not in seen:
+                    seen.add(host)
+                    hosts.append(host)
+    
+    return hosts
+
+def scan_hosts(targets, start_port=1, end_port=1024, concurrency=500, processes=None,
+               timeout=0.1, adaptive=False, retries=2, jsonl=False, banner_bytes=0,
+               rate=None, burst=None):
+    """
+    Escanea varios hosts repartiendo el trabajo en un pool de procesos.
+    
+    Los hosts se dividen en lotes; cada proceso del pool ejecuta su propio
+    bucle de eventos asyncio y escanea concurrentemente todos los hosts de su
+    lote. Así un barrido de una red /22 usa todos los núcleos en lugar de un
+    único hilo limitado por el GIL. Los resultados se imprimen a medida que
+    cada lote termina, formando un único reporte continuo.
+    
+    Args:
+        targets (list): Objetivos (hosts, IPs, redes CIDR, listas o @archivo)
+        start_port (int): Puerto inicial del rango
+        end_port (int): Puerto final del rango
+        concurrency (int): Conexiones simultáneas en vuelo por proceso
+        processes (int): Tamaño del pool (por defecto, número de CPUs)
+        timeout (float): Tiempo límite de cada conexión en segundos
+        adaptive (bool): Usa timeouts adaptativos por host (ver RttEstimator)
+        retries (int): Rondas de reintento en modo adaptativo
+        jsonl (bool): Emite cada puerto abierto como una línea JSON en la
+            salida estándar; los mensajes informativos van a stderr
+        banner_bytes (int): Bytes de banner a leer de cada puerto abierto
+        rate (float): Conexiones por segundo máximas en total; se reparte a
+            partes iguales entre los procesos (ver ScanPacer)
+        burst (int): Ráfaga máxima de conexiones en total
+    
+    Returns:
+        dict: Puertos abiertos por host (solo hosts resueltos correctamente)
+    """
+    hosts = expand_targets(targets)
+    processes = processes or os.cpu_count() or 1
+    processes = max(1, min(processes, len(hosts)))
+    info = sys.stderr if jsonl else sys.stdout
+    
+    print(f"\n=== Escaneando {len(hosts)} hosts ===", file=info)
+    print(f"Rango: {start_port} - {end_port} "
+          f"(procesos: {processes}, concurrencia por proceso: {concurrency})", file=info)
+    
+    if not hosts:
+        return {}
+    
+    # Lotes pequeños (varios por proceso) para equilibrar la carga y
+    # poder reportar resultados antes de que termine todo el barrido
+    chunk_size = max(1, len(hosts) // (processes * 4))
+    tasks = [
+        (hosts[i:i + chunk_size], start_port, end_port, concurrency, timeout,
+         adaptive, retries, banner_bytes,
+         rate / processes if rate else None,
+         max(1, burst // processes) if burst else None)
+        for i in range(0, len(hosts), chunk_size)
+    ]
+    
+    results = {}
+    started = time.time()
+    
+    pool = multiprocessing.Pool(processes)
+    try:
+        for chunk_results in pool.imap_unordered(_scan_hosts_worker, tasks):
+            for host, open_results, error in chunk_results:
+                if error:
+                    print(f"{host}: ERROR ({error})", file=info)
+                    continue
+                results[host] = [result.port for result in open_results]
+                if jsonl:
+                    for result in open_results:
+                        print(result.to_json(), flush=True)
+                elif open_results:
+                    print(f"{host}: puertos abiertos {results[host]}")
+                    for result in open_results:
+                        if result.service or result.banner:
+                            print(f"  {result.port}: {result.service or 'desconocido'}"
+                                  + (f" - {result.banner!r}" if result.banner else ""))
+        pool.close()
+    except KeyboardInterrupt:
+        print("\nEscaneo interrumpido por el usuario", file=info)
+        pool.terminate()
+    except BaseException:
+        # join() exige un pool cerrado o terminado
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    
+    hosts_with_ports = sum(1 for ports in results.values() if ports)
+    print(f"\nHosts escaneados: {len(results)}/{len(hosts)}, "
+          f"con puertos abiertos: {hosts_with_ports}, "
+          f"tiempo: {time.time() - started:.2f} s", file=info)
+    return results
+
+def _scan_hosts_worker(task):
+    """
+    Punto de entrada de cada proceso del pool de scan_hosts.
+    
+    Args:
+        task (tuple): (hosts, puerto inicial, puerto final, concurrencia,
+            timeout, adaptativo, reintentos, bytes de banner, ritmo, ráfaga)
+    
+    Returns:
+        list: Tuplas (host, lista de ScanResult abiertos, error o None)
+    """
+    (hosts, start_port, end_port, concurrency, timeout, adaptive, retries,
+     banner_bytes, rate, burst) = task
+    concurrency = _clamp_concurrency(concurrency)
+    
+    async def scan_chunk():
+        # La concurrencia del proceso se reparte entre los hosts del lote;
+        # el limitador de ritmo es uno solo para todo el proceso
+        per_host = max(1, concurrency // len(hosts))
+        pacer = ScanPacer(rate, burst) if rate else None
         
-        sock.close()
+        async def scan_one(host):
+            estimator = get_rtt_estimator(host, initial_timeout=timeout) if adaptive else None
+            try:
+                open_results = [
+                    result async for result in _scan_results(
+                        host, range(start_port, end_port + 1), per_host, timeout,
+                        estimator=estimator, retries=retries, banner_bytes=banner_bytes,
+                        pacer=pacer
+                    )
+                    if result.state == "open"
+                ]
+                open_results.sort(key=lambda result: result.port)
+                return host, open_results, None
+            except socket.gaierror:
+                return host, [], "no se pudo resolver el host"
+            except OSError as e:
+                return host, [], str(e)
         
-    except socket.error as e:
-        print(f"Error del cliente de mensajería: {e}")
+        return await asyncio.gather(*(scan_one(host) for host in hosts))
+    
+    try:
+        return asyncio.run(scan_chunk())
+    except KeyboardInterrupt:
+        return []
 
-# =============================================================================
-# EJERCICIO 8: Sistema de transferencia de archivos
-# =============================================================================
+# Errores que indican saturación local o del camino, no un puerto cerrado
+CONGESTION_ERRNOS = {
+    errno.EAGAIN,
+    errno.ECONNRESET,
+    errno.ENOBUFS,
+    errno.EADDRNOTAVAIL,
+}
 
-class FileTransferServer:
+class ScanPacer:
     """
-    Servidor para transferencia de archivos entre clientes.
+    Limitador de ritmo de conexiones con retroceso automático.
     
-    Implementa el Ejercicio 8 del documento.
-    Los clientes pueden listar archivos disponibles y descargarlos.
+    Implementa un cubo de fichas (token bucket) en su forma GCRA: admite
+    ráfagas de hasta `burst` conexiones y, en promedio, no más de `rate`
+    conexiones por segundo. Cada turno se reserva de forma síncrona, así que
+    muchas tareas pueden esperar a la vez sin necesidad de un lock.
+    
+    Además ajusta el ritmo al estilo AIMD de TCP: cada `window` conexiones
+    compara la proporción de timeouts y errores de congestión (EAGAIN,
+    ECONNRESET...) con su media histórica. Si la proporción sube, reduce el
+    ritmo a la mitad; si no, lo vuelve a subir poco a poco hasta el máximo
+    configurado. Así el escaneo se estabiliza en el ritmo más rápido que el
+    camino (tablas conntrack, IDS) puede sostener.
     """
     
-    def __init__(self, port, shared_directory="shared_files"):
-        self.port = port
-        self.shared_directory = shared_directory
-        self.running = True
+    def __init__(self, rate, burst=None, min_rate=None, window=100, threshold=0.1):
+        """
+        Args:
+            rate (float): Conexiones por segundo máximas
+            burst (int): Ráfaga máxima (por defecto, una décima de segundo de ritmo)
+            min_rate (float): Ritmo mínimo al retroceder (por defecto rate / 64)
+            window (int): Conexiones por ventana de evaluación
+            threshold (float): Aumento de la proporción de errores que provoca
+                un retroceso
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst if burst else rate / 10))
+        self.min_rate = float(min_rate) if min_rate else max(1.0, rate / 64)
+        self.window = window
+        self.threshold = threshold
         
-        # Crear directorio compartido si no existe
-        if not os.path.exists(shared_directory):
-            os.makedirs(shared_directory)
-            print(f"Directorio compartido creado: {shared_directory}")
+        self.backoffs = 0
+        self._tat = 0.0  # Tiempo teórico de llegada (GCRA)
+        self._window_total = 0
+        self._window_errors = 0
+        self._baseline = None  # Media móvil de la proporción de errores
     
-    def handle_client(self, client_sock, client_addr):
+    async def acquire(self):
+        """Espera hasta que haya ficha disponible para una nueva conexión."""
+        interval = 1.0 / self.rate
+        now = time.monotonic()
+        
+        # Reservar el turno antes de dormir: cada llamada obtiene un turno distinto
+        self._tat = max(self._tat, now) + interval
+        delay = self._tat - (self.burst * interval) - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def record(self, congested):
         """
-        Maneja las solicitudes de transferencia de archivos de un cliente.
+        Registra el resultado de una conexión y ajusta el ritmo por ventanas.
         
         Args:
-            client_sock: Socket del cliente
-            client_addr: Dirección del cliente
+            congested (bool): True si terminó en timeout o error de congestión
         """
-        print(f"Cliente de archivos {client_addr[0]}:{client_addr[1]} conectado")
+        self._window_total += 1
+        if congested:
+            self._window_errors += 1
         
-        try:
-            # Enviar menú de comandos
-            menu = "=== Servidor de Transferencia de Archivos ===\n"
-            menu += "Comandos disponibles:\n"
-            menu += "  LIST - Listar archivos disponibles\n"
-            menu += "  GET <filename> - Descargar archivo\n"
-            menu += "  QUIT - Desconectarse\n\n"
-            
-            client_sock.send(menu.encode('utf-8'))
-            
-            while self.running:
-                # Recibir comando del cliente
-                data = client_sock.recv(1024)
-                if not data:
-                    break
-                
-                command = data.decode('utf-8').strip().upper()
-                
-                if command == "QUIT":
-                    break
-                elif command == "LIST":
-                    self.send_file_list(client_sock)
-                elif command.startswith("GET "):
-                    filename = command[4:].strip()
-                    self.send_file(client_sock, filename)
-                else:
-                    error_msg = "Comando no reconocido. Use LIST, GET <filename>, o QUIT\n"
-                    client_sock.send(error_msg.encode('utf-8'))
+        if self._window_total < self.window:
+            return
         
-        except socket.error as e:
-            print(f"Error con cliente de archivos {client_addr[0]}:{client_addr[1]}: {e}")
+        error_rate = self._window_errors / self._window_total
+        self._window_total = 0
+        self._window_errors = 0
         
-        finally:
-            client_sock.close()
-            print(f"Cliente de archivos {client_addr[0]}:{client_addr[1]} desconectado")
+        if self._baseline is not None and error_rate > self._baseline + self.threshold:
+            # Retroceso multiplicativo
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.backoffs += 1
+        else:
+            # Aumento aditivo hasta el ritmo configurado
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+        
+        if self._baseline is None:
+            self._baseline = error_rate
+        else:
+            self._baseline = 0.75 * self._baseline + 0.25 * error_rate
     
-    def send_file_list(self, client_sock):
+    def describe(self):
+        """Resumen legible del estado del limitador."""
+        return (f"{self.rate:.0f}/{self.max_rate:.0f} conexiones/s, "
+                f"ráfaga {self.burst}, retrocesos: {self.backoffs}")
+
+class RttEstimator:
+    """
+    Estimador de tiempo de ida y vuelta (RTT) por host.
+    
+    Sigue el cálculo del RTO de TCP (RFC 6298): mantiene un RTT suavizado
+    (SRTT) y su variación (RTTVAR), y propone como timeout
+    SRTT + 4 * RTTVAR acotado entre un mínimo y un máximo. Así los timeouts
+    son cortos en loopback y suficientemente largos a través de una WAN.
+    """
+    
+    ALPHA = 1 / 8  # Peso de cada muestra nueva en SRTT
+    BETA = 1 / 4   # Peso de cada muestra nueva en RTTVAR
+    K = 4          # Multiplicador de la variación
+    
+    def __init__(self, initial_timeout=1.0, min_timeout=0.005, max_timeout=5.0):
         """
-        Envía la lista de archivos disponibles al cliente.
-        
         Args:
-            client_sock: Socket del cliente
+            initial_timeout (float): Timeout a usar antes de tener muestras
+            min_timeout (float): Cota inferior del timeout derivado
+            max_timeout (float): Cota superior del timeout (también con backoff)
         """
-        try:
-            files = os.listdir(self.shared_directory)
-            
-            if not files:
-                response = "No hay archivos disponibles\n"
-            else:
-                response = "Archivos disponibles:\n"
-                for i, filename in enumerate(files, 1):
-                    file_path = os.path.join(self.shared_directory, filename)
-                    file_size = os.path.getsize(file_path)
-                    response += f"  {i}. {filename} ({file_size} bytes)\n"
-            
-            response += "\n"
-            client_sock.send(response.encode('utf-8'))
-            
-        except Exception as e:
-            error_msg = f"Error al listar archivos: {e}\n"
-            client_sock.send(error_msg.encode('utf-8'))
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.lock = threading.Lock()
     
-    def send_file(self, client_sock, filename):
+    def add_sample(self, rtt):
         """
-        Envía un archivo específico al cliente.
+        Incorpora una medición de RTT (conexión aceptada o rechazada).
         
         Args:
-            client_sock: Socket del cliente
-            filename: Nombre del archivo a enviar
+            rtt (float): Tiempo de ida y vuelta en segundos
         """
-        file_path = os.path.join(self.shared_directory, filename)
+        with self.lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+                self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+            self.samples += 1
+    
+    @property
+    def timeout(self):
+        """Timeout recomendado con las muestras actuales, en segundos."""
+        if self.srtt is None:
+            return self.initial_timeout
+        rto = self.srtt + self.K * self.rttvar
+        return min(self.max_timeout, max(self.min_timeout, rto))
+    
+    def timeout_for(self, attempt):
+        """
+        Timeout para el intento número `attempt` (0 = primero).
         
-        try:
-            if not os.path.exists(file_path):
-                error_msg = f"Archivo '{filename}' no encontrado\n"
-                client_sock.send(error_msg.encode('utf-8'))
-                return
-            
-            file_size = os.path.getsize(file_path)
-            
-            # Enviar información del archivo
-            file_info = f"SENDING_FILE:{filename}:{file_size}\n"
-            client_sock.send(file_info.encode('utf-8'))
-            
-            # Esperar confirmación del cliente
-            confirmation = client_sock.recv(1024).decode('utf-8').strip()
-            
-            if confirmation == "READY":
-                # Enviar contenido del archivo
-                with open(file_path, 'rb') as f:
-                    while True:
-                        chunk = f.read(4096)  # Leer en chunks de 4KB
-                        if not chunk:
-                            break
-                        client_sock.send(chunk)
-                
-                print(f"Archivo '{filename}' enviado exitosamente")
-            
-        except Exception as e:
-            error_msg = f"Error al enviar archivo: {e}\n"
-            client_sock.send(error_msg.encode('utf-8'))
+        Cada reintento duplica el timeout (backoff exponencial) sin superar
+        el máximo configurado.
+        """
+        return min(self.max_timeout, self.timeout * (2 ** attempt))
     
-    def start(self):
-        """Inicia el servidor de transferencia de archivos."""
-        try:
-            server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            server_sock.bind(('', self.port))
-            server_sock.listen(5)
-            
-            print(f"Servidor de archivos iniciado en puerto {self.port}")
-            print(f"Directorio compartido: {self.shared_directory}")
-            print("Presione Ctrl+C para detener")
-            
-            while self.running:
-                try:
-                    client_sock, client_addr = server_sock.accept()
-                    
-                    # Crear hilo para manejar el cliente
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_sock, client_addr)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                
-                except KeyboardInterrupt:
-                    print("\nDeteniendo servidor de archivos...")
-                    self.running = False
-                    break
-            
-            server_sock.close()
-            
-        except socket.error as e:
-            print(f"Error del servidor de archivos: {e}")
+    def describe(self):
+        """Resumen legible del estado del estimador."""
+        if self.srtt is None:
+            return "sin muestras"
+        return (f"srtt={self.srtt * 1000:.2f} ms, rttvar={self.rttvar * 1000:.2f} ms, "
+                f"muestras={self.samples}")
 
-def file_transfer_client(host, port, download_directory="downloads"):
+_rtt_estimators = {}
+_rtt_estimators_lock = threading.Lock()
+
+def get_rtt_estimator(host, initial_timeout=1.0):
     """
-    Cliente para transferencia de archivos.
+    Obtiene (o crea) el estimador de RTT compartido para un host.
     
-    Permite listar y descargar archivos del servidor.
+    Los estimadores persisten durante la vida del proceso, de modo que un
+    escaneo o prueba posterior al mismo host parte del RTT ya aprendido.
     
     Args:
-        host (str): Dirección del servidor
-        port (int): Puerto del servidor
-        download_directory (str): Directorio local para descargas
+        host (str): Host al que corresponde el estimador
+        initial_timeout (float): Timeout inicial si el estimador es nuevo
+    
+    Returns:
+        RttEstimator: Estimador del host
     """
-    print(f"\n=== Cliente de transferencia de archivos conectando a {host}:{port} ===")
+    with _rtt_estimators_lock:
+        estimator = _rtt_estimators.get(host)
+        if estimator is None:
+            estimator = RttEstimator(initial_timeout=initial_timeout)
+            _rtt_estimators[host] = estimator
+        return estimator
+
+def _clamp_concurrency(requested):
+    """
+    Ajusta la concurrencia al límite de descriptores de archivo del proceso.
     
-    # Crear directorio de descargas si no existe
-    if not os.path.exists(download_directory):
-        os.makedirs(download_directory)
-        print(f"Directorio de descargas creado: {download_directory}")
+    Cada conexión en vuelo consume un descriptor; si se piden más de los
+    permitidos, se intenta subir el límite blando hasta el duro y, si no
+    alcanza, se reduce la concurrencia dejando margen para el resto del programa.
+    
+    Args:
+        requested (int): Concurrencia solicitada
+    
+    Returns:
+        int: Concurrencia efectiva
+    """
+    try:
+        import resource  # Solo disponible en sistemas tipo Unix
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, OSError, ValueError):
+        return max(1, requested)
+    
+    needed = requested + 64
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (OSError, ValueError):
+            pass
+    
+    if soft == resource.RLIM_INFINITY:
+        return max(1, requested)
+    return max(1, min(requested, soft - 64))
+
+# =============================================================================
+# EJERCICIO 2: Información de conexión
+# =============================================================================
+
+def connection_info(host, port, samples=0):
+    """
+    Se conecta a un host y muestra información detallada de la conexión.
+    
+    Implementa el Ejercicio 2, mostrando información usando métodos
+    equivalentes a getInetAddress() y getPort() de Java.
+    
+    Args:
+        host (str): Host al que conectarse
+        port (int): Puerto de conexión
+        samples (int): Si es mayor que 0, repite la conexión ese número de
+            veces y muestra percentiles de latencia (ver latency_probe)
+    """
+    print(f"\n=== Información de conexión a {host}:{port} ===")
     
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
+        sock = happy_eyeballs_connect(host, port)
         
-        # Recibir menú del servidor
-        menu = sock.recv(1024).decode('utf-8')
-        print(menu)
+        # Información del socket remoto
+        remote_addr = sock.getpeername()
+        print(f"Dirección remota: {remote_addr[0]}")
+        print(f"Puerto remoto: {remote_addr[1]}")
         
-        while True:
-            try:
-                command = input("Comando: ").strip()
-                
-                if not command:
-                    continue
-                
-                sock.send(command.encode('utf-8'))
-                
-                if command.upper() == "QUIT":
-                    break
-                elif command.upper().startswith("GET "):
-                    # Manejar descarga de archivo
-                    self.handle_file_download(sock, download_directory)
-                else:
-                    # Recibir respuesta del servidor
-                    response = sock.recv(4096).decode('utf-8')
-                    print(response)
-            
-            except KeyboardInterrupt:
-                sock.send("QUIT".encode('utf-8'))
-                break
+        # Información del socket local
+        local_addr = sock.getsockname()
+        print(f"Dirección local: {local_addr[0]}")
+        print(f"Puerto local: {local_addr[1]}")
+        
+        # Información adicional del socket
+        print(f"Familia de direcciones: {sock.family}")
+        print(f"Tipo de socket: {sock.type}")
         
         sock.close()
+        print("Conexión cerrada exitosamente")
         
     except socket.error as e:
-        print(f"Error del cliente de archivos: {e}")
+        print(f"Error de conexión: {e}")
+        return
     
-    def handle_file_download(self, sock, download_directory):
-        """
-        Maneja la descarga de un archivo del servidor.
-        
-        Args:
-            sock: Socket conectado al servidor
-            download_directory: Directorio donde guardar el archivo
-        """
-        try:
-            # Recibir información del archivo
-            file_info = sock.recv(1024).decode('utf-8').strip()
-            
-            if file_info.startswith("SENDING_FILE:"):
-                parts = file_info.split(":")
-                filename = parts[1]
-                file_size = int(parts[2])
-                
-                print(f"Descargando '{filename}' ({file_size} bytes)...")
-                
-                # Confirmar que estamos listos para recibir
-                sock.send("READY".encode('utf-8'))
-                
-                # Recibir y guardar el archivo
-                file_path = os.path.join(download_directory, filename)
-                
-                with open(file_path, 'wb') as f:
-                    bytes_received = 0
-                    
-                    while bytes_received < file_size:
-                        chunk = sock.recv(min(4096, file_size - bytes_received))
-                        if not chunk:
-                            break
-                        
-                        f.write(chunk)
-                        bytes_received += len(chunk)
-                        
-                        # Mostrar progreso
-                        progress = (bytes_received / file_size) * 100
-                        print(f"\rProgreso: {progress:.1f}%", end='', flush=True)
-                
-                print(f"\nArchivo descargado exitosamente: {file_path}")
-            else:
-                # Mensaje de error del servidor
-                print(file_info)
-        
-        except Exception as e:
-            print(f"Error durante la descarga: {e}")
+    if samples:
+        latency_probe(host, port, samples)
 
 # =============================================================================
-# FUNCIONES DE DEMOSTRACIÓN Y MENÚ PRINCIPAL
+# EJERCICIO 3: Cliente Daytime (Recibir datos)
 # =============================================================================
 
-def create_sample_files():
-    """Crea archivos de ejemplo para el servidor de transferencia."""
-    shared_dir = "shared_files"
-    
-    if not os.path.exists(shared_dir):
-        os.makedirs(shared_dir)
+def daytime_client(host, port=13):
+    """
+    Cliente que se conecta al servicio daytime para obtener fecha y hora.
     
-    # Crear algunos archivos de ejemplo
-    files_to_create = [
-        ("ejemplo.txt", "Este es un archivo de ejemplo para transferencia.\nContiene varias líneas de texto.\n"),
-        ("datos.csv", "nombre,edad,ciudad\nJuan,25,Concepción del Uruguay\nMaría,30,Buenos Aires\n"),
-        ("info.md", "# Archivo Markdown\n\nEste es un ejemplo de archivo **Markdown**.\n\n- Item 1\n- Item 2\n")
-    ]
+    Implementa el ejemplo del protocolo daytime del documento.
+    El servidor envía la fecha y hora actual cuando se establece la conexión.
     
-    for filename, content in files_to_create:
-        file_path = os.path.join(shared_dir, filename)
-        if not os.path.exists(file_path):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+    Args:
+        host (str): Servidor daytime
+        port (int): Puerto del servicio (por defecto 13)
+    """
+    print(f"\n=== Cliente Daytime conectando a {host}:{port} ===")
     
-    print(f"Archivos de ejemplo creados en {shared_dir}")
-
-def demo_menu():
-    """Menú principal para demostrar todos los ejercicios."""
-    print("\n" + "="*60)
-    print("IMPLEMENTACIÓN DE SOCKETS TCP - LABORATORIO PRÁCTICO")
-    print("Basado en el documento LAB_SocketsTCP.pdf")
-    print("="*60)
+    try:
+        sock = happy_eyeballs_connect(host, port)
+        
+        # Información de conexión
+        remote_addr = sock.getpeername()
+        print(f"Conectado a: {remote_addr[0]}")
+        print(f"Puerto: {remote_addr[1]}")
+        
+        # Recibir datos del servidor
+        data = sock.recv(1024).decode('ascii').strip()
+        print(f"Día y hora del servidor: {data}")
+        
+        sock.close()
+        
+    except socket.error as e:
+        print(f"Error en cliente daytime: {e}")
+
+# =============================================================================
+# EJERCICIO 4: Cliente Echo (Enviar y recibir datos)
+# =============================================================================
+
+def echo_client(host, port=7, messages=None, depth=16):
+    """
+    Cliente interactivo que implementa el protocolo echo.
+    
+    El usuario puede escribir mensajes que se envían al servidor,
+    y el servidor responde con el mismo mensaje (eco).
+    Implementa el ejemplo del documento con protocolo RFC862.
+    
+    Si se pasa `messages` (un archivo abierto en binario, una lista o un
+    generador), el cliente funciona en modo no interactivo y delega en
+    `echo_benchmark`, que envía los mensajes en pipeline.
+    
+    Args:
+        host (str): Servidor echo
+        port (int): Puerto del servicio (por defecto 7)
+        messages: Mensajes a enviar en modo no interactivo
+        depth (int): Mensajes en vuelo como máximo en modo no interactivo
+    """
+    if messages is not None:
+        return echo_benchmark(host, port, messages, depth=depth)
+    
+    print(f"\n=== Cliente Echo conectando a {host}:{port} ===")
+    print("Escriba mensajes (escriba '.' para salir)")
+    
+    try:
+        sock = happy_eyeballs_connect(host, port)
+        
+        print(f"Conectado exitosamente a {host}:{port}")
+        
+        while True:
+            # Leer entrada del usuario
+            message = input("Mensaje: ")
+            
+            if message == ".":
+                break
+            
+            # Enviar mensaje al servidor
+            sock.send((message + "\n").encode('ascii'))
+            
+            # Recibir respuesta del servidor
+            response = sock.recv(1024).decode('ascii').strip()
+            print(f"Echo del servidor: {response}")
+        
+        sock.close()
+        print("Conexión cerrada")
+        
+    except socket.error as e:
+        print(f"Error en cliente echo: {e}")
+
+# =============================================================================
+# EJERCICIOS 5-6: Servidor básico con mensaje
+# =============================================================================
+
+def basic_server(port, reuse_port=False):
+    """
+    Servidor básico que acepta conexiones y envía un mensaje de bienvenida.
+    
+    Implementa los ejercicios 5 y 6 del documento.
+    El servidor acepta conexiones, envía un mensaje y cierra la conexión.
+    
+    Args:
+        port (int): Puerto en el que el servidor escuchará
+        reuse_port (bool): Activar SO_REUSEPORT (modo con varios procesos)
+    """
+    print(f"\n=== Servidor básico iniciando en puerto {port} ===")
+    
+    try:
+        # Crear socket servidor
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        
+        # Permitir reutilizar la dirección (evita errores de "Address already in use")
+        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            enable_reuse_port(server_sock)
+        
+        # Vincular el socket al puerto
+        server_sock.bind(('', port))
+        
+        # Escuchar conexiones (máximo 5 en cola)
+        server_sock.listen(5)
+        
+        print(f"Servidor atendiendo en el puerto {port}")
+        print("Presione Ctrl+C para detener el servidor")
+        
+        while True:
+            try:
+                # Aceptar conexión entrante
+                client_sock, client_addr = server_sock.accept()
+                
+                server_log.info("Nueva conexión desde %s:%s", client_addr[0], client_addr[1],
+                                key="conexiones")
+                
+                # Enviar mensaje de bienvenida
+                welcome_msg = f"Se ha conectado al socket servidor en puerto {port}\n"
+                welcome_msg += f"Hora de conexión: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                
+                client_sock.send(welcome_msg.encode('utf-8'))
+                
+                # Cerrar conexión con el cliente
+                client_sock.close()
+                server_log.debug("Conexión con %s:%s cerrada", client_addr[0], client_addr[1],
+                                 key="conexiones")
+                
+            except KeyboardInterrupt:
+                print("\nDeteniendo servidor...")
+                break
+            except socket.error as e:
+                server_log.warning("Error en conexión: %s", e, key="conexiones")
+        
+        server_sock.close()
+        
+    except socket.error as e:
+        server_failed(f"Error del servidor: {e}")
+
+def basic_client(host, port):
+    """
+    Cliente que se conecta al servidor básico y muestra el mensaje recibido.
+    
+    Complementa el ejercicio 6, actuando como cliente del servidor básico.
+    
+    Args:
+        host (str): Dirección del servidor
+        port (int): Puerto del servidor
+    """
+    print(f"\n=== Cliente básico conectando a {host}:{port} ===")
+    
+    try:
+        sock = happy_eyeballs_connect(host, port)
+        
+        # Recibir mensaje del servidor
+        data = sock.recv(1024).decode('utf-8')
+        print("Mensaje del servidor:")
+        print(data)
+        
+        sock.close()
+        
+    except socket.error as e:
+        print(f"Error del cliente básico: {e}")
+
+# =============================================================================
+# EJERCICIO 7: Sistema de mensajería
+# =============================================================================
+
+# Formatos de trama del sistema de mensajería: "line" (un mensaje por línea)
+# y "length" (cabecera de 4 bytes big-endian con la longitud y luego los datos)
+FRAMINGS = ("line", "length")
+FRAME_HEADER = struct.Struct("!I")
+MAX_MESSAGE_SIZE = 64 * 1024
+
+def encode_frame(message, framing="line"):
+    """
+    Codifica un mensaje como una trama completa.
+    
+    En modo "line" el texto se termina en "\n" (un texto de varias líneas
+    son varias tramas). En modo "length" se quita el salto de línea final y
+    se antepone la longitud.
+    
+    Args:
+        message (str | bytes): Mensaje a codificar
+        framing (str): "line" o "length"
+    
+    Returns:
+        bytes: Trama lista para enviar
+    """
+    data = message.encode('utf-8') if isinstance(message, str) else message
+    if framing == "length":
+        if data.endswith(b"\n"):
+            data = data[:-1]
+        return FRAME_HEADER.pack(len(data)) + data
+    return data if data.endswith(b"\n") else data + b"\n"
+
+class FrameReader:
+    """
+    Lector con buffer que separa un flujo TCP en mensajes completos.
+    
+    Un recv() no equivale a un mensaje: uno grande puede llegar en varios
+    trozos y varios pequeños pueden llegar juntos. El lector acumula lo
+    recibido y entrega mensajes enteros según la trama ("line" o "length"),
+    de modo que el otro extremo puede enviar mensajes en pipeline o por
+    lotes. Los mensajes mayores que `max_size` se rechazan con ValueError.
+    """
+    
+    def __init__(self, sock, framing="line", max_size=MAX_MESSAGE_SIZE, chunk_size=65536):
+        """
+        Args:
+            sock: Socket conectado del que leer
+            framing (str): "line" o "length"
+            max_size (int): Tamaño máximo de un mensaje en bytes
+            chunk_size (int): Bytes pedidos en cada recv
+        """
+        if framing not in FRAMINGS:
+            raise ValueError(f"Trama desconocida: {framing}")
+        self.sock = sock
+        self.framing = framing
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._scanned = 0  # Bytes ya revisados sin encontrar "\n"
+    
+    def read_message(self):
+        """
+        Devuelve el siguiente mensaje completo, sin delimitador ni cabecera.
+        
+        Returns:
+            bytes: Mensaje, o None si el otro extremo cerró la conexión
+        
+        Raises:
+            ValueError: Si un mensaje supera `max_size`
+        """
+        while True:
+            message = self._extract()
+            if message is not None:
+                return message
+            chunk = self.sock.recv(self.chunk_size)
+            if not chunk:
+                return None
+            self._buffer += chunk
+    
+    def read_messages(self):
+        """
+        Devuelve todos los mensajes completos ya recibidos.
+        
+        Espera al primero como read_message y añade los que llegaron en los
+        mismos recv, sin volver a leer del socket. Así quien procesa un lote
+        enviado en pipeline puede tratarlo de una vez.
+        
+        Returns:
+            list: Mensajes, o lista vacía si el otro extremo cerró la conexión
+        
+        Raises:
+            ValueError: Si un mensaje supera `max_size`
+        """
+        message = self.read_message()
+        messages = []
+        while message is not None:
+            messages.append(message)
+            message = self._extract()
+        return messages
+    
+    def __iter__(self):
+        while True:
+            message = self.read_message()
+            if message is None:
+                return
+            yield message
+    
+    def _extract(self):
+        buffer = self._buffer
+        if self.framing == "line":
+            end = buffer.find(b"\n", self._scanned)
+            if end < 0:
+                if len(buffer) > self.max_size:
+                    raise ValueError(f"Mensaje mayor que {self.max_size} bytes")
+                self._scanned = len(buffer)
+                return None
+            message = bytes(buffer[:end])
+            del buffer[:end + 1]
+            self._scanned = 0
+            return message[:-1] if message.endswith(b"\r") else message
+        
+        if len(buffer) < FRAME_HEADER.size:
+            return None
+        (size,) = FRAME_HEADER.unpack_from(buffer)
+        if size > self.max_size:
+            raise ValueError(f"Mensaje de {size} bytes mayor que {self.max_size}")
+        end = FRAME_HEADER.size + size
+        if len(buffer) < end:
+            return None
+        message = bytes(buffer[FRAME_HEADER.size:end])
+        del buffer[:end]
+        return message
+
+# Buffers como máximo por llamada a sendmsg (límite IOV_MAX del sistema)
+try:
+    SEND_IOV_MAX = min(os.sysconf("SC_IOV_MAX"), 1024)
+except (AttributeError, ValueError, OSError):
+    SEND_IOV_MAX = 1024
+
+def send_buffers(sock, buffers):
+    """
+    Envía varios buffers con sendmsg (scatter/gather) sin copiarlos a uno solo.
+    
+    Los buffers son las tramas ya codificadas y compartidas entre todos los
+    destinatarios, así que no se copian ni se concatenan: cada llamada al
+    sistema entrega hasta SEND_IOV_MAX de ellos y los envíos parciales se
+    reanudan con vistas de memoria. Sin sendmsg (Windows) se concatenan en
+    un único sendall.
+    
+    Args:
+        sock: Socket bloqueante de destino
+        buffers (list): Objetos bytes o memoryview a enviar en orden
+    
+    Returns:
+        int: Número de llamadas al sistema realizadas
+    """
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return 1
+    
+    calls = 0
+    while buffers:
+        sent = sock.sendmsg(buffers[:SEND_IOV_MAX])
+        calls += 1
+        buffers = unsent_buffers(buffers, sent)
+    return calls
+
+def unsent_buffers(buffers, sent):
+    """
+    Buffers que quedan por enviar después de que se enviaran `sent` bytes.
+    
+    El buffer enviado a medias se devuelve como vista de su resto, sin copiarlo.
+    
+    Args:
+        buffers (list): Buffers en el orden en que se enviaron
+        sent (int): Bytes enviados
+    
+    Returns:
+        list: Buffers pendientes
+    """
+    for index, buffer in enumerate(buffers):
+        size = len(buffer)
+        if sent < size:
+            if sent:
+                return [memoryview(buffer)[sent:]] + list(buffers[index + 1:])
+            return list(buffers[index:])
+        sent -= size
+    return []
+
+class ClientOutbox:
+    """
+    Cola de salida acotada de un cliente, vaciada por un hilo escritor propio.
+    
+    Quien retransmite un mensaje nunca se bloquea en el socket: si no hay
+    nada pendiente, intenta un envío no bloqueante (MSG_DONTWAIT) y solo
+    encola lo que el socket no admitió. El envío bloqueante lo hace el
+    escritor del cliente, que entrega todo lo pendiente con `send_buffers`
+    (sendmsg scatter/gather) sin copiar las tramas compartidas. Así un
+    cliente lento solo se retrasa a sí mismo. `syscalls` cuenta las llamadas
+    al sistema de envío realizadas. Cuando la cola está
+    llena se aplica la política de consumidor lento:
+    
+    - "drop_oldest": se descarta el mensaje más antiguo pendiente.
+    - "drop_client": se desconecta al cliente.
+    - "block": se espera hasta `block_ms` milisegundos a que haya sitio; si
+      no lo hay, se descarta el mensaje nuevo para ese cliente.
+    """
+    
+    POLICIES = ("drop_oldest", "drop_client", "block")
+    
+    def __init__(self, sock, addr, max_messages=256, policy="drop_oldest", block_ms=50):
+        """
+        Args:
+            sock: Socket del cliente
+            addr: Dirección del cliente
+            max_messages (int): Mensajes pendientes como máximo
+            policy (str): Política de consumidor lento
+            block_ms (float): Espera máxima con la política "block"
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de consumidor lento desconocida: {policy}")
+        self.sock = sock
+        self.addr = addr
+        self.max_messages = max_messages
+        self.policy = policy
+        self.block_ms = block_ms
+        self.dropped = 0
+        self.syscalls = 0
+        self.closed = False
+        self._sending = False  # El escritor está enviando fuera del lock
+        # Resto de una trama enviada a medias: va antes que lo pendiente y
+        # nunca se descarta, o el cliente recibiría una trama cortada
+        self._partial = None
+        self._pending = collections.deque()  # Tramas completas por enviar
+        self._cond = threading.Condition()
+        try:
+            # El escritor ya agrupa los envíos; Nagle solo añadiría esperas por ACK retardado
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+    
+    def put(self, data):
+        """
+        Encola datos ya codificados para el cliente.
+        
+        Args:
+            data (bytes): Datos a enviar
+        
+        Returns:
+            bool: False si el cliente está cerrado o se desconectó por lento
+        """
+        return self.put_many((data,))
+    
+    def put_many(self, frames):
+        """
+        Encola varias tramas ya codificadas, que se envían agrupadas.
+        
+        Si no hay nada pendiente se intenta enviarlas todas con un único
+        sendmsg no bloqueante; la política de consumidor lento se aplica a
+        cada trama completa que quede pendiente. El resto de una trama que
+        el socket admitió a medias se guarda aparte y no se descarta nunca.
+        
+        Args:
+            frames (sequence): Tramas (bytes) a enviar en orden
+        
+        Returns:
+            bool: False si el cliente está cerrado o se desconectó por lento
+        """
+        with self._cond:
+            if self.closed:
+                return False
+            
+            if (not self._pending and self._partial is None and not self._sending
+                    and hasattr(socket, "MSG_DONTWAIT")):
+                # Camino rápido: el socket suele admitir los mensajes sin esperar
+                self.syscalls += 1
+                try:
+                    if len(frames) == 1 or not hasattr(self.sock, "sendmsg"):
+                        sent = self.sock.send(frames[0], socket.MSG_DONTWAIT)
+                    else:
+                        sent = self.sock.sendmsg(frames[:SEND_IOV_MAX], (), socket.MSG_DONTWAIT)
+                except BlockingIOError:
+                    sent = 0
+                except OSError:
+                    self._abort_locked()
+                    return False
+                # Encolar el resto como vista, sin copiar las tramas compartidas
+                remaining = unsent_buffers(frames, sent)
+                if not remaining:
+                    return True
+                if len(remaining[0]) != len(frames[len(frames) - len(remaining)]):
+                    self._partial = remaining.pop(0)
+                    self._cond.notify_all()
+                frames = remaining
+            
+            for data in frames:
+                if len(self._pending) >= self.max_messages:
+                    if self.policy == "drop_oldest":
+                        self._pending.popleft()
+                        self.dropped += 1
+                        server_log.warning("Cola de %s:%s llena: descartado el mensaje más antiguo",
+                                           self.addr[0], self.addr[1], key="mensajes")
+                    elif self.policy == "drop_client":
+                        self._abort_locked()
+                        server_log.warning("Cliente %s:%s desconectado por lento", self.addr[0],
+                                           self.addr[1], key="conexiones")
+                        return False
+                    elif not self._cond.wait_for(
+                            lambda: self.closed or len(self._pending) < self.max_messages,
+                            self.block_ms / 1000):
+                        self.dropped += 1
+                        server_log.warning("Cola de %s:%s llena: descartado el mensaje nuevo",
+                                           self.addr[0], self.addr[1], key="mensajes")
+                        continue
+                    if self.closed:
+                        return False
+                
+                self._pending.append(data)
+            self._cond.notify_all()
+        return True
+    
+    def close(self, timeout=1.0):
+        """
+        Deja de aceptar mensajes y espera hasta `timeout` a que se envíe lo pendiente.
+        """
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+    
+    def _abort_locked(self):
+        # Descarta lo pendiente y despierta al hilo lector del cliente
+        self.closed = True
+        self._partial = None
+        self._pending.clear()
+        self._cond.notify_all()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    
+    def _writer(self):
+        """Hilo escritor: envía de una vez todo lo pendiente con sendmsg."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._pending or self._partial is not None or self.closed)
+                if not self._pending and self._partial is None:
+                    return  # Cerrada y sin nada pendiente
+                buffers = list(self._pending)
+                self._pending.clear()
+                if self._partial is not None:
+                    buffers.insert(0, self._partial)
+                    self._partial = None
+                self._sending = True
+                self._cond.notify_all()  # Hay sitio para quien espera con "block"
+            try:
+                calls = send_buffers(self.sock, buffers)
+            except OSError:
+                with self._cond:
+                    self._abort_locked()
+                return
+            with self._cond:
+                self._sending = False
+                self.syscalls += calls
+
+class RoomIndex:
+    """
+    Índice de salas del servidor de mensajería.
+    
+    Guarda para cada sala el conjunto de clientes suscritos y, para cada
+    cliente, las salas a las que pertenece. Enviar a una sala cuesta
+    O(suscriptores) en lugar de recorrer todos los clientes, contar los
+    miembros de cada sala no exige recorrer clientes y, al desconectarse un
+    cliente, solo se visitan sus propias salas. No es seguro para hilos: el
+    servidor lo protege con su propio lock.
+    """
+    
+    COMMANDS = ("/join", "/leave", "/msg")
+    MAX_ROOMS_PER_CLIENT = 64
+    MAX_ROOM_NAME = 64
+    
+    def __init__(self):
+        self.rooms = {}        # sala -> set de clientes suscritos
+        self.memberships = {}  # cliente -> set de salas
+    
+    def join(self, client, room):
+        """
+        Suscribe un cliente a una sala, creándola si no existe.
+        
+        Returns:
+            int: Miembros de la sala tras unirse
+        
+        Raises:
+            ValueError: Si el nombre no es válido o el cliente está en demasiadas salas
+        """
+        if not room or len(room) > self.MAX_ROOM_NAME or " " in room:
+            raise ValueError(f"Nombre de sala no válido: '{room}'")
+        joined = self.memberships.setdefault(client, set())
+        if room not in joined and len(joined) >= self.MAX_ROOMS_PER_CLIENT:
+            raise ValueError(f"No se puede estar en más de {self.MAX_ROOMS_PER_CLIENT} salas")
+        joined.add(room)
+        members = self.rooms.setdefault(room, set())
+        members.add(client)
+        return len(members)
+    
+    def leave(self, client, room):
+        """
+        Quita a un cliente de una sala; las salas vacías se eliminan.
+        
+        Returns:
+            bool: False si el cliente no estaba en la sala
+        """
+        joined = self.memberships.get(client)
+        if not joined or room not in joined:
+            return False
+        joined.discard(room)
+        if not joined:
+            del self.memberships[client]
+        members = self.rooms[room]
+        members.discard(client)
+        if not members:
+            del self.rooms[room]
+        return True
+    
+    def leave_all(self, client):
+        """Quita a un cliente de todas sus salas (al desconectarse)."""
+        for room in list(self.memberships.get(client, ())):
+            self.leave(client, room)
+    
+    def members(self, room):
+        """Conjunto de suscriptores de una sala (vacío si no existe)."""
+        return self.rooms.get(room, ())
+    
+    def counts(self):
+        """Miembros por sala, sin recorrer los clientes."""
+        return {room: len(members) for room, members in self.rooms.items()}
+    
+    def command(self, client, message):
+        """
+        Procesa un comando /join, /leave o /msg de un cliente.
+        
+        Args:
+            client: Identificador del cliente en el servidor
+            message (str): Línea recibida
+        
+        Returns:
+            tuple: (respuesta para el cliente o None, sala de destino o None,
+                texto a enviar a la sala o None)
+        """
+        parts = message.split(" ", 2)
+        command = parts[0]
+        room = parts[1].strip() if len(parts) > 1 else ""
+        
+        if command == "/join":
+            try:
+                count = self.join(client, room)
+            except ValueError as e:
+                return f"{e}\n", None, None
+            return f"Unido a la sala {room} ({count} miembros)\n", None, None
+        
+        if command == "/leave":
+            if self.leave(client, room):
+                return f"Saliste de la sala {room}\n", None, None
+            return f"No estás en la sala '{room}'\n", None, None
+        
+        if command != "/msg":
+            return f"Comando desconocido: {command}. Use /join, /leave o /msg\n", None, None
+        
+        # /msg <sala> <texto>: solo los miembros pueden escribir en la sala
+        text = parts[2].strip() if len(parts) > 2 else ""
+        if not text:
+            return "Uso: /msg <sala> <texto>\n", None, None
+        if room not in self.memberships.get(client, ()):
+            return f"No estás en la sala '{room}'. Use /join {room}\n", None, None
+        return None, room, text
+    
+    def summary(self):
+        """Línea con los miembros por sala para /list (vacía si no hay salas)."""
+        if not self.rooms:
+            return ""
+        return "Salas: " + ", ".join(f"{room} ({count})"
+                                     for room, count in sorted(self.counts().items())) + "\n"
+
+class MessageHistory:
+    """
+    Historial acotado de los últimos mensajes difundidos (buffer circular).
+    
+    Reserva al crearse `capacity` huecos y guarda la trama de cada mensaje
+    en el hueco `seq % capacity`, numerando los mensajes con identificadores
+    de secuencia crecientes desde 1. Cuando se llena, cada mensaje nuevo
+    reemplaza al más antiguo, de modo que la memoria queda acotada a
+    `capacity` tramas y nunca se copia ni se redimensiona nada. Un cliente
+    que se reconecta pide con "/resume N" los mensajes posteriores a #N.
+    Junto a cada trama se guarda la sesión que la envió, para no devolverle
+    a un cliente sus propios mensajes (que nunca recibió en vivo).
+    No es seguro para hilos: el servidor lo protege con su propio lock.
+    """
+    
+    def __init__(self, capacity=256):
+        """
+        Args:
+            capacity (int): Mensajes que se conservan
+        """
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser al menos 1")
+        self.capacity = capacity
+        self.next_seq = 1  # Número que recibirá el próximo mensaje
+        self._frames = [None] * capacity
+        self._origins = [None] * capacity  # Sesión que envió cada mensaje
+    
+    def append(self, frame, origin=None):
+        """
+        Guarda la trama de un mensaje, descartando la más antigua si no hay sitio.
+        
+        Args:
+            frame (bytes): Trama del mensaje
+            origin (int): Sesión del remitente (None = el propio servidor)
+        
+        Returns:
+            int: Número de secuencia asignado
+        """
+        seq = self.next_seq
+        self._frames[seq % self.capacity] = frame
+        self._origins[seq % self.capacity] = origin
+        self.next_seq = seq + 1
+        return seq
+    
+    @property
+    def oldest_seq(self):
+        """Número del mensaje más antiguo que se conserva."""
+        return max(1, self.next_seq - self.capacity)
+    
+    def since(self, seq, until=None, limit=None, exclude=None):
+        """
+        Tramas de los mensajes posteriores a #seq que aún se conservan.
+        
+        Args:
+            seq (int): Último número de secuencia que tiene el cliente
+            until (int): Primer número que no se devuelve (por defecto, ninguno)
+            limit (int): Devolver como mucho los `limit` mensajes más recientes
+            exclude (int): Sesión cuyos propios mensajes se omiten
+        
+        Returns:
+            tuple: (lista de tramas en orden, número de mensajes posteriores
+                a #seq que ya no se conservan o quedaron fuera de `limit`)
+        """
+        end = self.next_seq if until is None else min(until, self.next_seq)
+        first = max(seq + 1, self.oldest_seq)
+        if limit is not None:
+            first = max(first, end - limit)
+        frames = [self._frames[number % self.capacity] for number in range(first, end)
+                  if exclude is None or self._origins[number % self.capacity] != exclude]
+        return frames, max(0, min(first, end) - seq - 1)
+
+def message_sequence(data):
+    """
+    Número de secuencia de un mensaje difundido ("#N ..."), o None si no tiene.
+    
+    Args:
+        data (bytes): Mensaje recibido, sin trama
+    """
+    if not data.startswith(b"#"):
+        return None
+    number = data[1:].split(b" ", 1)[0]
+    return int(number) if number.isdigit() else None
+
+# Línea de la bienvenida con la sesión del cliente y el último número difundido
+WELCOME_SESSION = "Sesión: {session}, último mensaje: #{last_seq}\n"
+
+def welcome_session(data):
+    """
+    Sesión y último número de secuencia anunciados en una bienvenida.
+    
+    Args:
+        data (bytes): Mensaje recibido, sin trama
+    
+    Returns:
+        tuple: (sesión, último #N) o None si el mensaje no los incluye
+    """
+    prefix, _, middle = WELCOME_SESSION.partition("{session}")
+    separator = middle.partition("{last_seq}")[0]
+    for line in data.decode('utf-8', errors='replace').split("\n"):
+        if line.startswith(prefix):
+            session, _, last_seq = line[len(prefix):].partition(separator)
+            if session.isdigit() and last_seq.isdigit():
+                return int(session), int(last_seq)
+    return None
+
+def resume_frames(history, message, until, framing, limit=None):
+    """
+    Respuesta a "/resume N [sesión]": los mensajes difundidos después de #N
+    que el cliente no recibió en vivo, precedidos de un aviso si falta
+    alguno. Con la sesión anterior del cliente se omiten los mensajes que
+    envió él mismo.
+    
+    Args:
+        history: MessageHistory del servidor, o None si no guarda historial
+        message (str): Comando recibido
+        until (int): Primer número de secuencia que el cliente recibió en vivo
+        framing (str): Trama del servidor
+        limit (int): Tramas como máximo (lo que admite su cola de salida)
+    
+    Returns:
+        list: Tramas a enviar al cliente
+    """
+    parts = message.split()
+    try:
+        after = int(parts[1])
+        origin = int(parts[2]) if len(parts) > 2 else None
+    except (IndexError, ValueError):
+        after = -1
+    if after < 0 or len(parts) > 3:
+        return [encode_frame("Uso: /resume <último #número recibido> [sesión anterior]\n",
+                             framing)]
+    if history is None:
+        return [encode_frame("Este servidor no guarda historial\n", framing)]
+    
+    # Reservar un hueco para el aviso de mensajes perdidos
+    frames, lost = history.since(after, until, limit - 1 if limit else None, exclude=origin)
+    if lost:
+        notice = f"Historial incompleto: {lost} mensajes ya no están disponibles\n"
+        frames.insert(0, encode_frame(notice, framing))
+    return frames
+
+def message_welcome(client_count, session=None, last_seq=None):
+    """
+    Mensaje de bienvenida del servidor de mensajería.
+    
+    Args:
+        client_count (int): Clientes conectados
+        session (int): Sesión del cliente, para pedir "/resume N <sesión>" al reconectarse
+        last_seq (int): Último número difundido (None = el servidor no guarda historial)
+    
+    Returns:
+        str: Texto de bienvenida con los comandos disponibles
+    """
+    welcome = f"Bienvenido al servidor de mensajería\nClientes conectados: {client_count}\n"
+    if last_seq is not None:
+        welcome += WELCOME_SESSION.format(session=session, last_seq=last_seq)
+    welcome += "Comandos disponibles:\n"
+    welcome += "  /list - Ver clientes conectados y salas\n"
+    welcome += "  /join <sala> - Unirse a una sala\n"
+    welcome += "  /leave <sala> - Salir de una sala\n"
+    welcome += "  /msg <sala> <texto> - Enviar un mensaje a una sala\n"
+    welcome += "  /resume N [sesión] - Recibir los mensajes perdidos posteriores a #N\n"
+    welcome += "  /quit - Desconectarse\n"
+    welcome += "  Cualquier otro texto se enviará como mensaje\n\n"
+    return welcome
+
+class ClientRecord:
+    """
+    Datos de una conexión del servidor de mensajería.
+    
+    Usa __slots__: sin diccionario por instancia, cada registro ocupa poco
+    aunque haya miles de clientes. Se compara por identidad, así que sirve
+    de clave en el índice de salas.
+    """
+    
+    __slots__ = ("id", "sock", "addr", "outbox", "joined_at", "messages_in", "first_live_seq",
+                 "next_seq", "held", "order_lock")
+    
+    def __init__(self, conn_id, sock, addr, outbox):
+        self.id = conn_id
+        self.sock = sock
+        self.addr = addr
+        self.outbox = outbox
+        self.joined_at = time.monotonic()
+        self.messages_in = 0  # Mensajes recibidos del cliente
+        self.first_live_seq = None  # Primer número que recibió en vivo (ver MessageHistory)
+        self.next_seq = None  # Próximo número que le toca recibir
+        self.held = None  # Lotes numerados que llegaron antes de tiempo: número -> lote
+        self.order_lock = threading.Lock()
+    
+    def deliver(self, seq, count, frames):
+        """
+        Entrega un lote de mensajes numerados (#seq a #seq+count-1) en orden.
+        
+        Las difusiones numeran sus mensajes bajo un lock pero los entregan
+        en paralelo, así que un lote puede llegar antes que el anterior: se
+        retiene hasta que llegue el que falta.
+        
+        Args:
+            seq (int): Número del primer mensaje del lote
+            count (int): Mensajes del lote
+            frames (list): Tramas a encolar, o None si el lote no va a este
+                cliente (p. ej. sus propios mensajes) y solo avanza la numeración
+        
+        Returns:
+            bool: False si la cola de salida ya no acepta mensajes
+        """
+        with self.order_lock:
+            if seq != self.next_seq:
+                if self.held is None:
+                    self.held = {}
+                self.held[seq] = (count, frames)
+                return True
+            
+            accepted = True
+            while True:
+                if frames is not None and not self.outbox.put_many(frames):
+                    accepted = False
+                self.next_seq = seq + count
+                if not self.held or self.next_seq not in self.held:
+                    return accepted
+                seq = self.next_seq
+                count, frames = self.held.pop(seq)
+
+class ClientRegistry:
+    """
+    Registro de las conexiones del servidor de mensajería por id de conexión.
+    
+    Alta y baja cuestan O(1) bajo un lock propio que solo protege el
+    diccionario. Quien difunde no recorre el diccionario: usa snapshot(),
+    una tupla inmutable de los registros que solo se reconstruye después de
+    un cambio (copy-on-write). Así las altas y bajas no esperan a que
+    termine una difusión, y las difusiones seguidas comparten la misma copia.
+    """
+    
+    def __init__(self):
+        self._records = {}  # Id de conexión -> ClientRecord
+        self._lock = threading.Lock()
+        self._snapshot = ()
+        self._next_id = 1
+    
+    def add(self, sock, addr, outbox):
+        """
+        Registra una conexión nueva.
+        
+        Returns:
+            ClientRecord: Registro con su id de conexión
+        """
+        with self._lock:
+            record = ClientRecord(self._next_id, sock, addr, outbox)
+            self._next_id += 1
+            self._records[record.id] = record
+            self._snapshot = None
+        return record
+    
+    def remove(self, record):
+        """
+        Da de baja una conexión.
+        
+        Returns:
+            bool: False si ya no estaba registrada
+        """
+        with self._lock:
+            if self._records.pop(record.id, None) is None:
+                return False
+            self._snapshot = None
+        return True
+    
+    def get(self, conn_id):
+        """Registro de una conexión, o None si ya no está registrada."""
+        return self._records.get(conn_id)
+    
+    def snapshot(self):
+        """
+        Registros actuales como tupla inmutable que se puede recorrer sin lock.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = tuple(self._records.values())
+                snapshot = self._snapshot
+        return snapshot
+    
+    def __len__(self):
+        return len(self._records)
+
+class MessageServer:
+    """
+    Servidor de mensajería que permite comunicación entre múltiples clientes.
+    
+    Implementa el Ejercicio 7 del documento.
+    Los clientes pueden enviar mensajes que se retransmiten a otros clientes conectados.
+    
+    Cada cliente tiene una cola de salida acotada (ClientOutbox) con su
+    propio hilo escritor: el broadcast solo encola, de modo que un cliente
+    lento no frena a los demás. Los clientes se guardan en un
+    ClientRegistry por id de conexión; el broadcast recorre su copia
+    inmutable sin tomar ningún lock de la lista de clientes.
+    
+    Con `history` los mensajes difundidos a todos se numeran ("#N ...") y
+    los últimos se guardan en un MessageHistory; un cliente que se reconecta
+    recupera con "/resume N" los que se perdió.
+    """
+    
+    # Comandos que llevan argumentos
+    ARG_COMMANDS = ("/resume",) + RoomIndex.COMMANDS
+    
+    def __init__(self, port, reuse_port=False, max_workers=None, queue_size=64, overload="reject",
+                 outbox_size=256, slow_policy="drop_oldest", block_ms=50, framing="line",
+                 history=256):
+        if framing not in FRAMINGS:
+            raise ValueError(f"Trama desconocida: {framing}")
+        self.port = port
+        self.reuse_port = reuse_port
+        self.framing = framing  # Trama de los mensajes (ver FrameReader)
+        self.clients = ClientRegistry()  # Id de conexión -> ClientRecord
+        self.rooms = RoomIndex()  # Salas y sus suscriptores (protegido por self.lock)
+        # Últimos mensajes numerados (None = sin historial)
+        self.history = MessageHistory(history) if history else None
+        # Protege el historial y la numeración de los mensajes
+        self.broadcast_lock = threading.Lock()
+        self.outbox_size = outbox_size
+        self.slow_policy = slow_policy
+        self.block_ms = block_ms
+        self.running = True
+        self.lock = threading.Lock()  # Para acceso seguro al índice de salas
+        # Con max_workers los clientes se atienden en un pool acotado (ver WorkerPool)
+        self.pool = (WorkerPool(self.handle_client, max_workers, queue_size, overload, name='mensajería')
+                     if max_workers else None)
+    
+    def handle_client(self, client_sock, client_addr, conn_id):
+        """
+        Maneja la comunicación con un cliente específico.
+        
+        Args:
+            client_sock: Socket del cliente
+            client_addr: Dirección del cliente
+            conn_id (int): Id de conexión en el registro de clientes
+        """
+        server_log.info("Cliente %s:%s conectado", client_addr[0], client_addr[1], key="conexiones")
+        
+        record = self.clients.get(conn_id)
+        if record is None:
+            # El cliente fue desconectado mientras esperaba en el pool
+            client_sock.close()
+            return
+        
+        # Enviar mensaje de bienvenida. Ya está en el registro, así que recibirá
+        # en vivo todo lo numerado después de last_seq
+        last_seq = self.history.next_seq - 1 if self.history is not None else None
+        welcome = message_welcome(len(self.clients), record.id, last_seq)
+        
+        outbox = record.outbox
+        reader = FrameReader(client_sock, self.framing)
+        
+        try:
+            outbox.put(encode_frame(welcome, self.framing))
+            
+            connected = True
+            while self.running and connected:
+                # Recibir los mensajes completos que trajo el último recv
+                batch = reader.read_messages()
+                if not batch:
+                    break
+                record.messages_in += len(batch)
+                
+                chat = []  # Mensajes normales del lote: se difunden juntos
+                for data in batch:
+                    message = data.decode('utf-8', errors='replace').strip()
+                    if not message:
+                        # Línea vacía (Enter en nc/telnet): se ignora, como en AsyncMessageServer
+                        continue
+                    if (message not in ("/quit", "/list")
+                            and message.split(" ", 1)[0] not in self.ARG_COMMANDS):
+                        # Retransmitir mensaje a todos los otros clientes
+                        chat.append(f"[{client_addr[0]}:{client_addr[1]}]: {message}\n")
+                        continue
+                    if chat:
+                        # Mantener el orden: lo anterior al comando sale antes
+                        self.broadcast_messages(chat, exclude=record)
+                        chat = []
+                    if message == "/quit":
+                        connected = False
+                        break
+                    self.handle_command(record, message)
+                if chat:
+                    self.broadcast_messages(chat, exclude=record)
+        
+        except ValueError as e:
+            # Mensaje demasiado grande: se desconecta al cliente
+            server_log.warning("Cliente %s:%s: %s", client_addr[0], client_addr[1], e,
+                               key="conexiones")
+        except socket.error as e:
+            server_log.warning("Error con cliente %s:%s: %s", client_addr[0], client_addr[1], e,
+                               key="conexiones")
+        
+        finally:
+            # Remover cliente del registro y de sus salas (aunque otro hilo
+            # ya lo haya dado de baja)
+            self._remove_client(record)
+            with self.lock:
+                self.rooms.leave_all(record)
+            
+            outbox.close()
+            client_sock.close()
+            server_log.info("Cliente %s:%s desconectado (%d mensajes en %.0f s)",
+                            client_addr[0], client_addr[1], record.messages_in,
+                            time.monotonic() - record.joined_at, key="conexiones")
+    
+    def handle_command(self, record, message):
+        """
+        Atiende un comando del cliente (/list, /resume, /join, /leave o /msg).
+        
+        Args:
+            record: ClientRecord del cliente
+            message (str): Comando recibido
+        """
+        if message == "/list":
+            client_list = f"Clientes conectados: {len(self.clients)}\n"
+            with self.lock:
+                client_list += self.rooms.summary()
+            record.outbox.put(encode_frame(client_list, self.framing))
+            return
+        
+        if message.split(" ", 1)[0] == "/resume":
+            with self.broadcast_lock:
+                frames = resume_frames(self.history, message, record.first_live_seq,
+                                       self.framing, record.outbox.max_messages)
+            record.outbox.put_many(frames)
+            return
+        
+        with self.lock:
+            if self.clients.get(record.id) is not record:
+                # Ya dado de baja (p. ej. desconectado por lento): no volver a indexarlo
+                return
+            reply, room, text = self.rooms.command(record, message)
+        if reply:
+            record.outbox.put(encode_frame(reply, self.framing))
+        if room:
+            full_message = f"[{room}] [{record.addr[0]}:{record.addr[1]}]: {text}\n"
+            self.broadcast_message(full_message, exclude=record, room=room)
+    
+    def broadcast_message(self, message, exclude=None, room=None):
+        """
+        Envía un mensaje a todos los clientes conectados o a los de una sala.
+        
+        Args:
+            message (str): Mensaje a enviar
+            exclude: ClientRecord a excluir del broadcast (generalmente el remitente)
+            room (str): Sala de destino (None = todos los clientes)
+        """
+        self.broadcast_messages([message], exclude, room)
+    
+    def broadcast_messages(self, messages, exclude=None, room=None):
+        """
+        Envía varios mensajes seguidos a todos los clientes o a los de una sala.
+        
+        Cada mensaje se codifica una sola vez en una trama inmutable que
+        comparten todos los destinatarios, y el lote completo se encola de
+        una vez en la cola de salida de cada uno, que lo envía con un único
+        sendmsg. Los destinatarios salen de la copia inmutable del registro
+        (o, con `room`, de los suscriptores de la sala).
+        
+        Con historial, los mensajes a todos se numeran y se copia la lista
+        de destinatarios bajo broadcast_lock; el encolado se hace fuera del
+        lock, así un cliente lento no retrasa a otras difusiones, y
+        ClientRecord.deliver reordena los lotes para que cada cliente los
+        reciba en orden. El primer número que recibe cada cliente queda en
+        su registro para /resume.
+        
+        Args:
+            messages (list): Mensajes (str) a enviar en orden
+            exclude: ClientRecord a excluir del broadcast (generalmente el remitente)
+            room (str): Sala de destino (None = todos los clientes)
+        """
+        if room is None and self.history is not None:
+            with self.broadcast_lock:
+                first_seq = self.history.next_seq
+                frames = []
+                for message in messages:
+                    frame = encode_frame(f"#{self.history.next_seq} {message}", self.framing)
+                    self.history.append(frame, exclude.id if exclude is not None else None)
+                    frames.append(frame)
+                records = self.clients.snapshot()
+                for record in records:
+                    if record.first_live_seq is None:
+                        record.first_live_seq = record.next_seq = first_seq
+            
+            for record in records:
+                if not record.deliver(first_seq, len(frames),
+                                      None if record is exclude else frames):
+                    # Cliente desconectado o expulsado por lento
+                    self._remove_client(record)
+            return
+        
+        frames = [encode_frame(message, self.framing) for message in messages]
+        if room is None:
+            records = self.clients.snapshot()
+        else:
+            with self.lock:
+                records = list(self.rooms.members(room))
+        self._deliver(frames, records, exclude)
+    
+    def _deliver(self, frames, records, exclude):
+        # Encola las tramas en cada cola y quita a los clientes que ya no las aceptan
+        for record in records:
+            if record is not exclude and not record.outbox.put_many(frames):
+                # Cliente desconectado o expulsado por lento
+                self._remove_client(record)
+    
+    def _remove_client(self, record):
+        # Quita a un cliente del registro y de sus salas. Se da de baja en el
+        # registro antes de tomar self.lock: handle_command comprueba el
+        # registro bajo self.lock, así que nadie lo vuelve a unir a una sala
+        if self.clients.remove(record):
+            with self.lock:
+                self.rooms.leave_all(record)
+    
+    def start(self):
+        """Inicia el servidor de mensajería."""
+        try:
+            server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                enable_reuse_port(server_sock)
+            server_sock.bind(('', self.port))
+            server_sock.listen(10)
+            
+            print(f"Servidor de mensajería iniciado en puerto {self.port}")
+            print("Presione Ctrl+C para detener")
+            
+            while self.running:
+                try:
+                    client_sock, client_addr = server_sock.accept()
+                    
+                    # Registrar al cliente con su cola de salida
+                    outbox = ClientOutbox(client_sock, client_addr, self.outbox_size,
+                                          self.slow_policy, self.block_ms)
+                    record = self.clients.add(client_sock, client_addr, outbox)
+                    
+                    if self.pool is not None:
+                        if not self.pool.submit(client_sock, client_addr, record.id):
+                            self._remove_client(record)
+                            outbox.close(timeout=0)
+                        continue
+                    
+                    # Crear hilo para manejar el cliente
+                    client_thread = threading.Thread(
+                        target=self.handle_client,
+                        args=(client_sock, client_addr, record.id)
+                    )
+                    client_thread.daemon = True
+                    client_thread.start()
+                
+                except KeyboardInterrupt:
+                    print("\nDeteniendo servidor de mensajería...")
+                    self.running = False
+                    if self.pool is not None:
+                        self.pool.report()
+                    break
+            
+            server_sock.close()
+            
+        except socket.error as e:
+            server_failed(f"Error del servidor de mensajería: {e}")
+
+class AsyncMessageServer:
+    """
+    Servidor de mensajería basado en asyncio.
+    
+    Mismo protocolo que MessageServer (bienvenida, /list, /quit, salas,
+    historial con /resume y tramas "line" o "length"), pero todos los
+    clientes se atienden desde un único hilo con un bucle de eventos:
+    cada cliente conectado cuesta una
+    corrutina y sus buffers, no un hilo con su pila. Así un proceso mantiene
+    decenas de miles de conexiones mayormente inactivas.
+    
+    La memoria por cliente está acotada: la lectura admite mensajes de hasta
+    MAX_MESSAGE_SIZE bytes y el buffer de salida del transporte hasta
+    `max_buffer` bytes. Si un cliente lento lo supera, con la política
+    "drop_client" se le desconecta; con cualquier otra se descartan los
+    mensajes nuevos para él hasta que se vacíe.
+    """
+    
+    def __init__(self, port, reuse_port=False, max_clients=100000, max_buffer=256 * 1024,
+                 slow_policy="drop_oldest", framing="line", history=256):
+        if framing not in FRAMINGS:
+            raise ValueError(f"Trama desconocida: {framing}")
+        self.port = port
+        self.reuse_port = reuse_port
+        self.max_clients = max_clients
+        self.max_buffer = max_buffer
+        self.slow_policy = slow_policy
+        self.framing = framing
+        self.clients = {}  # StreamWriter de cada cliente -> dirección
+        self.rooms = RoomIndex()  # Salas y sus suscriptores
+        # Últimos mensajes numerados (None = sin historial)
+        self.history = MessageHistory(history) if history else None
+        self.first_live_seq = {}  # StreamWriter -> primer número recibido en vivo
+        self.sessions = {}  # StreamWriter -> sesión (para /resume N <sesión>)
+        self._next_session = 1
+        self.dropped = 0
+    
+    async def read_message(self, reader):
+        """
+        Lee un mensaje completo según la trama del servidor.
+        
+        Returns:
+            bytes: Mensaje sin delimitador, o None si el cliente cerró
+        
+        Raises:
+            ValueError: Si el mensaje supera MAX_MESSAGE_SIZE
+        """
+        try:
+            if self.framing == "length":
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (size,) = FRAME_HEADER.unpack(header)
+                if size > MAX_MESSAGE_SIZE:
+                    raise ValueError(f"Mensaje de {size} bytes mayor que {MAX_MESSAGE_SIZE}")
+                return await reader.readexactly(size)
+            
+            line = await reader.readuntil(b"\n")
+            return line.rstrip(b"\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise ValueError(f"Mensaje mayor que {MAX_MESSAGE_SIZE} bytes")
+    
+    def send(self, writer, data):
+        """
+        Escribe datos ya codificados sin esperar, respetando `max_buffer`.
+        
+        Returns:
+            bool: False si los datos no se enviaron
+        """
+        transport = writer.transport
+        if transport.is_closing():
+            return False
+        if transport.get_write_buffer_size() > self.max_buffer:
+            if self.slow_policy == "drop_client":
+                server_log.warning("Cliente %s:%s desconectado por lento", *self.clients[writer][:2],
+                                   key="conexiones")
+                transport.abort()
+            else:
+                self.dropped += 1
+            return False
+        writer.write(data)
+        return True
+    
+    def broadcast_message(self, message, exclude=None, room=None):
+        """
+        Envía un mensaje a todos los clientes conectados salvo `exclude`.
+        
+        El mensaje se codifica una sola vez; cada envío solo agrega los datos
+        al buffer del transporte, así que nunca bloquea el bucle. Con `room`
+        solo se recorren los suscriptores de la sala.
+        
+        Args:
+            message (str): Mensaje a enviar
+            exclude: StreamWriter a excluir (generalmente el remitente)
+            room (str): Sala de destino (None = todos los clientes)
+        """
+        if room is None and self.history is not None:
+            data = encode_frame(f"#{self.history.next_seq} {message}", self.framing)
+            self.history.append(data, self.sessions.get(exclude))
+        else:
+            data = encode_frame(message, self.framing)
+        recipients = self.clients if room is None else self.rooms.members(room)
+        for writer in list(recipients):
+            if writer is not exclude:
+                self.send(writer, data)
+    
+    async def handle_client(self, reader, writer):
+        """
+        Corrutina que atiende a un cliente hasta que se desconecta.
+        
+        Args:
+            reader: asyncio.StreamReader del cliente
+            writer: asyncio.StreamWriter del cliente
+        """
+        client_addr = writer.get_extra_info("peername")
+        
+        if len(self.clients) >= self.max_clients:
+            writer.write(encode_frame("Servidor lleno, intente más tarde", self.framing))
+            writer.close()
+            return
+        
+        self.clients[writer] = client_addr
+        self.sessions[writer] = session = self._next_session
+        self._next_session += 1
+        last_seq = None
+        if self.history is not None:
+            self.first_live_seq[writer] = self.history.next_seq
+            last_seq = self.history.next_seq - 1
+        server_log.info("Cliente %s:%s conectado", client_addr[0], client_addr[1], key="conexiones")
+        
+        try:
+            self.send(writer, encode_frame(message_welcome(len(self.clients), session, last_seq),
+                                           self.framing))
+            
+            while True:
+                data = await self.read_message(reader)
+                if data is None:
+                    break
+                
+                message = data.decode('utf-8', errors='replace').strip()
+                
+                if message == "/quit":
+                    break
+                elif message == "/list":
+                    client_list = f"Clientes conectados: {len(self.clients)}\n" + self.rooms.summary()
+                    self.send(writer, encode_frame(client_list, self.framing))
+                elif message.split(" ", 1)[0] == "/resume":
+                    for frame in resume_frames(self.history, message,
+                                               self.first_live_seq.get(writer), self.framing):
+                        self.send(writer, frame)
+                elif message.split(" ", 1)[0] in RoomIndex.COMMANDS:
+                    reply, room, text = self.rooms.command(writer, message)
+                    if reply:
+                        self.send(writer, encode_frame(reply, self.framing))
+                    if room:
+                        full_message = f"[{room}] [{client_addr[0]}:{client_addr[1]}]: {text}\n"
+                        self.broadcast_message(full_message, exclude=writer, room=room)
+                elif message:
+                    full_message = f"[{client_addr[0]}:{client_addr[1]}]: {message}\n"
+                    self.broadcast_message(full_message, exclude=writer)
+        
+        except ValueError as e:
+            server_log.warning("Cliente %s:%s: %s", client_addr[0], client_addr[1], e,
+                               key="conexiones")
+        except (ConnectionError, OSError) as e:
+            server_log.warning("Error con cliente %s:%s: %s", client_addr[0], client_addr[1], e,
+                               key="conexiones")
+        
+        finally:
+            self.clients.pop(writer, None)
+            self.first_live_seq.pop(writer, None)
+            self.sessions.pop(writer, None)
+            self.rooms.leave_all(writer)
+            writer.close()
+            server_log.info("Cliente %s:%s desconectado", client_addr[0], client_addr[1],
+                            key="conexiones")
+    
+    async def serve(self):
+        """Crea el socket de escucha y atiende clientes indefinidamente."""
+        # Cada cliente consume un descriptor: subir el límite si hace falta
+        self.max_clients = _clamp_concurrency(self.max_clients)
+        server = await asyncio.start_server(
+            self.handle_client, port=self.port, backlog=socket.SOMAXCONN,
+            limit=MAX_MESSAGE_SIZE, reuse_address=True, reuse_port=self.reuse_port or None)
+        
+        print(f"Servidor de mensajería (asyncio) iniciado en puerto {self.port}")
+        print(f"Clientes simultáneos como máximo: {self.max_clients}")
+        print("Presione Ctrl+C para detener")
+        
+        async with server:
+            await server.serve_forever()
+    
+    def start(self):
+        """Inicia el servidor de mensajería asyncio."""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print("\nDeteniendo servidor de mensajería...")
+        except OSError as e:
+            server_failed(f"Error del servidor de mensajería: {e}")
+
+def message_client(host, port, framing="line", messages=None, batch_size=64, reconnect_attempts=5):
+    """
+    Cliente para el sistema de mensajería.
+    
+    Permite al usuario enviar y recibir mensajes en tiempo real.
+    
+    Los mensajes se envían y se leen con la trama indicada (debe coincidir
+    con la del servidor), así que se pueden enviar varios seguidos sin
+    esperar respuesta. Si se pasa `messages`, el cliente no es interactivo:
+    envía los mensajes en lotes de `batch_size` tramas por envío y termina
+    con /quit.
+    
+    En modo interactivo, si la conexión se pierde el cliente se reconecta
+    (hasta `reconnect_attempts` intentos con espera creciente) y pide con
+    "/resume N" los mensajes numerados que se perdió desde el último #N
+    recibido.
+    
+    Args:
+        host (str): Dirección del servidor
+        port (int): Puerto del servidor
+        framing (str): "line" o "length"
+        messages: Iterable de mensajes (str) a enviar sin interacción
+        batch_size (int): Tramas agrupadas en cada envío en modo no interactivo
+        reconnect_attempts (int): Intentos de reconexión (0 = no reconectar)
+    """
+    print(f"\n=== Cliente de mensajería conectando a {host}:{port} ===")
+    
+    try:
+        sock = happy_eyeballs_connect(host, port)
+        # Conexión actual, último #N recibido y sesión asignada por el servidor
+        state = {"sock": sock, "last_seq": 0, "session": None}
+        closing = threading.Event()
+        if messages is not None:
+            closing.set()  # Sin interacción no se reconecta
+        
+        def reconnect():
+            for attempt in range(reconnect_attempts):
+                delay = min(0.5 * 2 ** attempt, 10.0)
+                print(f"Conexión perdida; reconectando en {delay:.1f} s "
+                      f"(intento {attempt + 1}/{reconnect_attempts})...")
+                time.sleep(delay)
+                if closing.is_set():
+                    return None
+                try:
+                    return happy_eyeballs_connect(host, port)
+                except socket.error:
+                    pass
+            return None
+        
+        # Función para recibir mensajes en un hilo separado
+        def receive_messages():
+            reader = FrameReader(state["sock"], framing)
+            while True:
+                try:
+                    for data in reader:
+                        seq = message_sequence(data)
+                        if seq is not None:
+                            state["last_seq"] = max(state["last_seq"], seq)
+                        session = welcome_session(data)
+                        if session is not None:
+                            # Lo anterior a la bienvenida no se pide al reconectar: al
+                            # conectarse es historia ajena y al reconectarse ya se
+                            # pidió con /resume antes de leer esta bienvenida
+                            state["session"] = session[0]
+                            state["last_seq"] = max(state["last_seq"], session[1])
+                        print(data.decode('utf-8', errors='replace'))
+                except (socket.error, ValueError):
+                    pass
+                
+                if closing.is_set():
+                    return
+                new_sock = reconnect()
+                if new_sock is None:
+                    print("No se pudo reconectar al servidor de mensajería")
+                    return
+                state["sock"].close()
+                state["sock"] = new_sock
+                reader = FrameReader(new_sock, framing)
+                # Con la sesión anterior el servidor omite los mensajes propios
+                resume = f"/resume {state['last_seq']}"
+                if state["session"] is not None:
+                    resume += f" {state['session']}"
+                try:
+                    new_sock.sendall(encode_frame(resume, framing))
+                except socket.error:
+                    pass
+                print(f"Reconectado; recuperando mensajes posteriores a #{state['last_seq']}")
+        
+        # Iniciar hilo receptor
+        receive_thread = threading.Thread(target=receive_messages)
+        receive_thread.daemon = True
+        receive_thread.start()
+        
+        if messages is not None:
+            # Modo no interactivo: varias tramas por cada sendall
+            sent = 0
+            batch = []
+            for message in messages:
+                message = message.rstrip("\r\n")
+                if not message:
+                    continue
+                batch.append(encode_frame(message, framing))
+                if len(batch) >= batch_size:
+                    sock.sendall(b"".join(batch))
+                    sent += len(batch)
+                    batch.clear()
+            batch.append(encode_frame("/quit", framing))
+            sock.sendall(b"".join(batch))
+            sent += len(batch) - 1
+            receive_thread.join(timeout=2.0)
+            sock.close()
+            print(f"Mensajes enviados: {sent}")
+            return
+        
+        # Bucle principal para enviar mensajes
+        print("Conectado al servidor de mensajería")
+        print("Escriba sus mensajes (Ctrl+C para salir):")
+        
+        while True:
+            try:
+                message = input()
+                if message:
+                    if message == "/quit":
+                        closing.set()
+                    try:
+                        state["sock"].sendall(encode_frame(message, framing))
+                    except socket.error:
+                        print("Sin conexión con el servidor; mensaje no enviado")
+                    if message == "/quit":
+                        break
+            except (KeyboardInterrupt, EOFError):
+                closing.set()
+                try:
+                    state["sock"].sendall(encode_frame("/quit", framing))
+                except socket.error:
+                    pass
+                break
+        
+        state["sock"].close()
+        
+    except socket.error as e:
+        print(f"Error del cliente de mensajería: {e}")
+
+def message_swarm(host, port, clients=10000, framing="line", connect_concurrency=500, timeout=30):
+    """
+    Prueba de capacidad del servidor de mensajería con muchos clientes.
+    
+    Abre `clients` conexiones simultáneas con asyncio (como mucho
+    `connect_concurrency` conexiones a la vez en curso), las mantiene
+    abiertas y, cuando todas están conectadas, uno de los clientes envía un
+    mensaje. Comprueba cuántos de los demás lo reciben y cuánto tarda en
+    llegar al último. Sirve para verificar que el servidor sostiene miles de
+    conexiones mayormente inactivas.
+    
+    Args:
+        host (str): Servidor de mensajería
+        port (int): Puerto del servidor
+        clients (int): Número de clientes a conectar
+        framing (str): "line" o "length" (debe coincidir con el servidor)
+        connect_concurrency (int): Conexiones en curso como máximo al conectar
+        timeout (float): Espera máxima de cada fase en segundos
+    
+    Returns:
+        dict: "connected", "received", "connect_time" y "fanout_time"
+    """
+    print(f"\n=== Enjambre de {clients} clientes contra {host}:{port} ===")
+    clients = _clamp_concurrency(clients)
+    address = resolve_address(host, port)
+    token = f"enjambre-{os.getpid()}-{time.time():.0f}".encode('ascii')
+    
+    async def read_frame(reader):
+        if framing == "length":
+            (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+            return await reader.readexactly(size)
+        return (await reader.readuntil(b"\n")).rstrip(b"\r\n")
+    
+    async def run():
+        gate = asyncio.Semaphore(connect_concurrency)
+        
+        async def connect():
+            async with gate:
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.open_connection(address[0], address[1], limit=MAX_MESSAGE_SIZE),
+                        timeout)
+                except (OSError, asyncio.TimeoutError):
+                    return None
+        
+        started = time.perf_counter()
+        results = await asyncio.gather(*(connect() for _ in range(clients)))
+        connections = [conn for conn in results if conn is not None]
+        connect_time = time.perf_counter() - started
+        print(f"Conectados: {len(connections)}/{clients} en {connect_time:.2f} s")
+        if len(connections) < 2:
+            return len(connections), 0, connect_time, 0.0
+        
+        async def wait_token(reader):
+            try:
+                # El servidor antepone la dirección del remitente
+                while not (await read_frame(reader)).endswith(token):
+                    pass
+                return True
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+                return False
+        
+        # Un connect completado no implica que el servidor ya aceptara la
+        # conexión: esperar a que /list cuente a todos los clientes
+        sender_reader, sender = connections[0]
+        deadline = time.perf_counter() + timeout
+        try:
+            while time.perf_counter() < deadline:
+                sender.write(encode_frame("/list", framing))
+                frame = await read_frame(sender_reader)
+                while not frame.startswith(b"Clientes conectados:"):
+                    frame = await read_frame(sender_reader)
+                if int(frame.split(b"\n")[0].split(b":")[1]) >= len(connections):
+                    break
+                await asyncio.sleep(0.2)
+        except (asyncio.IncompleteReadError, OSError) as e:
+            print(f"Error esperando a que el servidor acepte a todos los clientes: {e}")
+            for _, writer in connections:
+                writer.close()
+            return len(connections), 0, connect_time, 0.0
+        
+        waiters = [asyncio.ensure_future(wait_token(reader)) for reader, _ in connections[1:]]
+        started = time.perf_counter()
+        sender.write(encode_frame(token, framing))
+        done, pending = await asyncio.wait(waiters, timeout=timeout)
+        fanout_time = time.perf_counter() - started
+        received = sum(1 for task in done if task.result())
+        for task in pending:
+            task.cancel()
+        
+        for _, writer in connections:
+            writer.close()
+        return len(connections), received, connect_time, fanout_time
+    
+    connected, received, connect_time, fanout_time = asyncio.run(run())
+    if connected > 1:
+        print(f"Mensaje recibido por {received}/{connected - 1} clientes en {fanout_time * 1000:.1f} ms")
+    return {"connected": connected, "received": received,
+            "connect_time": connect_time, "fanout_time": fanout_time}
+
+def broadcast_benchmark(clients=100, messages=2000, size=64, batch=16):
+    """
+    Mide el costo de la difusión por mensaje entregado.
+    
+    Conecta `clients` pares de sockets locales (socketpair), cada uno con un
+    hilo lector que consume lo recibido, y difunde `messages` mensajes de
+    `size` bytes a todos de tres formas:
+    
+    - "por cliente": como el servidor original, codificando el mensaje para
+      cada destinatario y con un send por mensaje y cliente.
+    - "compartido": como MessageServer con un mensaje por recv, codificando
+      una sola vez y encolando la misma trama en el ClientOutbox de cada
+      cliente.
+    - "lotes": como MessageServer cuando un cliente envía en pipeline; los
+      mensajes llegan de `batch` en `batch` y cada lote se entrega a cada
+      cliente con un único sendmsg (broadcast_messages).
+    
+    Para cada forma informa llamadas al sistema de envío y tiempo de CPU
+    del proceso por mensaje entregado, además del caudal.
+    
+    Args:
+        clients (int): Número de destinatarios
+        messages (int): Mensajes a difundir
+        size (int): Tamaño de cada mensaje en bytes
+        batch (int): Mensajes por lote en la forma "lotes"
+    
+    Returns:
+        dict: Por cada forma ("per_client", "shared", "batched"),
+            "syscalls_per_message", "cpu_us_per_message" y "messages_per_second"
+    """
+    print(f"\n=== Difusión de {messages} mensajes de {size} bytes a {clients} clientes ===")
+    message = "x" * (size - 1)
+    frame = encode_frame(message)
+    expected = len(frame) * messages
+    
+    def drain(sock):
+        remaining = expected
+        while remaining > 0:
+            data = sock.recv(65536)
+            if not data:
+                break
+            remaining -= len(data)
+    
+    def run(label, broadcast):
+        pairs = [socket.socketpair() for _ in range(clients)]
+        readers = [threading.Thread(target=drain, args=(receiver,), daemon=True)
+                   for _, receiver in pairs]
+        for reader in readers:
+            reader.start()
+        senders = [sender for sender, _ in pairs]
+        
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        syscalls = broadcast(senders)
+        for reader in readers:
+            reader.join()
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        
+        for sender, receiver in pairs:
+            sender.close()
+            receiver.close()
+        delivered = clients * messages
+        result = {"syscalls_per_message": syscalls / delivered,
+                  "cpu_us_per_message": cpu * 1e6 / delivered,
+                  "messages_per_second": delivered / elapsed}
+        print(f"{label:<12} {result['syscalls_per_message']:>9.3f} syscalls/msg  "
+              f"{result['cpu_us_per_message']:>7.2f} µs CPU/msg  "
+              f"{result['messages_per_second']:>10.0f} msg/s")
+        return result
+    
+    def per_client(senders):
+        for _ in range(messages):
+            for sock in senders:
+                sock.sendall((message + "\n").encode('utf-8'))
+        return len(senders) * messages
+    
+    def shared(senders, batch_size):
+        outboxes = [ClientOutbox(sock, ("socketpair", index), max_messages=messages)
+                    for index, sock in enumerate(senders)]
+        for first in range(0, messages, batch_size):
+            frames = [encode_frame(message) for _ in range(min(batch_size, messages - first))]
+            for outbox in outboxes:
+                outbox.put_many(frames)
+        for outbox in outboxes:
+            outbox.close(timeout=None)
+        return sum(outbox.syscalls for outbox in outboxes)
+    
+    return {"per_client": run("por cliente", per_client),
+            "shared": run("compartido", lambda senders: shared(senders, 1)),
+            "batched": run(f"lotes de {batch}", lambda senders: shared(senders, batch))}
+
+# =============================================================================
+# EJERCICIO 8: Sistema de transferencia de archivos
+# =============================================================================
+
+class FileTransferServer:
+    """
+    Servidor para transferencia de archivos entre clientes.
+    
+    Implementa el Ejercicio 8 del documento.
+    Los clientes pueden listar archivos disponibles y descargarlos.
+    """
+    
+    def __init__(self, port, shared_directory="shared_files", reuse_port=False,
+                 max_workers=None, queue_size=64, overload="reject"):
+        self.port = port
+        self.shared_directory = shared_directory
+        self.reuse_port = reuse_port
+        self.running = True
+        # Con max_workers los clientes se atienden en un pool acotado (ver WorkerPool)
+        self.pool = (WorkerPool(self.handle_client, max_workers, queue_size, overload, name='archivos')
+                     if max_workers else None)
+        
+        # Crear directorio compartido si no existe
+        if not os.path.exists(shared_directory):
+            # exist_ok: varios procesos trabajadores pueden crearlo a la vez
+            os.makedirs(shared_directory, exist_ok=True)
+            print(f"Directorio compartido creado: {shared_directory}")
+    
+    def handle_client(self, client_sock, client_addr):
+        """
+        Maneja las solicitudes de transferencia de archivos de un cliente.
+        
+        Args:
+            client_sock: Socket del cliente
+            client_addr: Dirección del cliente
+        """
+        server_log.info("Cliente de archivos %s:%s conectado", client_addr[0], client_addr[1],
+                        key="conexiones")
+        
+        try:
+            # Enviar menú de comandos
+            menu = "=== Servidor de Transferencia de Archivos ===\n"
+            menu += "Comandos disponibles:\n"
+            menu += "  LIST - Listar archivos disponibles\n"
+            menu += "  GET <filename> - Descargar archivo\n"
+            menu += "  QUIT - Desconectarse\n\n"
+            
+            client_sock.send(menu.encode('utf-8'))
+            
+            while self.running:
+                # Recibir comando del cliente
+                data = client_sock.recv(1024)
+                if not data:
+                    break
+                
+                command = data.decode('utf-8').strip().upper()
+                
+                if command == "QUIT":
+                    break
+                elif command == "LIST":
+                    self.send_file_list(client_sock)
+                elif command.startswith("GET "):
+                    filename = command[4:].strip()
+                    self.send_file(client_sock, filename)
+                else:
+                    error_msg = "Comando no reconocido. Use LIST, GET <filename>, o QUIT\n"
+                    client_sock.send(error_msg.encode('utf-8'))
+        
+        except socket.error as e:
+            server_log.warning("Error con cliente de archivos %s:%s: %s",
+                               client_addr[0], client_addr[1], e, key="conexiones")
+        
+        finally:
+            client_sock.close()
+            server_log.info("Cliente de archivos %s:%s desconectado", client_addr[0], client_addr[1],
+                            key="conexiones")
+    
+    def send_file_list(self, client_sock):
+        """
+        Envía la lista de archivos disponibles al cliente.
+        
+        Args:
+            client_sock: Socket del cliente
+        """
+        try:
+            files = os.listdir(self.shared_directory)
+            
+            if not files:
+                response = "No hay archivos disponibles\n"
+            else:
+                response = "Archivos disponibles:\n"
+                for i, filename in enumerate(files, 1):
+                    file_path = os.path.join(self.shared_directory, filename)
+                    file_size = os.path.getsize(file_path)
+                    response += f"  {i}. {filename} ({file_size} bytes)\n"
+            
+            response += "\n"
+            client_sock.send(response.encode('utf-8'))
+            
+        except Exception as e:
+            error_msg = f"Error al listar archivos: {e}\n"
+            client_sock.send(error_msg.encode('utf-8'))
+    
+    def send_file(self, client_sock, filename):
+        """
+        Envía un archivo específico al cliente.
+        
+        Args:
+            client_sock: Socket del cliente
+            filename: Nombre del archivo a enviar
+        """
+        file_path = os.path.join(self.shared_directory, filename)
+        
+        try:
+            if not os.path.exists(file_path):
+                error_msg = f"Archivo '{filename}' no encontrado\n"
+                client_sock.send(error_msg.encode('utf-8'))
+                return
+            
+            file_size = os.path.getsize(file_path)
+            
+            # Enviar información del archivo
+            file_info = f"SENDING_FILE:{filename}:{file_size}\n"
+            client_sock.send(file_info.encode('utf-8'))
+            
+            # Esperar confirmación del cliente
+            confirmation = client_sock.recv(1024).decode('utf-8').strip()
+            
+            if confirmation == "READY":
+                # Enviar contenido del archivo
+                with open(file_path, 'rb') as f:
+                    while True:
+                        chunk = f.read(4096)  # Leer en chunks de 4KB
+                        if not chunk:
+                            break
+                        client_sock.send(chunk)
+                
+                server_log.info("Archivo '%s' enviado exitosamente", filename, key="mensajes")
+            
+        except Exception as e:
+            error_msg = f"Error al enviar archivo: {e}\n"
+            client_sock.send(error_msg.encode('utf-8'))
+    
+    def start(self):
+        """Inicia el servidor de transferencia de archivos."""
+        try:
+            server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                enable_reuse_port(server_sock)
+            server_sock.bind(('', self.port))
+            server_sock.listen(5)
+            
+            print(f"Servidor de archivos iniciado en puerto {self.port}")
+            print(f"Directorio compartido: {self.shared_directory}")
+            print("Presione Ctrl+C para detener")
+            
+            while self.running:
+                try:
+                    client_sock, client_addr = server_sock.accept()
+                    
+                    if self.pool is not None:
+                        self.pool.submit(client_sock, client_addr)
+                        continue
+                    
+                    # Crear hilo para manejar el cliente
+                    client_thread = threading.Thread(
+                        target=self.handle_client,
+                        args=(client_sock, client_addr)
+                    )
+                    client_thread.daemon = True
+                    client_thread.start()
+                
+                except KeyboardInterrupt:
+                    print("\nDeteniendo servidor de archivos...")
+                    self.running = False
+                    if self.pool is not None:
+                        self.pool.report()
+                    break
+            
+            server_sock.close()
+            
+        except socket.error as e:
+            server_failed(f"Error del servidor de archivos: {e}")
+
+def file_transfer_client(host, port, download_directory="downloads"):
+    """
+    Cliente para transferencia de archivos.
+    
+    Permite listar y descargar archivos del servidor.
+    
+    Args:
+        host (str): Dirección del servidor
+        port (int): Puerto del servidor
+        download_directory (str): Directorio local para descargas
+    """
+    print(f"\n=== Cliente de transferencia de archivos conectando a {host}:{port} ===")
+    
+    # Crear directorio de descargas si no existe
+    if not os.path.exists(download_directory):
+        os.makedirs(download_directory)
+        print(f"Directorio de descargas creado: {download_directory}")
+    
+    try:
+        sock = happy_eyeballs_connect(host, port)
+        
+        # Recibir menú del servidor
+        menu = sock.recv(1024).decode('utf-8')
+        print(menu)
+        
+        while True:
+            try:
+                command = input("Comando: ").strip()
+                
+                if not command:
+                    continue
+                
+                sock.send(command.encode('utf-8'))
+                
+                if command.upper() == "QUIT":
+                    break
+                elif command.upper().startswith("GET "):
+                    # Manejar descarga de archivo
+                    self.handle_file_download(sock, download_directory)
+                else:
+                    # Recibir respuesta del servidor
+                    response = sock.recv(4096).decode('utf-8')
+                    print(response)
+            
+            except KeyboardInterrupt:
+                sock.send("QUIT".encode('utf-8'))
+                break
+        
+        sock.close()
+        
+    except socket.error as e:
+        print(f"Error del cliente de archivos: {e}")
+    
+    def handle_file_download(self, sock, download_directory):
+        """
+        Maneja la descarga de un archivo del servidor.
+        
+        Args:
+            sock: Socket conectado al servidor
+            download_directory: Directorio donde guardar el archivo
+        """
+        try:
+            # Recibir información del archivo
+            file_info = sock.recv(1024).decode('utf-8').strip()
+            
+            if file_info.startswith("SENDING_FILE:"):
+                parts = file_info.split(":")
+                filename = parts[1]
+                file_size = int(parts[2])
+                
+                print(f"Descargando '{filename}' ({file_size} bytes)...")
+                
+                # Confirmar que estamos listos para recibir
+                sock.send("READY".encode('utf-8'))
+                
+                # Recibir y guardar el archivo
+                file_path = os.path.join(download_directory, filename)
+                
+                with open(file_path, 'wb') as f:
+                    bytes_received = 0
+                    
+                    while bytes_received < file_size:
+                        chunk = sock.recv(min(4096, file_size - bytes_received))
+                        if not chunk:
+                            break
+                        
+                        f.write(chunk)
+                        bytes_received += len(chunk)
+                        
+                        # Mostrar progreso
+                        progress = (bytes_received / file_size) * 100
+                        print(f"\rProgreso: {progress:.1f}%", end='', flush=True)
+                
+                print(f"\nArchivo descargado exitosamente: {file_path}")
+            else:
+                # Mensaje de error del servidor
+                print(file_info)
+        
+        except Exception as e:
+            print(f"Error durante la descarga: {e}")
+
+# =============================================================================
+# FUNCIONES DE DEMOSTRACIÓN Y MENÚ PRINCIPAL
+# =============================================================================
+
+def create_sample_files():
+    """Crea archivos de ejemplo para el servidor de transferencia."""
+    shared_dir = "shared_files"
+    
+    if not os.path.exists(shared_dir):
+        os.makedirs(shared_dir)
+    
+    # Crear algunos archivos de ejemplo
+    files_to_create = [
+        ("ejemplo.txt", "Este es un archivo de ejemplo para transferencia.\nContiene varias líneas de texto.\n"),
+        ("datos.csv", "nombre,edad,ciudad\nJuan,25,Concepción del Uruguay\nMaría,30,Buenos Aires\n"),
+        ("info.md", "# Archivo Markdown\n\nEste es un ejemplo de archivo **Markdown**.\n\n- Item 1\n- Item 2\n")
+    ]
+    
+    for filename, content in files_to_create:
+        file_path = os.path.join(shared_dir, filename)
+        if not os.path.exists(file_path):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+    
+    print(f"Archivos de ejemplo creados en {shared_dir}")
+
+def demo_menu():
+    """Menú principal para demostrar todos los ejercicios."""
+    print("\n" + "="*60)
+    print("IMPLEMENTACIÓN DE SOCKETS TCP - LABORATORIO PRÁCTICO")
+    print("Basado en el documento LAB_SocketsTCP.pdf")
+    print("="*60)
+    
+    while True:
+        print("\n--- MENÚ PRINCIPAL ---")
+        print("1.  Escanear puertos (Ejercicio 1)")
+        print("2.  Información de conexión (Ejercicio 2)")
+        print("3.  Cliente Daytime (Ejercicio 3)")
+        print("4.  Cliente Echo (Ejercicio 4)")
+        print("5.  Servidor básico (Ejercicios 5-6)")
+        print("6.  Cliente básico (Ejercicios 5-6)")
+        print("7.  Servidor de mensajería (Ejercicio 7)")
+        print("8.  Cliente de mensajería (Ejercicio 7)")
+        print("9.  Servidor de archivos (Ejercicio 8)")
+        print("10. Cliente de archivos (Ejercicio 8)")
+        print("11. Crear archivos de ejemplo")
+        print("0.  Salir")
+        
+        try:
+            option = input("\nSeleccione una opción: ").strip()
+            
+            if option == "0":
+                print("¡Hasta luego!")
+                break
+            elif option == "1":
+                host = input("Host a escanear (localhost): ").strip() or "localhost"
+                scan_ports(host, 1, 100)  # Rango reducido para demo
+            elif option == "2":
+                host = input("Host (google.com): ").strip() or "google.com"
+                port = int(input("Puerto (80): ").strip() or "80")
+                connection_info(host, port)
+            elif option == "3":
+                host = input("Servidor daytime (time.nist.gov): ").strip() or "time.nist.gov"
+                daytime_client(host)
+            elif option == "4":
+                host = input("Servidor echo (localhost): ").strip() or "localhost"
+                port = int(input("Puerto (7): ").strip() or "7")
+                echo_client(host, port)
+            elif option == "5":
+                port = int(input("Puerto del servidor (8000): ").strip() or "8000")
+                basic_server(port)
+            elif option == "6":
+                host = input("Host del servidor (localhost): ").strip() or "localhost"
+                port = int(input("Puerto del servidor (8000): ").strip() or "8000")
+                basic_client(host, port)
+            elif option == "7":
+                port = int(input("Puerto del servidor de mensajería (9000): ").strip() or "9000")
+                server = MessageServer(port)
+                server.start()
+            elif option == "8":
+                host = input("Host del servidor (localhost): ").strip() or "localhost"
+                port = int(input("Puerto del servidor (9000): ").strip() or "9000")
+                message_client(host, port)
+            elif option == "9":
+                port = int(input("Puerto del servidor de archivos (9001): ").strip() or "9001")
+                server = FileTransferServer(port)
+                server.start()
+            elif option == "10":
+                host = input("Host del servidor (localhost): ").strip() or "localhost"
+                port = int(input("Puerto del servidor (9001): ").strip() or "9001")
+                file_transfer_client(host, port)
+            elif option == "11":
+                create_sample_files()
+            else:
+                print("Opción no válida. Intente nuevamente.")
+        
+        except KeyboardInterrupt:
+            print("\n\nInterrumpido por el usuario.")
+            break
+        except ValueError:
+            print("Error: Ingrese un número válido.")
+        except Exception as e:
+            print(f"Error: {e}")
+
+# =============================================================================
+# FUNCIONES AUXILIARES Y UTILIDADES
+# =============================================================================
+
+class ServerLog:
+    """
+    Registro asíncrono para los bucles de los servidores.
+    
+    Escribir en stdout con print() por cada conexión o mensaje convierte la
+    consola en el cuello de botella del servidor. Aquí el hilo que atiende
+    al cliente solo comprueba el nivel, aplica el límite de su clave y
+    encola el mensaje sin formatear; un hilo escritor en segundo plano
+    formatea los mensajes y los escribe por lotes. La cola es acotada: si se
+    llena, los mensajes se descartan y se cuentan en lugar de bloquear al
+    servidor. Cada clave de evento puede limitarse a N mensajes por segundo;
+    los omitidos se resumen en una sola línea, que el hilo escritor emite
+    al cerrarse la ventana aunque no lleguen más eventos de esa clave.
+    """
+    
+    DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+    LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+    PREFIXES = {WARNING: "AVISO: ", ERROR: "ERROR: "}
+    BATCH = 512  # Mensajes escritos como máximo por llamada a write
+    
+    def __init__(self, level=INFO, max_queue=10000, stream=None):
+        """
+        Args:
+            level (int): Nivel mínimo de los mensajes registrados
+            max_queue (int): Mensajes pendientes como máximo
+            stream: Destino de escritura (por defecto sys.stdout)
+        """
+        self.level = level
+        self.stream = stream
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._limits = {}  # clave -> [máximo por segundo, inicio de ventana, emitidos, omitidos]
+        self._limits_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def set_rate(self, key, per_second):
+        """
+        Limita los mensajes de una clave de evento a `per_second` por segundo.
+        
+        Args:
+            key (str): Clave de evento (por ejemplo "conexiones")
+            per_second (int): Máximo de mensajes por segundo (None = sin límite)
+        """
+        with self._limits_lock:
+            if per_second is None:
+                self._limits.pop(key, None)
+            else:
+                self._limits[key] = [per_second, 0.0, 0, 0]
+    
+    def enabled(self, level):
+        """Indica si se registran los mensajes de `level` (para evitar trabajo previo)."""
+        return level >= self.level
+    
+    def log(self, level, message, *args, key=None):
+        """
+        Encola un mensaje; `message % args` se evalúa en el hilo escritor.
+        
+        Args:
+            level (int): Nivel del mensaje
+            message (str): Mensaje o plantilla con formato %
+            *args: Argumentos de la plantilla
+            key (str): Clave de evento para aplicar su límite por segundo
+        """
+        if level < self.level:
+            return
+        
+        if key is not None and self._limits:
+            summary = None
+            suppressed = False
+            with self._limits_lock:
+                limit = self._limits.get(key)
+                if limit is not None:
+                    now = time.monotonic()
+                    if now - limit[1] >= 1.0:
+                        summary = self._close_window(key, limit, now)
+                    if limit[2] >= limit[0]:
+                        limit[3] += 1
+                        suppressed = True
+                    else:
+                        limit[2] += 1
+            if summary:
+                self._enqueue(summary)
+            if suppressed:
+                return
+        
+        self._enqueue((level, message, args))
+    
+    def debug(self, message, *args, key=None):
+        self.log(self.DEBUG, message, *args, key=key)
+    
+    def info(self, message, *args, key=None):
+        self.log(self.INFO, message, *args, key=key)
+    
+    def warning(self, message, *args, key=None):
+        self.log(self.WARNING, message, *args, key=key)
+    
+    def error(self, message, *args, key=None):
+        self.log(self.ERROR, message, *args, key=key)
+    
+    def close(self, timeout=2.0):
+        """Escribe los mensajes pendientes y detiene el hilo escritor."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _close_window(self, key, limit, now):
+        """Abre una ventana nueva para `key` y devuelve el resumen de la anterior (con el lock tomado)."""
+        omitted = limit[3]
+        limit[1], limit[2], limit[3] = now, 0, 0
+        if omitted:
+            return (self.INFO, "[%s] %d mensajes omitidos en el último segundo", (key, omitted))
+        return None
+    
+    def _expired_summaries(self):
+        """Resúmenes de las ventanas vencidas con mensajes omitidos."""
+        now = time.monotonic()
+        with self._limits_lock:
+            return [self._close_window(key, limit, now) for key, limit in self._limits.items()
+                    if limit[3] and now - limit[1] >= 1.0]
+    
+    def _enqueue(self, item):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._writer, daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _writer(self):
+        """Hilo escritor: formatea y escribe los mensajes en lotes."""
+        while True:
+            # La espera se corta cada segundo para emitir los resúmenes de
+            # claves limitadas que no han vuelto a registrar nada
+            try:
+                batch = [self._queue.get(timeout=1.0)]
+            except queue.Empty:
+                batch = []
+            batch.extend(self._expired_summaries())
+            while len(batch) < self.BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            lines = []
+            stop = False
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                level, message, args = item
+                try:
+                    text = message % args if args else message
+                except (TypeError, ValueError):
+                    text = f"{message} {args!r}"
+                lines.append(self.PREFIXES.get(level, "") + text)
+            
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                lines.append(f"[log] {dropped} mensajes descartados (cola llena)")
+            
+            if lines:
+                stream = self.stream or sys.stdout
+                try:
+                    stream.write("\n".join(lines) + "\n")
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass  # Salida cerrada: no interrumpir al servidor
+            if stop:
+                return
+
+# Registro único del proceso, usado por los servidores del módulo
+server_log = ServerLog()
+server_log.set_rate("conexiones", 50)
+server_log.set_rate("mensajes", 20)
+atexit.register(server_log.close)
+
+class WorkerPool:
+    """
+    Pool acotado de hilos con control de admisión para los servidores.
+    
+    En lugar de crear un hilo por cada cliente aceptado, las conexiones se
+    ponen en una cola acotada y las atienden como máximo `max_workers`
+    hilos, creados a demanda y reutilizados. Cuando la cola está llena se
+    aplica la política de sobrecarga:
+    
+    - "reject": se envía `reject_message` al cliente y se cierra la conexión.
+    - "delay": el hilo que acepta se bloquea hasta que haya sitio, de modo
+      que las conexiones nuevas esperan en la cola del kernel (listen).
+    
+    Así, ante una ráfaga, la memoria y el número de hilos quedan acotados y
+    la latencia de los clientes admitidos se mantiene predecible.
+    """
+    
+    POLICIES = ("reject", "delay")
+    
+    def __init__(self, handler, max_workers=32, queue_size=64, policy="reject",
+                 reject_message="Servidor ocupado, intente más tarde\r\n".encode('utf-8'),
+                 name="servidor", report_interval=10.0):
+        """
+        Args:
+            handler: Función handler(client_sock, client_addr, *args) que atiende a un
+                cliente (args son los argumentos adicionales de submit)
+            max_workers (int): Hilos trabajadores como máximo
+            queue_size (int): Conexiones aceptadas en espera como máximo
+            policy (str): "reject" o "delay" cuando la cola está llena
+            reject_message (bytes): Respuesta enviada al rechazar (None = cerrar sin más)
+            name (str): Nombre del pool en las métricas
+            report_interval (float): Segundos entre reportes de métricas (None = sin reportes)
+        
+        Raises:
+            ValueError: Si la política es desconocida o max_workers o queue_size
+                son menores que 1 (queue.Queue trata 0 como cola ilimitada)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de sobrecarga desconocida: {policy}")
+        if max_workers < 1 or queue_size < 1:
+            raise ValueError("max_workers y queue_size deben ser al menos 1")
+        self.handler = handler
+        self.max_workers = max_workers
+        self.policy = policy
+        self.reject_message = reject_message
+        self.name = name
+        self.report_interval = report_interval
+        self.accepted = 0
+        self.rejected = 0
+        self.delayed = 0
+        self.completed = 0
+        self.max_depth = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._workers = 0
+        self._idle = 0
+        self._lock = threading.Lock()
+        self._last_report = time.monotonic()
     
-    while True:
-        print("\n--- MENÚ PRINCIPAL ---")
-        print("1.  Escanear puertos (Ejercicio 1)")
-        print("2.  Información de conexión (Ejercicio 2)")
-        print("3.  Cliente Daytime (Ejercicio 3)")
-        print("4.  Cliente Echo (Ejercicio 4)")
-        print("5.  Servidor básico (Ejercicios 5-6)")
-        print("6.  Cliente básico (Ejercicios 5-6)")
-        print("7.  Servidor de mensajería (Ejercicio 7)")
-        print("8.  Cliente de mensajería (Ejercicio 7)")
-        print("9.  Servidor de archivos (Ejercicio 8)")
-        print("10. Cliente de archivos (Ejercicio 8)")
-        print("11. Crear archivos de ejemplo")
-        print("0.  Salir")
+    def submit(self, client_sock, client_addr, *args):
+        """
+        Entrega una conexión aceptada al pool aplicando la política de sobrecarga.
         
+        Args:
+            client_sock: Socket del cliente
+            client_addr: Dirección del cliente
+            *args: Argumentos adicionales para el handler
+        
+        Returns:
+            bool: True si la conexión se admitió, False si se rechazó
+        """
+        item = (client_sock, client_addr, args)
         try:
-            option = input("\nSeleccione una opción: ").strip()
-            
-            if option == "0":
-                print("¡Hasta luego!")
-                break
-            elif option == "1":
-                host = input("Host a escanear (localhost): ").strip() or "localhost"
-                scan_ports(host, 1, 100)  # Rango reducido para demo
-            elif option == "2":
-                host = input("Host (google.com): ").strip() or "google.com"
-                port = int(input("Puerto (80): ").strip() or "80")
-                connection_info(host, port)
-            elif option == "3":
-                host = input("Servidor daytime (time.nist.gov): ").strip() or "time.nist.gov"
-                daytime_client(host)
-            elif option == "4":
-                host = input("Servidor echo (localhost): ").strip() or "localhost"
-                port = int(input("Puerto (7): ").strip() or "7")
-                echo_client(host, port)
-            elif option == "5":
-                port = int(input("Puerto del servidor (8000): ").strip() or "8000")
-                basic_server(port)
-            elif option == "6":
-                host = input("Host del servidor (localhost): ").strip() or "localhost"
-                port = int(input("Puerto del servidor (8000): ").strip() or "8000")
-                basic_client(host, port)
-            elif option == "7":
-                port = int(input("Puerto del servidor de mensajería (9000): ").strip() or "9000")
-                server = MessageServer(port)
-                server.start()
-            elif option == "8":
-                host = input("Host del servidor (localhost): ").strip() or "localhost"
-                port = int(input("Puerto del servidor (9000): ").strip() or "9000")
-                message_client(host, port)
-            elif option == "9":
-                port = int(input("Puerto del servidor de archivos (9001): ").strip() or "9001")
-                server = FileTransferServer(port)
-                server.start()
-            elif option == "10":
-                host = input("Host del servidor (localhost): ").strip() or "localhost"
-                port = int(input("Puerto del servidor (9001): ").strip() or "9001")
-                file_transfer_client(host, port)
-            elif option == "11":
-                create_sample_files()
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.policy == "reject":
+                self._reject(client_sock, client_addr)
+                self._maybe_report()
+                return False
+            self.delayed += 1
+            self._queue.put(item)
+        
+        with self._lock:
+            self.accepted += 1
+            depth = self._queue.qsize()
+            if depth > self.max_depth:
+                self.max_depth = depth
+            # Crear un hilo nuevo si hay más conexiones en espera que hilos libres
+            if depth > self._idle and self._workers < self.max_workers:
+                self._workers += 1
+                self._idle += 1
+                threading.Thread(target=self._worker, daemon=True).start()
+        
+        self._maybe_report()
+        return True
+    
+    def stats(self):
+        """
+        Métricas actuales del pool.
+        
+        Returns:
+            dict: Profundidad de cola actual y máxima, hilos activos y totales,
+                conexiones admitidas, rechazadas, demoradas y completadas
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_depth,
+                "workers": self._workers,
+                "active": self._workers - self._idle,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "delayed": self.delayed,
+                "completed": self.completed,
+            }
+    
+    def report(self):
+        """Registra una línea con las métricas del pool."""
+        stats = self.stats()
+        server_log.info("[pool %s] cola=%d (máx %d) activos=%d/%d admitidas=%d "
+                        "rechazadas=%d demoradas=%d completadas=%d",
+                        self.name, stats["queue_depth"], stats["max_queue_depth"],
+                        stats["active"], self.max_workers, stats["accepted"],
+                        stats["rejected"], stats["delayed"], stats["completed"])
+    
+    def _maybe_report(self):
+        if self.report_interval is None:
+            return
+        now = time.monotonic()
+        if now - self._last_report >= self.report_interval:
+            self._last_report = now
+            self.report()
+    
+    def _reject(self, client_sock, client_addr):
+        with self._lock:
+            self.rejected += 1
+        server_log.warning("Pool %s saturado: rechazada %s:%s", self.name,
+                           client_addr[0], client_addr[1], key="conexiones")
+        try:
+            if self.reject_message:
+                client_sock.send(self.reject_message)
+        except OSError:
+            pass
+        finally:
+            client_sock.close()
+    
+    def _worker(self):
+        """Hilo trabajador: atiende conexiones de la cola indefinidamente."""
+        while True:
+            client_sock, client_addr, args = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+            try:
+                self.handler(client_sock, client_addr, *args)
+            except Exception as e:
+                # Un error del handler no debe matar al trabajador
+                server_log.error("Error atendiendo %s:%s: %s", client_addr[0], client_addr[1], e)
+            finally:
+                with self._lock:
+                    self._idle += 1
+                    self.completed += 1
+
+class DnsCache:
+    """
+    Caché de resolución de nombres compartida por todo el proceso.
+    
+    Cada conexión de los clientes de este módulo necesita resolver el nombre
+    del host; con muchas conexiones cortas, la consulta DNS llega a dominar
+    la latencia. Esta caché guarda las direcciones resueltas durante `ttl`
+    segundos y también los nombres inexistentes (caché negativa) durante
+    `negative_ttl`, para no repetir consultas que van a fallar. Los fallos
+    transitorios del resolvedor (EAI_AGAIN, por ejemplo) no se guardan, y
+    las direcciones IP literales no pasan por la caché porque resolverlas
+    no cuesta nada. Es segura para hilos.
+    """
+    
+    # Errores que significan "el nombre no existe"; el resto puede ser transitorio
+    NEGATIVE_ERRORS = tuple(getattr(socket, name) for name in ("EAI_NONAME", "EAI_NODATA")
+                            if hasattr(socket, name))
+    
+    def __init__(self, ttl=300, negative_ttl=30, max_entries=1024):
+        """
+        Args:
+            ttl (float): Vigencia de una resolución exitosa en segundos
+            negative_ttl (float): Vigencia de un fallo de resolución en segundos
+            max_entries (int): Entradas guardadas como máximo; al llenarse se
+                descartan las vencidas y, si no basta, las más antiguas
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # (host, familia, tipo) -> (vencimiento, [(familia, sockaddr)] o args del error)
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def resolve(self, host, port, family=socket.AF_INET, type=socket.SOCK_STREAM):
+        """
+        Resuelve un host usando la caché cuando es posible.
+        
+        Args:
+            host (str): Nombre o dirección del host
+            port (int): Puerto a incluir en las direcciones devueltas
+            family: Familia de direcciones (AF_INET, AF_INET6 o AF_UNSPEC)
+            type: Tipo de socket (SOCK_STREAM o SOCK_DGRAM)
+        
+        Returns:
+            list: Tuplas (familia, sockaddr) en el orden del resolvedor
+        
+        Raises:
+            socket.gaierror: Si el host no se puede resolver (también desde caché)
+        """
+        key = (host, family, type)
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                result = entry[1]
             else:
-                print("Opción no válida. Intente nuevamente.")
+                self.misses += 1
+                result = None
         
-        except KeyboardInterrupt:
-            print("\n\nInterrumpido por el usuario.")
-            break
+        if result is None:
+            result = self._lookup(host, family, type)
+        
+        if isinstance(result, tuple):
+            # Fallo en caché: se lanza una excepción nueva con los mismos datos
+            raise socket.gaierror(*result)
+        
+        return [(fam, (sockaddr[0], port) + tuple(sockaddr[2:])) for fam, sockaddr in result]
+    
+    def _lookup(self, host, family, type):
+        """Consulta al resolvedor del sistema y guarda el resultado si procede."""
+        try:
+            infos = socket.getaddrinfo(host, None, family, type)
+            result = []
+            for info in infos:
+                if (info[0], info[4]) not in result:
+                    result.append((info[0], info[4]))
+            expires = time.monotonic() + self.ttl
+            cacheable = not self._is_literal(host)
+        except socket.gaierror as e:
+            result = e.args
+            expires = time.monotonic() + self.negative_ttl
+            cacheable = e.errno in self.NEGATIVE_ERRORS
+        
+        if cacheable:
+            key = (host, family, type)
+            with self.lock:
+                self.entries.pop(key, None)
+                if len(self.entries) >= self.max_entries:
+                    self._evict_locked()
+                self.entries[key] = (expires, result)
+        return result
+    
+    def _evict_locked(self):
+        """Libera sitio: primero las entradas vencidas, si no la más antigua."""
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if entry[0] <= now]:
+            del self.entries[key]
+        if len(self.entries) >= self.max_entries:
+            del self.entries[next(iter(self.entries))]
+    
+    @staticmethod
+    def _is_literal(host):
+        """Indica si el host es una dirección IP escrita literalmente."""
+        try:
+            ipaddress.ip_address(host)
+            return True
         except ValueError:
-            print("Error: Ingrese un número válido.")
-        except Exception as e:
-            print(f"Error: {e}")
+            return False
+    
+    def prefetch(self, hosts, family=socket.AF_INET, type=socket.SOCK_STREAM):
+        """
+        Resuelve una lista de hosts en segundo plano para calentar la caché.
+        
+        Args:
+            hosts (list): Hosts a resolver
+        
+        Returns:
+            threading.Thread: Hilo de resolución (ya iniciado)
+        """
+        def run():
+            for host in hosts:
+                try:
+                    self.resolve(host, 0, family, type)
+                except socket.gaierror:
+                    pass  # El fallo queda en la caché negativa
+        
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        return thread
+    
+    def invalidate(self, host=None):
+        """Descarta las entradas de un host, o todas si no se indica ninguno."""
+        with self.lock:
+            if host is None:
+                self.entries.clear()
+            else:
+                for key in [key for key in self.entries if key[0] == host]:
+                    del self.entries[key]
+
+# Caché DNS única del proceso, usada por todos los clientes del módulo
+dns_cache = DnsCache()
+
+def resolve_address(host, port):
+    """
+    Obtiene la dirección IPv4 de conexión para un host a través de dns_cache.
+    
+    Args:
+        host (str): Nombre o dirección del host
+        port (int): Puerto destino
+    
+    Returns:
+        tuple: sockaddr (dirección, puerto) listo para connect()
+    
+    Raises:
+        socket.gaierror: Si el host no se puede resolver
+    """
+    return dns_cache.resolve(host, port)[0][1]
+
+def happy_eyeballs_connect(host, port, timeout=None, attempt_delay=0.25):
+    """
+    Establece una conexión TCP compitiendo entre direcciones IPv6 e IPv4.
+    
+    Implementa "Happy Eyeballs" (RFC 8305): las direcciones resueltas se
+    intercalan por familia (IPv6, IPv4, IPv6...) y se inicia un intento de
+    conexión cada `attempt_delay` segundos sin cancelar los anteriores, o
+    antes si el intento en curso falla. Gana el primero que conecta y el
+    resto se cierra. Así los destinos solo IPv6 funcionan, y una dirección
+    lenta o inalcanzable no retrasa la conexión más allá de un escalón.
+    
+    Args:
+        host (str): Nombre o dirección del host
+        port (int): Puerto destino
+        timeout (float): Tiempo límite total de la conexión y timeout que
+            queda configurado en el socket devuelto (None = bloqueante)
+        attempt_delay (float): Separación entre intentos escalonados en segundos
+    
+    Returns:
+        socket.socket: Socket conectado
+    
+    Raises:
+        socket.gaierror: Si el host no se puede resolver
+        OSError: Si todos los intentos fallan (socket.timeout si vence el plazo)
+    """
+    candidates = dns_cache.resolve(host, port, family=socket.AF_UNSPEC)
+    
+    # Intercalar familias empezando por la primera que devolvió el resolvedor
+    by_family = {}
+    for family, sockaddr in candidates:
+        by_family.setdefault(family, []).append(sockaddr)
+    queues = list(by_family.items())
+    ordered = []
+    while any(addresses for _, addresses in queues):
+        for family, addresses in queues:
+            if addresses:
+                ordered.append((family, addresses.pop(0)))
+    
+    deadline = None if timeout is None else time.monotonic() + timeout
+    selector = selectors.DefaultSelector()
+    pending = iter(ordered)
+    in_flight = []
+    last_error = None
+    winner = None
+    
+    def start_next():
+        # Lanza el siguiente intento; devuelve False si no quedan candidatos
+        nonlocal last_error
+        for family, sockaddr in pending:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            result = sock.connect_ex(sockaddr)
+            if result in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                selector.register(sock, selectors.EVENT_WRITE)
+                in_flight.append(sock)
+                return True
+            last_error = OSError(result, os.strerror(result))
+            sock.close()
+        return False
+    
+    try:
+        has_more = start_next()
+        next_start = time.monotonic() + attempt_delay
+        
+        while in_flight or has_more:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise socket.timeout(f"Tiempo de conexión agotado con {host}:{port}")
+            
+            if not in_flight or (has_more and now >= next_start):
+                has_more = start_next()
+                next_start = now + attempt_delay
+                continue
+            
+            wait = next_start - now if has_more else None
+            if deadline is not None:
+                wait = deadline - now if wait is None else min(wait, deadline - now)
+            
+            for key, _ in selector.select(wait):
+                sock = key.fileobj
+                selector.unregister(sock)
+                in_flight.remove(sock)
+                
+                error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if error == 0:
+                    winner = sock
+                    break
+                last_error = OSError(error, os.strerror(error))
+                sock.close()
+                # El intento falló: no esperar al escalón para lanzar el siguiente
+                next_start = time.monotonic()
+            
+            if winner:
+                break
+    finally:
+        for sock in in_flight:
+            sock.close()
+        selector.close()
+    
+    if winner is None:
+        raise last_error or OSError(f"No se pudo conectar con {host}:{port}")
+    
+    winner.settimeout(timeout)
+    return winner
+
+def test_connection(host, port, timeout=5, adaptive=False):
+    """
+    Prueba si es posible conectarse a un host y puerto específicos.
+    
+    Args:
+        host (str): Host a probar
+        port (int): Puerto a probar
+        timeout (int): Tiempo límite en segundos
+        adaptive (bool): Usa el timeout derivado del RTT medido al host
+            (ver RttEstimator); `timeout` es solo el valor inicial
+    
+    Returns:
+        bool: True si la conexión es exitosa, False en caso contrario
+    """
+    if not adaptive:
+        try:
+            sock = happy_eyeballs_connect(host, port, timeout)
+            sock.close()
+            return True
+        except:
+            return False
+    
+    estimator = get_rtt_estimator(host, initial_timeout=timeout)
+    try:
+        state, rtt = _probe_port(host, port, estimator.timeout)
+    except socket.gaierror:
+        return False
+    
+    if rtt is not None:
+        estimator.add_sample(rtt)
+    return state == "open"
+
+def probe_connection(host, port, timeout=5):
+    """
+    Prueba la conexión a un host y puerto y mide cuánto tarda.
+    
+    Args:
+        host (str): Host a probar
+        port (int): Puerto a probar
+        timeout (float): Tiempo límite en segundos
+    
+    Returns:
+        tuple: (conectado, latencia en segundos o None si no hubo conexión)
+    """
+    started = time.perf_counter()
+    if test_connection(host, port, timeout):
+        return True, time.perf_counter() - started
+    return False, None
+
+def get_local_ip():
+    """
+    Obtiene la dirección IP local de la máquina.
+    
+    Returns:
+        str: Dirección IP local
+    """
+    try:
+        # Crear una conexión temporal para obtener la IP local
+        temp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        temp_sock.connect(("8.8.8.8", 80))
+        local_ip = temp_sock.getsockname()[0]
+        temp_sock.close()
+        return local_ip
+    except:
+        return "127.0.0.1"
+
+def format_bytes(bytes_count):
+    """
+    Formatea un número de bytes en una representación legible.
+    
+    Args:
+        bytes_count (int): Número de bytes
+    
+    Returns:
+        str: Representación formateada (ej: "1.5 MB")
+    """
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if bytes_count < 1024.0:
+            return f"{bytes_count:.1f} {unit}"
+        bytes_count /= 1024.0
+    return f"{bytes_count:.1f} TB"
 
 # =============================================================================
-# FUNCIONES AUXILIARES Y UTILIDADES
+# MEDICIÓN DE LATENCIA
 # =============================================================================
 
-def test_connection(host, port, timeout=5):
+class LatencyHistogram:
+    """
+    Histograma de latencias de bajo costo con escala log-lineal.
+    
+    Los valores se guardan en microsegundos agrupados en cubetas cuyo ancho
+    crece con la magnitud (32 subdivisiones por cada potencia de 2), como en
+    HdrHistogram: registrar un valor es un cálculo con enteros y un
+    incremento en un diccionario, y los percentiles tienen un error relativo
+    menor al 2% sin guardar cada muestra. El mínimo y el máximo son exactos.
+    """
+    
+    SUB_BITS = 5  # 2^5 = 32 subdivisiones por octava
+    
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+    
+    def record(self, seconds):
+        """
+        Registra una latencia.
+        
+        Args:
+            seconds (float): Latencia en segundos
+        """
+        micros = max(0, int(seconds * 1_000_000))
+        if micros < (1 << self.SUB_BITS):
+            index = micros
+        else:
+            # Se conservan SUB_BITS + 1 bits significativos: la mantisa va de
+            # 2^SUB_BITS a 2^(SUB_BITS + 1) - 1, es decir, 32 cubetas por octava
+            shift = micros.bit_length() - self.SUB_BITS - 1
+            index = (shift << self.SUB_BITS) + (micros >> shift)
+        
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+    
+    def _bucket_value(self, index):
+        """Valor representativo (punto medio) de una cubeta, en segundos."""
+        if index < (1 << self.SUB_BITS):
+            return index / 1_000_000
+        shift = (index >> self.SUB_BITS) - 1
+        mantissa = index - (shift << self.SUB_BITS)
+        low = mantissa << shift
+        high = ((mantissa + 1) << shift) - 1
+        return (low + high) / 2 / 1_000_000
+    
+    def percentile(self, p):
+        """
+        Calcula un percentil.
+        
+        Args:
+            p (float): Percentil entre 0 y 100
+        
+        Returns:
+            float: Latencia en segundos (None si no hay muestras)
+        """
+        if not self.count:
+            return None
+        
+        rank = max(1, -(-self.count * p // 100))  # Redondeo hacia arriba
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                # El valor de la cubeta nunca supera los extremos exactos
+                return min(self.max, max(self.min, self._bucket_value(index)))
+        return self.max
+    
+    def merge(self, other):
+        """Acumula en este histograma las muestras de otro."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+    
+    def summary(self):
+        """
+        Resumen de percentiles en milisegundos.
+        
+        Returns:
+            str: Texto con p50/p90/p99/max, o "sin muestras"
+        """
+        if not self.count:
+            return "sin muestras"
+        return (f"p50={self.percentile(50) * 1000:.2f} ms  "
+                f"p90={self.percentile(90) * 1000:.2f} ms  "
+                f"p99={self.percentile(99) * 1000:.2f} ms  "
+                f"max={self.max * 1000:.2f} ms  (n={self.count})")
+
+def latency_probe(host, port, count=10, timeout=5, first_byte_timeout=1.0):
+    """
+    Mide la latencia de conexión a un destino repitiendo la conexión N veces.
+    
+    Para cada conexión registra por separado el tiempo de conexión TCP, el
+    tiempo hasta el primer byte recibido (si el servidor envía algo por su
+    cuenta, como daytime o SSH) y el tiempo de cierre, y muestra p50, p90,
+    p99 y máximo de cada métrica.
+    
+    Args:
+        host (str): Host destino
+        port (int): Puerto destino
+        count (int): Número de conexiones a realizar
+        timeout (float): Tiempo límite de cada conexión en segundos
+        first_byte_timeout (float): Espera máxima del primer byte; si la
+            primera conexión no recibe nada, no se espera en las siguientes
+    
+    Returns:
+        dict: Histogramas por métrica ("connect", "first_byte", "close") y
+            número de errores ("errors")
+    """
+    histograms = {
+        "connect": LatencyHistogram(),
+        "first_byte": LatencyHistogram(),
+        "close": LatencyHistogram(),
+    }
+    errors = 0
+    expect_data = first_byte_timeout > 0
+    
+    print(f"\n=== Sondeo de latencia a {host}:{port} ({count} conexiones) ===")
+    
+    for _ in range(count):
+        try:
+            started = time.perf_counter()
+            sock = happy_eyeballs_connect(host, port, timeout)
+            try:
+                connected = time.perf_counter()
+                histograms["connect"].record(connected - started)
+                
+                if expect_data:
+                    sock.settimeout(first_byte_timeout)
+                    try:
+                        if sock.recv(1):
+                            histograms["first_byte"].record(time.perf_counter() - connected)
+                    except socket.timeout:
+                        # El servicio no habla primero: no medir TTFB en adelante
+                        expect_data = histograms["first_byte"].count > 0
+                
+                closing = time.perf_counter()
+                sock.close()
+                histograms["close"].record(time.perf_counter() - closing)
+            finally:
+                # Si recv falla (por ejemplo, RST del servidor) el socket sigue abierto
+                sock.close()
+        
+        except socket.error as e:
+            errors += 1
+            print(f"Error de conexión: {e}")
+    
+    labels = {"connect": "Conexión", "first_byte": "Primer byte", "close": "Cierre"}
+    for name, histogram in histograms.items():
+        print(f"  {labels[name]:<12} {histogram.summary()}")
+    if errors:
+        print(f"  Errores: {errors}/{count}")
+    
+    histograms["errors"] = errors
+    return histograms
+
+def load_test(host, port, connections=1000, concurrency=50, duration=None, timeout=5):
     """
-    Prueba si es posible conectarse a un host y puerto específicos.
+    Generador de carga para servidores que responden al conectar.
+    
+    Pensado para LocalDaytimeServer y basic_server: cada conexión se
+    establece, espera el primer bloque de datos de la respuesta y se cierra.
+    Mantiene `concurrency` conexiones en curso con asyncio hasta completar
+    `connections` conexiones o hasta que transcurra `duration` segundos, y
+    reporta conexiones por segundo, errores por tipo y percentiles de las
+    latencias de conexión y de respuesta. Sirve para encontrar el punto de
+    saturación de un servidor.
     
     Args:
-        host (str): Host a probar
-        port (int): Puerto a probar
-        timeout (int): Tiempo límite en segundos
+        host (str): Host del servidor
+        port (int): Puerto del servidor
+        connections (int): Total de conexiones a realizar (None = sin límite,
+            requiere `duration`)
+        concurrency (int): Conexiones simultáneas
+        duration (float): Duración máxima de la prueba en segundos
+        timeout (float): Tiempo límite de conexión y de respuesta en segundos
     
     Returns:
-        bool: True si la conexión es exitosa, False en caso contrario
+        dict: "completed", "errors" (por tipo), "elapsed", "rate" y los
+            histogramas "connect" y "response"
     """
+    if connections is None and duration is None:
+        raise ValueError("Se debe indicar un número de conexiones o una duración")
+    
+    concurrency = _clamp_concurrency(concurrency)
+    address = resolve_address(host, port)
+    connect_hist = LatencyHistogram()
+    response_hist = LatencyHistogram()
+    errors = {}
+    completed = 0
+    
+    print(f"\n=== Prueba de carga contra {host}:{port} ===")
+    print(f"Conexiones: {connections or 'sin límite'}, concurrencia: {concurrency}, "
+          f"duración máxima: {f'{duration} s' if duration else 'sin límite'}")
+    
+    async def run():
+        nonlocal completed
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration if duration else None
+        budget = iter(range(connections)) if connections else iter(int, 1)
+        
+        async def worker():
+            nonlocal completed
+            for _ in budget:
+                if end is not None and loop.time() >= end:
+                    break
+                
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                try:
+                    started = loop.time()
+                    await asyncio.wait_for(loop.sock_connect(sock, address), timeout)
+                    connected = loop.time()
+                    data = await asyncio.wait_for(loop.sock_recv(sock, 4096), timeout)
+                    if not data:
+                        raise ConnectionError("conexión cerrada sin respuesta")
+                    connect_hist.record(connected - started)
+                    response_hist.record(loop.time() - connected)
+                    completed += 1
+                except (OSError, asyncio.TimeoutError) as e:
+                    name = "Timeout" if isinstance(e, asyncio.TimeoutError) else type(e).__name__
+                    errors[name] = errors.get(name, 0) + 1
+                finally:
+                    sock.close()
+        
+        workers = asyncio.gather(*(worker() for _ in range(concurrency)))
+        if end is None:
+            await workers
+            return
+        try:
+            # Al cumplirse la duración se cancelan las conexiones aún en curso
+            await asyncio.wait_for(workers, duration)
+        except asyncio.TimeoutError:
+            pass
+    
+    started = time.perf_counter()
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        return result == 0
-    except:
-        return False
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nPrueba interrumpida por el usuario")
+    elapsed = time.perf_counter() - started
+    rate = completed / elapsed if elapsed > 0 else 0.0
+    
+    print(f"Completadas: {completed} en {elapsed:.2f} s ({rate:.0f} conexiones/s)")
+    print(f"Errores: {sum(errors.values())}"
+          + (f" ({', '.join(f'{name}: {count}' for name, count in sorted(errors.items()))})"
+             if errors else ""))
+    print(f"  Conexión   {connect_hist.summary()}")
+    print(f"  Respuesta  {response_hist.summary()}")
+    
+    return {"completed": completed, "errors": errors, "elapsed": elapsed, "rate": rate,
+            "connect": connect_hist, "response": response_hist}
 
-def get_local_ip():
+def echo_messages(count, size=64):
     """
-    Obtiene la dirección IP local de la máquina.
+    Genera mensajes de prueba para echo_benchmark.
     
-    Returns:
-        str: Dirección IP local
+    Cada mensaje lleva su número de secuencia y se rellena hasta `size`
+    bytes incluyendo el salto de línea final.
+    
+    Args:
+        count (int): Número de mensajes
+        size (int): Tamaño de cada mensaje en bytes
+    
+    Yields:
+        bytes: Mensaje terminado en "\n"
     """
-    try:
-        # Crear una conexión temporal para obtener la IP local
-        temp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        temp_sock.connect(("8.8.8.8", 80))
-        local_ip = temp_sock.getsockname()[0]
-        temp_sock.close()
-        return local_ip
-    except:
-        return "127.0.0.1"
+    for i in range(count):
+        yield f"{i:08d}".encode('ascii').ljust(max(size - 1, 8), b"x") + b"\n"
 
-def format_bytes(bytes_count):
+def echo_benchmark(host, port, messages, depth=16, timeout=5):
     """
-    Formatea un número de bytes en una representación legible.
+    Mide el rendimiento de un servidor echo enviando mensajes en pipeline.
+    
+    Mantiene hasta `depth` mensajes enviados sin respuesta sobre una sola
+    conexión no bloqueante. Como el eco devuelve el flujo en el mismo orden,
+    cada respuesta se empareja con el mensaje más antiguo en vuelo (FIFO),
+    se compara con él y se registra su RTT en un LatencyHistogram. Al final
+    reporta mensajes por segundo, bytes por segundo y percentiles del RTT.
     
     Args:
-        bytes_count (int): Número de bytes
+        host (str): Servidor echo
+        port (int): Puerto del servicio
+        messages: Iterable de mensajes (bytes o str); un archivo abierto en
+            binario envía una línea por mensaje
+        depth (int): Mensajes en vuelo como máximo
+        timeout (float): Espera máxima sin progreso en segundos
     
     Returns:
-        str: Representación formateada (ej: "1.5 MB")
+        dict: "messages", "bytes", "elapsed", "rate", "throughput",
+            "mismatches", "error" y el histograma "rtt"
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_count < 1024.0:
-            return f"{bytes_count:.1f} {unit}"
-        bytes_count /= 1024.0
-    return f"{bytes_count:.1f} TB"
+    rtt = LatencyHistogram()
+    in_flight = collections.deque()  # (mensaje, instante de envío)
+    outgoing = bytearray()
+    incoming = bytearray()
+    source = iter(messages)
+    exhausted = False
+    completed = 0
+    total_bytes = 0
+    mismatches = 0
+    error = None
+    
+    print(f"\n=== Benchmark echo contra {host}:{port} (profundidad {depth}) ===")
+    
+    try:
+        sock = happy_eyeballs_connect(host, port, timeout)
+    except socket.error as e:
+        print(f"Error en cliente echo: {e}")
+        return None
+    
+    sock.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    started = time.perf_counter()
+    
+    try:
+        while True:
+            # Completar la ventana de mensajes en vuelo
+            while not exhausted and len(in_flight) < depth:
+                try:
+                    message = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if isinstance(message, str):
+                    message = message.encode('utf-8')
+                if not message.endswith(b"\n"):
+                    message += b"\n"
+                outgoing += message
+                in_flight.append((message, time.perf_counter()))
+            
+            if exhausted and not in_flight:
+                break
+            
+            if outgoing:
+                try:
+                    sent = sock.send(outgoing)
+                    del outgoing[:sent]
+                except BlockingIOError:
+                    pass
+            
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if outgoing else 0)
+            selector.modify(sock, events)
+            ready = selector.select(timeout)
+            if not ready:
+                error = f"sin respuesta en {timeout} s"
+                break
+            if not ready[0][1] & selectors.EVENT_READ:
+                continue
+            
+            data = sock.recv(65536)
+            if not data:
+                error = "el servidor cerró la conexión"
+                break
+            incoming += data
+            
+            # Emparejar el eco con los mensajes más antiguos
+            now = time.perf_counter()
+            while in_flight and len(incoming) >= len(in_flight[0][0]):
+                message, sent_at = in_flight.popleft()
+                if incoming[:len(message)] != message:
+                    mismatches += 1
+                del incoming[:len(message)]
+                rtt.record(now - sent_at)
+                completed += 1
+                total_bytes += len(message)
+    
+    except socket.error as e:
+        error = str(e)
+    except KeyboardInterrupt:
+        error = "interrumpido por el usuario"
+    finally:
+        elapsed = time.perf_counter() - started
+        selector.close()
+        sock.close()
+    
+    rate = completed / elapsed if elapsed > 0 else 0.0
+    throughput = total_bytes / elapsed if elapsed > 0 else 0.0
+    
+    print(f"Mensajes: {completed} en {elapsed:.2f} s ({rate:.0f} mensajes/s, "
+          f"{throughput / 1024 / 1024:.2f} MiB/s)")
+    print(f"  RTT  {rtt.summary()}")
+    if mismatches:
+        print(f"  Ecos que no coinciden con el mensaje enviado: {mismatches}")
+    if error:
+        print(f"  Detenido: {error} ({len(in_flight)} mensajes sin respuesta)")
+    
+    return {"messages": completed, "bytes": total_bytes, "elapsed": elapsed,
+            "rate": rate, "throughput": throughput, "mismatches": mismatches,
+            "error": error, "rtt": rtt}
 
 # =============================================================================
 # SERVIDORES DE PRUEBA LOCALES
@@ -886,11 +4549,44 @@ class LocalDaytimeServer:
     
     Proporciona la fecha y hora actual cuando un cliente se conecta.
     Útil para probar el cliente daytime sin depender de servidores externos.
+    
+    Admite dos modos: "threaded" (un hilo por conexión, el modelo del
+    ejercicio) y "selector" (un solo hilo con un bucle de eventos que acepta
+    conexiones en lotes y responde con una línea precodificada que se
+    recalcula una vez por segundo). El segundo soporta tormentas de decenas
+    de miles de conexiones por segundo en un solo núcleo.
     """
     
-    def __init__(self, port=1313):  # Puerto alternativo para evitar privilegios
+    ACCEPT_BATCH = 256  # Conexiones aceptadas como máximo por evento de lectura
+    
+    def __init__(self, port=1313, mode="threaded", reuse_port=False,  # Puerto alternativo para evitar privilegios
+                 max_workers=None, queue_size=64, overload="reject"):
         self.port = port
+        self.mode = mode
+        self.reuse_port = reuse_port
+        # Con max_workers el modo "threaded" usa un pool acotado (ver WorkerPool)
+        self.pool = (WorkerPool(self.handle_client, max_workers, queue_size, overload, name='daytime')
+                     if max_workers else None)
         self.running = True
+        self._cached_second = None
+        self._cached_response = b""
+    
+    def cached_response(self):
+        """
+        Devuelve la respuesta daytime ya codificada para el segundo actual.
+        
+        La línea solo cambia una vez por segundo, así que se formatea y
+        codifica una vez y se reutiliza para todas las conexiones de ese segundo.
+        
+        Returns:
+            bytes: Línea daytime terminada en CRLF
+        """
+        now = int(time.time())
+        if now != self._cached_second:
+            current_time = datetime.fromtimestamp(now).strftime("%A, %B %d, %Y %H:%M:%S")
+            self._cached_response = f"{current_time}\r\n".encode('ascii')
+            self._cached_second = now
+        return self._cached_response
     
     def handle_client(self, client_sock, client_addr):
         """
@@ -906,18 +4602,25 @@ class LocalDaytimeServer:
             response = f"{current_time}\r\n"
             
             client_sock.send(response.encode('ascii'))
-            print(f"Enviado daytime a {client_addr[0]}:{client_addr[1]}: {current_time}")
+            server_log.info("Enviado daytime a %s:%s: %s", client_addr[0], client_addr[1],
+                            current_time, key="conexiones")
             
         except socket.error as e:
-            print(f"Error enviando daytime: {e}")
+            server_log.warning("Error enviando daytime: %s", e, key="conexiones")
         finally:
             client_sock.close()
     
     def start(self):
         """Inicia el servidor daytime local."""
+        if self.mode == "selector":
+            self.serve_selector()
+            return
+        
         try:
             server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                enable_reuse_port(server_sock)
             server_sock.bind(('', self.port))
             server_sock.listen(5)
             
@@ -928,6 +4631,10 @@ class LocalDaytimeServer:
                 try:
                     client_sock, client_addr = server_sock.accept()
                     
+                    if self.pool is not None:
+                        self.pool.submit(client_sock, client_addr)
+                        continue
+                    
                     # Manejar cliente en hilo separado
                     client_thread = threading.Thread(
                         target=self.handle_client,
@@ -939,12 +4646,98 @@ class LocalDaytimeServer:
                 except KeyboardInterrupt:
                     print("\nDeteniendo servidor Daytime...")
                     self.running = False
+                    if self.pool is not None:
+                        self.pool.report()
                     break
             
             server_sock.close()
             
         except socket.error as e:
-            print(f"Error del servidor Daytime: {e}")
+            server_failed(f"Error del servidor Daytime: {e}")
+
+    def serve_selector(self):
+        """
+        Atiende conexiones con un bucle de eventos de un solo hilo.
+        
+        El socket de escucha es no bloqueante y se vigila con `selectors`
+        (epoll en Linux). Cada vez que está listo se aceptan hasta
+        ACCEPT_BATCH conexiones seguidas; a cada una se le envía la respuesta
+        en caché y se cierra, sin crear hilos ni formatear fechas por conexión.
+        """
+        served = 0
+        
+        try:
+            server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                enable_reuse_port(server_sock)
+            server_sock.bind(('', self.port))
+            # Cola de conexiones pendientes amplia para absorber ráfagas
+            server_sock.listen(socket.SOMAXCONN)
+            server_sock.setblocking(False)
+            
+            selector = selectors.DefaultSelector()
+            selector.register(server_sock, selectors.EVENT_READ)
+            
+            print(f"Servidor Daytime local (selector) iniciado en puerto {self.port}")
+            print("Presione Ctrl+C para detener")
+            
+            try:
+                while self.running:
+                    # Timeout para revisar periódicamente self.running
+                    if not selector.select(timeout=1.0):
+                        continue
+                    
+                    response = self.cached_response()
+                    for _ in range(self.ACCEPT_BATCH):
+                        try:
+                            client_sock, _ = server_sock.accept()
+                        except BlockingIOError:
+                            break  # No quedan conexiones pendientes
+                        except OSError as e:
+                            # Por ejemplo, límite de descriptores alcanzado
+                            server_log.warning("Error aceptando conexión daytime: %s", e,
+                                               key="conexiones")
+                            break
+                        
+                        try:
+                            # La línea cabe siempre en el buffer de envío de un socket nuevo
+                            client_sock.send(response)
+                            served += 1
+                        except OSError:
+                            pass
+                        finally:
+                            client_sock.close()
+            
+            except KeyboardInterrupt:
+                print("\nDeteniendo servidor Daytime...")
+                self.running = False
+            
+            selector.close()
+            server_sock.close()
+            print(f"Conexiones atendidas: {served}")
+            
+        except socket.error as e:
+            server_failed(f"Error del servidor Daytime: {e}")
+
+class _EchoConnection:
+    """
+    Estado de una conexión del servidor echo en modo selector.
+    
+    El buffer se reserva una sola vez por conexión y se reutiliza en cada
+    lectura con `recv_into`; `start`/`end` delimitan los bytes recibidos que
+    aún quedan por devolver al cliente.
+    """
+    
+    __slots__ = ("sock", "addr", "buffer", "view", "start", "end")
+    
+    def __init__(self, sock, addr, buffer_size):
+        self.sock = sock
+        self.addr = addr
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
 
 class LocalEchoServer:
     """
@@ -952,10 +4745,25 @@ class LocalEchoServer:
     
     Devuelve exactamente los mismos datos que recibe de cada cliente.
     Implementa el protocolo RFC862 para pruebas locales.
+    
+    Admite dos modos: "threaded" (un hilo por cliente que registra cada
+    mensaje) y "selector" (un solo hilo no bloqueante que lee con
+    `recv_into` en un buffer fijo por conexión y lo devuelve desde un
+    `memoryview`, sin asignar memoria por mensaje). El segundo atiende miles
+    de clientes simultáneos sin un hilo por cada uno.
     """
     
-    def __init__(self, port=1307):  # Puerto alternativo
+    BUFFER_SIZE = 16384  # Bytes reservados por conexión en modo selector
+    ACCEPT_BATCH = 256   # Conexiones aceptadas como máximo por evento de lectura
+    
+    def __init__(self, port=1307, mode="threaded", reuse_port=False,  # Puerto alternativo
+                 max_workers=None, queue_size=64, overload="reject"):
         self.port = port
+        self.mode = mode
+        self.reuse_port = reuse_port
+        # Con max_workers el modo "threaded" usa un pool acotado (ver WorkerPool)
+        self.pool = (WorkerPool(self.handle_client, max_workers, queue_size, overload, name='echo')
+                     if max_workers else None)
         self.running = True
     
     def handle_client(self, client_sock, client_addr):
@@ -966,7 +4774,8 @@ class LocalEchoServer:
             client_sock: Socket del cliente
             client_addr: Dirección del cliente
         """
-        print(f"Cliente echo conectado: {client_addr[0]}:{client_addr[1]}")
+        server_log.info("Cliente echo conectado: %s:%s", client_addr[0], client_addr[1],
+                        key="conexiones")
         
         try:
             while True:
@@ -978,21 +4787,31 @@ class LocalEchoServer:
                 # Enviar los mismos datos de vuelta (echo)
                 client_sock.send(data)
                 
-                # Log del mensaje
-                message = data.decode('ascii', errors='ignore').strip()
-                print(f"Echo para {client_addr[0]}:{client_addr[1]}: {message}")
+                # Log del mensaje (solo se decodifica si el nivel DEBUG está activo)
+                if server_log.enabled(ServerLog.DEBUG):
+                    message = data.decode('ascii', errors='ignore').strip()
+                    server_log.debug("Echo para %s:%s: %s", client_addr[0], client_addr[1],
+                                     message, key="mensajes")
         
         except socket.error as e:
-            print(f"Error en cliente echo {client_addr[0]}:{client_addr[1]}: {e}")
+            server_log.warning("Error en cliente echo %s:%s: %s", client_addr[0], client_addr[1], e,
+                               key="conexiones")
         finally:
             client_sock.close()
-            print(f"Cliente echo desconectado: {client_addr[0]}:{client_addr[1]}")
+            server_log.info("Cliente echo desconectado: %s:%s", client_addr[0], client_addr[1],
+                            key="conexiones")
     
     def start(self):
         """Inicia el servidor echo local."""
+        if self.mode == "selector":
+            self.serve_selector()
+            return
+        
         try:
             server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                enable_reuse_port(server_sock)
             server_sock.bind(('', self.port))
             server_sock.listen(5)
             
@@ -1003,6 +4822,10 @@ class LocalEchoServer:
                 try:
                     client_sock, client_addr = server_sock.accept()
                     
+                    if self.pool is not None:
+                        self.pool.submit(client_sock, client_addr)
+                        continue
+                    
                     # Manejar cliente en hilo separado
                     client_thread = threading.Thread(
                         target=self.handle_client,
@@ -1014,22 +4837,276 @@ class LocalEchoServer:
                 except KeyboardInterrupt:
                     print("\nDeteniendo servidor Echo...")
                     self.running = False
+                    if self.pool is not None:
+                        self.pool.report()
                     break
             
             server_sock.close()
             
         except socket.error as e:
-            print(f"Error del servidor Echo: {e}")
+            server_failed(f"Error del servidor Echo: {e}")
+
+    def serve_selector(self):
+        """
+        Atiende a todos los clientes echo desde un bucle de eventos de un hilo.
+        
+        Cada conexión se registra para lectura. Los datos se leen con
+        `recv_into` en el buffer de la conexión y se devuelven con `send`
+        sobre una vista del mismo buffer. Si el envío es parcial, el resto
+        queda pendiente y la conexión pasa a esperar EVENT_WRITE; mientras
+        tanto no se lee más de ese cliente, de modo que un cliente lento
+        frena solo su propio flujo (backpressure) y no acumula memoria.
+        """
+        connections = 0
+        
+        try:
+            server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                enable_reuse_port(server_sock)
+            server_sock.bind(('', self.port))
+            server_sock.listen(socket.SOMAXCONN)
+            server_sock.setblocking(False)
+            
+            selector = selectors.DefaultSelector()
+            selector.register(server_sock, selectors.EVENT_READ)
+            
+            print(f"Servidor Echo local (selector) iniciado en puerto {self.port}")
+            print("Presione Ctrl+C para detener")
+            
+            def close(conn):
+                selector.unregister(conn.sock)
+                conn.sock.close()
+                conn.view.release()
+            
+            def flush(conn):
+                # Devuelve lo pendiente; True si el buffer quedó vacío
+                while conn.start < conn.end:
+                    try:
+                        sent = conn.sock.send(conn.view[conn.start:conn.end])
+                    except BlockingIOError:
+                        return False
+                    conn.start += sent
+                conn.start = conn.end = 0
+                return True
+            
+            try:
+                while self.running:
+                    # Timeout para revisar periódicamente self.running
+                    for key, events in selector.select(timeout=1.0):
+                        if key.data is None:
+                            for _ in range(self.ACCEPT_BATCH):
+                                try:
+                                    client_sock, client_addr = server_sock.accept()
+                                except BlockingIOError:
+                                    break  # No quedan conexiones pendientes
+                                except OSError as e:
+                                    server_log.warning("Error aceptando conexión echo: %s", e,
+                                                       key="conexiones")
+                                    break
+                                client_sock.setblocking(False)
+                                conn = _EchoConnection(client_sock, client_addr, self.BUFFER_SIZE)
+                                selector.register(client_sock, selectors.EVENT_READ, conn)
+                                connections += 1
+                            continue
+                        
+                        conn = key.data
+                        try:
+                            if events & selectors.EVENT_WRITE:
+                                if flush(conn):
+                                    selector.modify(conn.sock, selectors.EVENT_READ, conn)
+                                continue
+                            
+                            received = conn.sock.recv_into(conn.view)
+                            if not received:
+                                close(conn)
+                                continue
+                            conn.end = received
+                            if not flush(conn):
+                                # El cliente no admite más datos por ahora
+                                selector.modify(conn.sock, selectors.EVENT_WRITE, conn)
+                        except BlockingIOError:
+                            pass
+                        except OSError:
+                            close(conn)
+            
+            except KeyboardInterrupt:
+                print("\nDeteniendo servidor Echo...")
+                self.running = False
+            
+            for key in list(selector.get_map().values()):
+                if key.data is not None:
+                    key.data.sock.close()
+            selector.close()
+            server_sock.close()
+            print(f"Conexiones atendidas: {connections}")
+            
+        except socket.error as e:
+            server_failed(f"Error del servidor Echo: {e}")
+
+# =============================================================================
+# SERVIDORES MULTIPROCESO (SO_REUSEPORT)
+# =============================================================================
+
+def enable_reuse_port(sock):
+    """
+    Activa SO_REUSEPORT en un socket servidor antes de vincularlo.
+    
+    Permite que varios procesos vinculen el mismo puerto; el kernel reparte
+    las conexiones entrantes entre sus colas de aceptación.
+    
+    Args:
+        sock: Socket servidor aún sin vincular
+    
+    Raises:
+        OSError: Si la plataforma no admite SO_REUSEPORT
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise OSError("SO_REUSEPORT no está disponible en esta plataforma")
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+# True en los procesos trabajadores de serve_workers
+_in_server_worker = False
+
+def server_failed(message):
+    """
+    Informa de un error que detiene a un servidor.
+    
+    En un proceso trabajador de serve_workers además termina el proceso con
+    código 1: salir con 0 significaría una parada normal y el supervisor no
+    lo reiniciaría.
+    
+    Args:
+        message (str): Descripción del error
+    """
+    print(message)
+    if _in_server_worker:
+        sys.exit(1)
+
+def _run_server_worker(target, args, kwargs):
+    """Punto de entrada de cada proceso trabajador de serve_workers."""
+    global _in_server_worker
+    _in_server_worker = True
+    try:
+        server = target(*args, reuse_port=True, **kwargs)
+        if isinstance(target, type):
+            server.start()
+    except KeyboardInterrupt:
+        pass
+
+def serve_workers(target, args=(), kwargs=None, workers=2, min_uptime=1.0, max_failures=5):
+    """
+    Ejecuta un servidor en varios procesos que comparten el mismo puerto.
+    
+    Cada proceso trabajador crea su propio socket de escucha con
+    SO_REUSEPORT, de modo que el kernel reparte las conexiones entre ellos y
+    el servidor aprovecha varios núcleos en lugar de un solo GIL. El proceso
+    principal supervisa a los trabajadores: si uno termina con error o por
+    una señal, se reinicia. Si un trabajador falla repetidamente antes de
+    `min_uptime` segundos (por ejemplo, el puerto está ocupado), la espera
+    entre reinicios se duplica y tras `max_failures` intentos se abandona.
+    
+    Cada trabajador es un proceso independiente: los servidores con estado
+    compartido, como MessageServer, solo retransmiten entre los clientes
+    atendidos por el mismo trabajador.
+    
+    Args:
+        target: Clase de servidor (se instancia y se llama a start()) o
+            función servidora; debe aceptar el argumento `reuse_port`
+        args (tuple): Argumentos posicionales para target
+        kwargs (dict): Argumentos con nombre para target
+        workers (int): Número de procesos trabajadores
+        min_uptime (float): Segundos de vida por debajo de los cuales una
+            caída cuenta como fallo de arranque
+        max_failures (int): Fallos de arranque seguidos tolerados por trabajador
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        print("SO_REUSEPORT no está disponible en esta plataforma; use un solo proceso")
+        return
+    
+    kwargs = kwargs or {}
+    name = getattr(target, "__name__", str(target))
+    
+    def spawn():
+        process = multiprocessing.Process(target=_run_server_worker,
+                                          args=(target, args, kwargs), daemon=True)
+        process.start()
+        return process
+    
+    # Por cada trabajador: proceso, instante de arranque, fallos de arranque
+    # seguidos e instante del reinicio programado (None si no hay ninguno)
+    slots = [[spawn(), time.monotonic(), 0, None] for _ in range(workers)]
+    print(f"Supervisor {os.getpid()}: {workers} procesos de {name} "
+          f"({', '.join(str(slot[0].pid) for slot in slots)})")
+    
+    try:
+        while any(slot[0] is not None or slot[3] is not None for slot in slots):
+            # Esperar a que termine un trabajador o toque el próximo reinicio,
+            # sin dejar de vigilar a los demás mientras tanto
+            now = time.monotonic()
+            timeout = min([1.0] + [max(0.0, slot[3] - now) for slot in slots
+                                   if slot[3] is not None])
+            sentinels = [slot[0].sentinel for slot in slots if slot[0] is not None]
+            if sentinels:
+                multiprocessing.connection.wait(sentinels, timeout=timeout)
+            else:
+                time.sleep(timeout)
+            
+            for slot in slots:
+                process, started, failures, restart_at = slot
+                if process is None:
+                    if restart_at is not None and time.monotonic() >= restart_at:
+                        slot[:] = [spawn(), time.monotonic(), failures, None]
+                    continue
+                if process.is_alive():
+                    continue
+                
+                process.join()
+                if process.exitcode == 0:
+                    # Terminó por sí mismo (por ejemplo, Ctrl+C): no se reinicia
+                    slot[0] = None
+                    continue
+                
+                uptime = time.monotonic() - started
+                failures = failures + 1 if uptime < min_uptime else 1
+                if failures > max_failures:
+                    print(f"Trabajador {process.pid} falla al arrancar; se abandona")
+                    slot[0] = None
+                    continue
+                
+                delay = min(min_uptime * 2 ** (failures - 1), 30.0) if uptime < min_uptime else 0
+                print(f"Trabajador {process.pid} terminó con código {process.exitcode}; "
+                      f"reiniciando{f' en {delay:.0f} s' if delay else ''}")
+                if delay:
+                    slot[:] = [None, started, failures, time.monotonic() + delay]
+                else:
+                    slot[:] = [spawn(), time.monotonic(), failures, None]
+    
+    except KeyboardInterrupt:
+        # Los trabajadores reciben la misma señal y se detienen por su cuenta
+        print("\nDeteniendo trabajadores...")
+    finally:
+        for slot in slots:
+            if slot[0] is not None:
+                slot[0].join(timeout=5)
+                if slot[0].is_alive():
+                    slot[0].terminate()
 
 # =============================================================================
 # HERRAMIENTAS DE DIAGNÓSTICO Y TESTING
 # =============================================================================
 
-def network_diagnostics():
+def network_diagnostics(deadline=3.0):
     """
     Ejecuta diagnósticos básicos de red para verificar la conectividad.
     
     Útil para troubleshooting cuando los ejercicios no funcionan como esperado.
+    Todas las pruebas se lanzan a la vez en un pool de hilos bajo un único
+    plazo global, de modo que el diagnóstico completo tarda lo que la prueba
+    más lenta (como mucho `deadline`) y no la suma de todas.
+    
+    Args:
+        deadline (float): Plazo global en segundos para todas las pruebas
     """
     print("\n=== DIAGNÓSTICOS DE RED ===")
     
@@ -1044,22 +5121,49 @@ def network_diagnostics():
         ("localhost", 22, "SSH (si disponible)")
     ]
     
+    # Puertos locales comunes para pruebas
+    suggested_ports = [8000, 8080, 9000, 9001, 1313, 1307]
+    
+    probes = [(host, port) for host, port, _ in test_hosts]
+    probes += [("localhost", port) for port in suggested_ports]
+    
+    started = time.perf_counter()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(probes))
+    futures = {
+        probe: executor.submit(probe_connection, probe[0], probe[1], deadline)
+        for probe in probes
+    }
+    concurrent.futures.wait(futures.values(), timeout=deadline)
+    # No esperar a las pruebas que sigan bloqueadas (por ejemplo, en DNS)
+    executor.shutdown(wait=False, cancel_futures=True)
+    
+    def outcome(probe):
+        future = futures[probe]
+        if not future.done() or future.cancelled():
+            return None, None
+        return future.result()
+    
     print("\nPruebas de conectividad:")
     for host, port, service in test_hosts:
-        if test_connection(host, port, timeout=3):
-            print(f"  ✓ {host}:{port} ({service}) - CONECTADO")
+        connected, latency = outcome((host, port))
+        if connected:
+            print(f"  ✓ {host}:{port} ({service}) - CONECTADO ({latency * 1000:.1f} ms)")
+        elif connected is None:
+            print(f"  ✗ {host}:{port} ({service}) - SIN RESPUESTA (plazo agotado)")
         else:
             print(f"  ✗ {host}:{port} ({service}) - NO DISPONIBLE")
     
-    # Puertos locales comunes para pruebas
     print(f"\nPuertos locales sugeridos para pruebas:")
-    suggested_ports = [8000, 8080, 9000, 9001, 1313, 1307]
-    
     for port in suggested_ports:
-        if test_connection("localhost", port, timeout=1):
-            print(f"  Puerto {port}: EN USO")
+        connected, latency = outcome(("localhost", port))
+        if connected:
+            print(f"  Puerto {port}: EN USO ({latency * 1000:.1f} ms)")
+        elif connected is None:
+            print(f"  Puerto {port}: SIN RESPUESTA (plazo agotado)")
         else:
             print(f"  Puerto {port}: DISPONIBLE")
+    
+    print(f"\nDiagnóstico completado en {time.perf_counter() - started:.2f} s")
 
 def run_demo_suite():
     """
@@ -1316,6 +5420,46 @@ EJEMPLOS DE USO TÍPICOS:
 # FUNCIÓN PRINCIPAL
 # =============================================================================
 
+def parse_cli_options(argv, flags=()):
+    """
+    Separa los argumentos posicionales de las opciones con formato --nombre valor.
+    
+    Los guiones del nombre se convierten en guiones bajos (--max-workers pasa
+    a ser max_workers). También se acepta la forma --nombre=valor.
+    
+    Args:
+        argv (list): Argumentos a procesar (sin el nombre del script ni el comando)
+        flags (tuple): Nombres de opciones booleanas que no llevan valor
+    
+    Returns:
+        tuple: (lista de argumentos posicionales, dict de opciones)
+    """
+    positional = []
+    options = {}
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        
+        if arg.startswith("--"):
+            name = arg[2:]
+            if "=" in name:
+                name, value = name.split("=", 1)
+            elif name.replace("-", "_") in flags:
+                value = True
+            elif i + 1 < len(argv):
+                value = argv[i + 1]
+                i += 1
+            else:
+                value = True
+            options[name.replace("-", "_")] = value
+        else:
+            positional.append(arg)
+        
+        i += 1
+    
+    return positional, options
+
 def main():
     """
     Función principal que inicia la aplicación.
@@ -1326,36 +5470,195 @@ def main():
     if len(sys.argv) > 1:
         # Modo línea de comandos
         command = sys.argv[1].lower()
+        args, options = parse_cli_options(sys.argv[2:], flags=("adaptive", "jsonl", "banners", "incremental"))
+        workers = int(options.get("workers", 1))
+        pool_options = {}
+        if "max_workers" in options:
+            pool_options = {"max_workers": int(options["max_workers"]),
+                            "queue_size": int(options.get("accept_queue", 64)),
+                            "overload": options.get("overload", "reject")}
+            if pool_options["max_workers"] < 1 or pool_options["queue_size"] < 1:
+                print("Error: --max-workers y --accept-queue deben ser al menos 1",
+                      file=sys.stderr)
+                return
+        if "log_level" in options:
+            level = options["log_level"].lower()
+            if level not in ServerLog.LEVELS:
+                print(f"Error: nivel de registro desconocido '{options['log_level']}' "
+                      f"(válidos: {', '.join(ServerLog.LEVELS)})", file=sys.stderr)
+                return
+            server_log.level = ServerLog.LEVELS[level]
+        if "log_rate" in options:
+            server_log.set_rate("conexiones", int(options["log_rate"]))
+            server_log.set_rate("mensajes", int(options["log_rate"]))
+        
+        if command == "scan" and len(args) >= 1:
+            host = args[0]
+            start = int(args[1]) if len(args) > 1 else 1
+            end = int(args[2]) if len(args) > 2 else 1024
+            concurrency = int(options["concurrency"]) if "concurrency" in options else None
+            adaptive = bool(options.get("adaptive"))
+            retries = int(options.get("retries", 2))
+            banner_bytes = int(options.get("banner_bytes", 256 if options.get("banners") else 0))
+            rate = float(options["rate"]) if "rate" in options else None
+            burst = int(options["burst"]) if "burst" in options else None
+            
+            multi_target = "processes" in options or any(c in host for c in "/,@")
+            if options.get("incremental") or multi_target:
+                try:
+                    targets = expand_targets([host])
+                except (ValueError, OSError) as e:
+                    print(f"Error: objetivo no válido '{host}': {e}", file=sys.stderr)
+                    print("Uso: python sockets_tcp.py scan <host|red/CIDR|h1,h2|@archivo> "
+                          "[inicio] [fin]", file=sys.stderr)
+                    return
+            
+            if options.get("incremental"):
+                # Con caché: solo se reescanea lo vencido o abierto y se reportan cambios.
+                # El archivo se lee una vez y se escribe una vez para todos los hosts
+                cache = ScanCache(options.get("cache_file", "scan_cache.json"),
+                                  float(options.get("ttl", 3600)))
+                try:
+                    for target in targets:
+                        incremental_scan(target, start, end, concurrency=concurrency or 500,
+                                         adaptive=adaptive, retries=retries,
+                                         rate=rate, burst=burst, cache=cache)
+                finally:
+                    cache.save()
+            # Redes CIDR, listas de hosts o @archivo se reparten en un pool de procesos
+            elif multi_target:
+                processes = int(options["processes"]) if "processes" in options else None
+                scan_hosts(targets, start, end, concurrency=concurrency or 500,
+                           processes=processes, adaptive=adaptive, retries=retries,
+                           jsonl=bool(options.get("jsonl")), banner_bytes=banner_bytes,
+                           rate=rate, burst=burst)
+            elif options.get("jsonl"):
+                # Un resultado JSON por línea en cuanto se descubre cada puerto
+                try:
+                    for result in iter_open_ports(host, start, end,
+                                                  concurrency=concurrency or 500,
+                                                  adaptive=adaptive, retries=retries,
+                                                  banner_bytes=banner_bytes,
+                                                  rate=rate, burst=burst):
+                        print(result.to_json(), flush=True)
+                except socket.gaierror:
+                    print(f"Error: No se pudo resolver el host {host}", file=sys.stderr)
+            else:
+                scan_ports(host, start, end, concurrency=concurrency,
+                           adaptive=adaptive, retries=retries, banner_bytes=banner_bytes,
+                           rate=rate, burst=burst)
+        
+        elif command == "probe" and len(args) >= 1:
+            # Destinos como <host> <puerto> o como varios host:puerto
+            if len(args) == 2 and args[1].isdigit():
+                targets = [(args[0], int(args[1]))]
+            else:
+                targets = [(target.rsplit(":", 1)[0].strip("[]"), int(target.rsplit(":", 1)[1]))
+                           for target in args]
+            for host, port in targets:
+                latency_probe(host, port, count=int(options.get("count", 10)),
+                              timeout=float(options.get("timeout", 5)))
         
-        if command == "scan" and len(sys.argv) >= 3:
-            host = sys.argv[2]
-            start = int(sys.argv[3]) if len(sys.argv) > 3 else 1
-            end = int(sys.argv[4]) if len(sys.argv) > 4 else 1024
-            scan_ports(host, start, end)
+        elif command == "loadtest" and len(args) >= 2:
+            duration = float(options["duration"]) if "duration" in options else None
+            default_connections = None if duration else 1000
+            connections = int(options.get("connections", 0)) or default_connections
+            load_test(args[0], int(args[1]), connections=connections,
+                      concurrency=int(options.get("concurrency", 50)),
+                      duration=duration, timeout=float(options.get("timeout", 5)))
         
-        elif command == "daytime" and len(sys.argv) >= 3:
-            host = sys.argv[2]
-            port = int(sys.argv[3]) if len(sys.argv) > 3 else 13
+        elif command == "daytime" and len(args) >= 1:
+            host = args[0]
+            port = int(args[1]) if len(args) > 1 else 13
             daytime_client(host, port)
         
-        elif command == "echo" and len(sys.argv) >= 3:
-            host = sys.argv[2]
-            port = int(sys.argv[3]) if len(sys.argv) > 3 else 7
-            echo_client(host, port)
+        elif command == "echo" and len(args) >= 1:
+            host = args[0]
+            port = int(args[1]) if len(args) > 1 else 7
+            depth = int(options.get("depth", 16))
+            if "file" in options:
+                with open(options["file"], "rb") as messages:
+                    echo_client(host, port, messages=messages, depth=depth)
+            elif "count" in options:
+                messages = echo_messages(int(options["count"]), int(options.get("size", 64)))
+                echo_client(host, port, messages=messages, depth=depth)
+            else:
+                echo_client(host, port)
         
-        elif command == "server" and len(sys.argv) >= 3:
-            port = int(sys.argv[2])
-            basic_server(port)
+        elif command == "server" and len(args) >= 1:
+            port = int(args[0])
+            if workers > 1:
+                serve_workers(basic_server, (port,), workers=workers)
+            else:
+                basic_server(port)
         
-        elif command == "msgserver" and len(sys.argv) >= 3:
-            port = int(sys.argv[2])
-            server = MessageServer(port)
-            server.start()
+        elif command == "msgserver" and len(args) >= 1:
+            port = int(args[0])
+            outbox_options = {"outbox_size": int(options.get("outbox_size", 256)),
+                              "slow_policy": options.get("slow_policy", "drop_oldest"),
+                              "block_ms": float(options.get("block_ms", 50)),
+                              "framing": options.get("framing", "line"),
+                              "history": int(options.get("history", 256))}
+            if options.get("mode") == "asyncio":
+                server_class = AsyncMessageServer
+                server_options = {"slow_policy": outbox_options["slow_policy"],
+                                  "framing": outbox_options["framing"],
+                                  "history": outbox_options["history"]}
+                if "max_clients" in options:
+                    server_options["max_clients"] = int(options["max_clients"])
+            else:
+                server_class = MessageServer
+                server_options = {**pool_options, **outbox_options}
+            if workers > 1:
+                serve_workers(server_class, (port,), server_options, workers=workers)
+            else:
+                server = server_class(port, **server_options)
+                server.start()
         
-        elif command == "fileserver" and len(sys.argv) >= 3:
-            port = int(sys.argv[2])
-            server = FileTransferServer(port)
-            server.start()
+        elif command == "msgclient" and len(args) >= 2:
+            framing = options.get("framing", "line")
+            if "file" in options:
+                with open(options["file"], encoding="utf-8") as messages:
+                    message_client(args[0], int(args[1]), framing=framing, messages=messages)
+            else:
+                message_client(args[0], int(args[1]), framing=framing,
+                               reconnect_attempts=int(options.get("reconnect", 5)))
+        
+        elif command == "msgswarm" and len(args) >= 2:
+            message_swarm(args[0], int(args[1]), clients=int(options.get("clients", 10000)),
+                          framing=options.get("framing", "line"))
+        
+        elif command == "fanoutbench":
+            broadcast_benchmark(clients=int(options.get("clients", 100)),
+                                messages=int(options.get("messages", 2000)),
+                                size=int(options.get("size", 64)),
+                                batch=int(options.get("batch", 16)))
+        
+        elif command == "fileserver" and len(args) >= 1:
+            port = int(args[0])
+            if workers > 1:
+                serve_workers(FileTransferServer, (port,), pool_options, workers=workers)
+            else:
+                server = FileTransferServer(port, **pool_options)
+                server.start()
+        
+        elif command == "daytimeserver":
+            port = int(args[0]) if args else 1313
+            mode = options.get("mode", "threaded")
+            if workers > 1:
+                serve_workers(LocalDaytimeServer, (port, mode), pool_options, workers=workers)
+            else:
+                server = LocalDaytimeServer(port, mode=mode, **pool_options)
+                server.start()
+        
+        elif command == "echoserver":
+            port = int(args[0]) if args else 1307
+            mode = options.get("mode", "threaded")
+            if workers > 1:
+                serve_workers(LocalEchoServer, (port, mode), pool_options, workers=workers)
+            else:
+                server = LocalEchoServer(port, mode=mode, **pool_options)
+                server.start()
         
         elif command == "demo":
             run_demo_suite()
@@ -1363,13 +5666,49 @@ def main():
         elif command == "help":
             print("Uso:")
             print("  python sockets_tcp.py                    - Menú interactivo")
-            print("  python sockets_tcp.py scan <host>        - Escanear puertos")
+            print("  python sockets_tcp.py scan <host> [inicio] [fin] [--concurrency N]")
+            print("                           [--adaptive] [--retries N] [--processes N] [--jsonl]")
+            print("                           [--banners] [--banner-bytes N] [--rate N] [--burst N]")
+            print("                           [--incremental] [--cache-file RUTA] [--ttl S]")
+            print("                                           - Escanear puertos (<host> admite")
+            print("                                             CIDR, listas a,b,c y @archivo)")
+            print("  python sockets_tcp.py probe <host> <puerto> [--count N]")
+            print("  python sockets_tcp.py probe <host:puerto> ... [--count N]")
+            print("                                           - Percentiles de latencia")
+            print("  python sockets_tcp.py loadtest <host> <puerto> [--connections N]")
+            print("                           [--concurrency C] [--duration S]")
+            print("                                           - Prueba de carga")
             print("  python sockets_tcp.py daytime <host>     - Cliente daytime")
             print("  python sockets_tcp.py echo <host>        - Cliente echo")
+            print("  python sockets_tcp.py echo <host> <puerto> --file RUTA | --count N [--size B]")
+            print("                           [--depth D]     - Benchmark echo en pipeline")
             print("  python sockets_tcp.py server <puerto>    - Servidor básico")
             print("  python sockets_tcp.py msgserver <puerto> - Servidor mensajería")
+            print("                           [--outbox-size N] [--block-ms MS]")
+            print("                           [--slow-policy drop_oldest|drop_client|block]")
+            print("                           [--framing line|length]")
+            print("                           [--mode threaded|asyncio] [--max-clients N]")
+            print("                           [--history N]")
+            print("  python sockets_tcp.py msgclient <host> <puerto> [--framing line|length]")
+            print("                           [--file RUTA] [--reconnect N] - Cliente mensajería")
+            print("  python sockets_tcp.py msgswarm <host> <puerto> [--clients N]")
+            print("                           [--framing line|length] - Prueba con N clientes")
+            print("  python sockets_tcp.py fanoutbench [--clients N] [--messages M] [--size B]")
+            print("                           [--batch K]     - Costo de la difusión por mensaje")
             print("  python sockets_tcp.py fileserver <puerto> - Servidor archivos")
+            print("  python sockets_tcp.py daytimeserver [puerto] [--mode threaded|selector]")
+            print("                                           - Servidor Daytime local")
+            print("  python sockets_tcp.py echoserver [puerto] [--mode threaded|selector]")
+            print("                                           - Servidor Echo local")
             print("  python sockets_tcp.py demo               - Demo automatizada")
+            print("")
+            print("  Los servidores admiten --workers N: N procesos comparten el puerto")
+            print("  con SO_REUSEPORT y los que fallan se reinician.")
+            print("  --log-level debug|info|warning|error y --log-rate N (mensajes por")
+            print("  segundo por tipo de evento) controlan el registro de los servidores.")
+            print("  msgserver, fileserver, daytimeserver y echoserver admiten --max-workers N")
+            print("  [--accept-queue Q] [--overload reject|delay]: pool acotado de N hilos")
+            print("  con cola de Q conexiones en lugar de un hilo por cliente.")
         
         else:
             print("Comando no reconocido. Use 'help' para ver opciones.")
@@ -11,14 +11,317 @@ Este módulo implementa todas las funcionalidades presentadas en el documento:
 """
 
 import socket
+import ipaddress
 import sys
 import json
 import threading
 import time
+import queue
+import atexit
 from typing import Optional, Tuple, Any
 from dataclasses import dataclass, asdict
 
 
+# =============================================================================
+# REGISTRO ASÍNCRONO
+# =============================================================================
+
+class RegistroAsincrono:
+    """
+    Registro de eventos con un hilo escritor en segundo plano.
+    
+    Imprimir cada datagrama con print() hace que la consola limite el ritmo
+    del servidor. Aquí el hilo que recibe solo comprueba el nivel, aplica el
+    límite por segundo de la clave del evento y encola el mensaje sin
+    formatear; el hilo escritor lo formatea y escribe por lotes. Si la cola
+    acotada se llena, los mensajes se descartan y se cuentan. El resumen de
+    los mensajes omitidos por una clave lo emite el hilo escritor al cerrarse
+    la ventana, aunque no lleguen más eventos de esa clave.
+    """
+    
+    DEPURACION, INFO, AVISO, ERROR = 10, 20, 30, 40
+    NIVELES = {"depuracion": DEPURACION, "info": INFO, "aviso": AVISO, "error": ERROR}
+    PREFIJOS = {AVISO: "AVISO: ", ERROR: "ERROR: "}
+    LOTE = 512  # Mensajes escritos como máximo por llamada a write
+    
+    def __init__(self, nivel: int = INFO, max_cola: int = 10000, salida=None):
+        """
+        Constructor del registro.
+        
+        Args:
+            nivel: Nivel mínimo de los mensajes registrados
+            max_cola: Mensajes pendientes como máximo
+            salida: Destino de escritura (por defecto sys.stdout)
+        """
+        self.nivel = nivel
+        self.salida = salida
+        self.descartados = 0
+        self._cola = queue.Queue(maxsize=max_cola)
+        self._limites = {}  # clave -> [máximo por segundo, inicio de ventana, emitidos, omitidos]
+        self._lock_limites = threading.Lock()
+        self._hilo = None
+        self._lock = threading.Lock()
+    
+    def fijar_limite(self, clave: str, por_segundo: Optional[int]):
+        """
+        Limita los mensajes de una clave de evento a `por_segundo` por segundo.
+        
+        Args:
+            clave: Clave de evento (por ejemplo "datagramas")
+            por_segundo: Máximo de mensajes por segundo (None = sin límite)
+        """
+        with self._lock_limites:
+            if por_segundo is None:
+                self._limites.pop(clave, None)
+            else:
+                self._limites[clave] = [por_segundo, 0.0, 0, 0]
+    
+    def habilitado(self, nivel: int) -> bool:
+        """Indica si se registran los mensajes de `nivel`."""
+        return nivel >= self.nivel
+    
+    def registrar(self, nivel: int, mensaje: str, *args, clave: Optional[str] = None):
+        """
+        Encola un mensaje; `mensaje % args` se evalúa en el hilo escritor.
+        
+        Args:
+            nivel: Nivel del mensaje
+            mensaje: Mensaje o plantilla con formato %
+            *args: Argumentos de la plantilla
+            clave: Clave de evento para aplicar su límite por segundo
+        """
+        if nivel < self.nivel:
+            return
+        
+        if clave is not None and self._limites:
+            resumen = None
+            omitido = False
+            with self._lock_limites:
+                limite = self._limites.get(clave)
+                if limite is not None:
+                    ahora = time.monotonic()
+                    if ahora - limite[1] >= 1.0:
+                        resumen = self._cerrar_ventana(clave, limite, ahora)
+                    if limite[2] >= limite[0]:
+                        limite[3] += 1
+                        omitido = True
+                    else:
+                        limite[2] += 1
+            if resumen:
+                self._encolar(resumen)
+            if omitido:
+                return
+        
+        self._encolar((nivel, mensaje, args))
+    
+    def depuracion(self, mensaje: str, *args, clave: Optional[str] = None):
+        self.registrar(self.DEPURACION, mensaje, *args, clave=clave)
+    
+    def info(self, mensaje: str, *args, clave: Optional[str] = None):
+        self.registrar(self.INFO, mensaje, *args, clave=clave)
+    
+    def aviso(self, mensaje: str, *args, clave: Optional[str] = None):
+        self.registrar(self.AVISO, mensaje, *args, clave=clave)
+    
+    def error(self, mensaje: str, *args, clave: Optional[str] = None):
+        self.registrar(self.ERROR, mensaje, *args, clave=clave)
+    
+    def cerrar(self, timeout: float = 2.0):
+        """Escribe los mensajes pendientes y detiene el hilo escritor."""
+        if self._hilo is None:
+            return
+        try:
+            self._cola.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._hilo.join(timeout)
+        self._hilo = None
+    
+    def _cerrar_ventana(self, clave: str, limite: list, ahora: float):
+        """Abre una ventana nueva para `clave` y devuelve el resumen de la anterior (con el lock tomado)."""
+        omitidos = limite[3]
+        limite[1], limite[2], limite[3] = ahora, 0, 0
+        if omitidos:
+            return (self.INFO, "[%s] %d mensajes omitidos en el último segundo", (clave, omitidos))
+        return None
+    
+    def _resumenes_vencidos(self) -> list:
+        """Resúmenes de las ventanas vencidas con mensajes omitidos."""
+        ahora = time.monotonic()
+        with self._lock_limites:
+            return [self._cerrar_ventana(clave, limite, ahora) for clave, limite in self._limites.items()
+                    if limite[3] and ahora - limite[1] >= 1.0]
+    
+    def _encolar(self, elemento):
+        if self._hilo is None:
+            with self._lock:
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._escritor, daemon=True)
+                    self._hilo.start()
+        try:
+            self._cola.put_nowait(elemento)
+        except queue.Full:
+            self.descartados += 1
+    
+    def _escritor(self):
+        """Hilo escritor: formatea y escribe los mensajes en lotes."""
+        while True:
+            # La espera se corta cada segundo para emitir los resúmenes de
+            # claves limitadas que no han vuelto a registrar nada
+            try:
+                lote = [self._cola.get(timeout=1.0)]
+            except queue.Empty:
+                lote = []
+            lote.extend(self._resumenes_vencidos())
+            while len(lote) < self.LOTE:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            
+            lineas = []
+            detener = False
+            for elemento in lote:
+                if elemento is None:
+                    detener = True
+                    continue
+                nivel, mensaje, args = elemento
+                try:
+                    texto = mensaje % args if args else mensaje
+                except (TypeError, ValueError):
+                    texto = f"{mensaje} {args!r}"
+                lineas.append(self.PREFIJOS.get(nivel, "") + texto)
+            
+            if self.descartados:
+                descartados, self.descartados = self.descartados, 0
+                lineas.append(f"[registro] {descartados} mensajes descartados (cola llena)")
+            
+            if lineas:
+                salida = self.salida or sys.stdout
+                try:
+                    salida.write("\n".join(lineas) + "\n")
+                    salida.flush()
+                except (OSError, ValueError):
+                    pass  # Salida cerrada: no interrumpir al servidor
+            if detener:
+                return
+
+
+# Registro único del proceso, usado por SocketUDP y los servidores
+registro = RegistroAsincrono()
+registro.fijar_limite("datagramas", 20)
+registro.fijar_limite("mensajes", 20)
+atexit.register(registro.cerrar)
+
+
+# =============================================================================
+# CACHÉ DE RESOLUCIÓN DNS
+# =============================================================================
+
+class CacheDNS:
+    """
+    Caché de resolución de nombres compartida por todo el proceso.
+    
+    Evita consultar el DNS en cada datagrama enviado: guarda las direcciones
+    resueltas durante `ttl` segundos y los nombres inexistentes (caché
+    negativa) durante `ttl_negativo`. Los fallos transitorios (EAI_AGAIN) no
+    se guardan y las IP literales no pasan por la caché. Es segura para hilos.
+    """
+    
+    # Errores que significan "el nombre no existe"; el resto puede ser transitorio
+    ERRORES_NEGATIVOS = tuple(getattr(socket, nombre) for nombre in ("EAI_NONAME", "EAI_NODATA")
+                              if hasattr(socket, nombre))
+    
+    def __init__(self, ttl: float = 300, ttl_negativo: float = 30, max_entradas: int = 1024):
+        """
+        Constructor de la caché.
+        
+        Args:
+            ttl: Vigencia de una resolución exitosa en segundos
+            ttl_negativo: Vigencia de un fallo de resolución en segundos
+            max_entradas: Entradas guardadas como máximo; al llenarse se
+                descartan las vencidas y, si no basta, las más antiguas
+        """
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.max_entradas = max_entradas
+        self._entradas = {}  # (host, familia) -> (vencimiento, dirección IP o args del error)
+        self._lock = threading.Lock()
+    
+    def resolver(self, host: str, puerto: int, familia=socket.AF_INET) -> Tuple[str, int]:
+        """
+        Resuelve un host a una dirección (ip, puerto) usando la caché.
+        
+        Raises:
+            socket.gaierror: Si el host no se puede resolver (también desde caché)
+        """
+        clave = (host, familia)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+        
+        if entrada and entrada[0] > time.monotonic():
+            resultado = entrada[1]
+        else:
+            try:
+                info = socket.getaddrinfo(host, None, familia, socket.SOCK_DGRAM)
+                resultado = info[0][4][0]
+                vencimiento = time.monotonic() + self.ttl
+                guardar = not self._es_literal(host)
+            except socket.gaierror as e:
+                resultado = e.args
+                vencimiento = time.monotonic() + self.ttl_negativo
+                guardar = e.errno in self.ERRORES_NEGATIVOS
+            if guardar:
+                with self._lock:
+                    self._entradas.pop(clave, None)
+                    if len(self._entradas) >= self.max_entradas:
+                        self._liberar_espacio()
+                    self._entradas[clave] = (vencimiento, resultado)
+        
+        if isinstance(resultado, tuple):
+            raise socket.gaierror(*resultado)
+        return resultado, puerto
+    
+    def _liberar_espacio(self):
+        """Descarta las entradas vencidas y, si no basta, la más antigua (con el lock tomado)."""
+        ahora = time.monotonic()
+        for clave in [clave for clave, entrada in self._entradas.items() if entrada[0] <= ahora]:
+            del self._entradas[clave]
+        if len(self._entradas) >= self.max_entradas:
+            del self._entradas[next(iter(self._entradas))]
+    
+    @staticmethod
+    def _es_literal(host: str) -> bool:
+        """Indica si el host es una dirección IP escrita literalmente."""
+        try:
+            ipaddress.ip_address(host)
+            return True
+        except ValueError:
+            return False
+    
+    def precargar(self, hosts, familia=socket.AF_INET) -> threading.Thread:
+        """
+        Resuelve una lista de hosts en segundo plano para calentar la caché.
+        
+        Returns:
+            Hilo de resolución (ya iniciado)
+        """
+        def ejecutar():
+            for host in hosts:
+                try:
+                    self.resolver(host, 0, familia)
+                except socket.gaierror:
+                    pass  # El fallo queda en la caché negativa
+        
+        hilo = threading.Thread(target=ejecutar, daemon=True)
+        hilo.start()
+        return hilo
+
+
+# Caché DNS única del proceso, usada por SocketUDP
+cache_dns = CacheDNS()
+
+
 # =============================================================================
 # CLASE MENSAJE (Ejercicio F)
 # =============================================================================
@@ -175,9 +478,10 @@ class SocketUDP:
             paquete: PaqueteUDP a enviar
         """
         try:
-            direccion_destino = (paquete.direccion, paquete.puerto)
+            direccion_destino = cache_dns.resolver(paquete.direccion, paquete.puerto)
             bytes_enviados = self._socket.sendto(paquete.datos[:paquete.longitud], direccion_destino)
-            print(f"Enviados {bytes_enviados} bytes a {direccion_destino}")
+            registro.info("Enviados %d bytes a %s", bytes_enviados, direccion_destino,
+                          clave="datagramas")
             return bytes_enviados
         except Exception as e:
             raise ConnectionError(f"Error al enviar paquete: {e}")
@@ -204,7 +508,8 @@ class SocketUDP:
                 puerto=puerto_origen
             )
             
-            print(f"Recibidos {len(datos)} bytes desde {direccion_origen}")
+            registro.info("Recibidos %d bytes desde %s", len(datos), direccion_origen,
+                          clave="datagramas")
             return paquete_recibido
             
         except Exception as e:
@@ -361,14 +666,16 @@ def ejercicio_e():
                 # Convertir datos a string
                 mensaje = paquete_recibido.datos.decode('utf-8', errors='ignore')
                 
-                print(f"\n--- Mensaje Recibido ---")
-                print(f"Desde: {paquete_recibido.direccion}:{paquete_recibido.puerto}")
-                print(f"Contenido: {mensaje}")
-                print(f"Longitud: {paquete_recibido.longitud} bytes")
-                print("------------------------")
+                registro.info("\n--- Mensaje Recibido ---\n"
+                              "Desde: %s:%s\n"
+                              "Contenido: %s\n"
+                              "Longitud: %d bytes\n"
+                              "------------------------",
+                              paquete_recibido.direccion, paquete_recibido.puerto,
+                              mensaje, paquete_recibido.longitud, clave="mensajes")
                 
             except socket.timeout:
-                print("Timeout - Sin mensajes recibidos")
+                registro.info("Timeout - Sin mensajes recibidos")
                 continue
                 
     except KeyboardInterrupt:
@@ -455,26 +762,23 @@ def servidor_mensajes():
                 # Deserializar mensaje
                 mensaje = Mensaje.from_array_bytes(paquete_recibido.datos)
                 
-                # Mostrar mensaje formateado
+                # Mostrar mensaje formateado (la plantilla se aplica en el hilo escritor)
                 timestamp_legible = time.strftime('%Y-%m-%d %H:%M:%S', 
                                                  time.localtime(mensaje.timestamp))
-                
-                print(f"\n{'='*50}")
-                print(f"MENSAJE RECIBIDO")
-                print(f"{'='*50}")
-                print(f"De: {mensaje.remitente}")
-                print(f"Fecha: {timestamp_legible}")
-                print(f"Tipo: {mensaje.tipo}")
-                print(f"Contenido: {mensaje.contenido}")
-                print(f"Origen: {paquete_recibido.direccion}:{paquete_recibido.puerto}")
-                print(f"{'='*50}\n")
+                separador = '=' * 50
+                registro.info("\n%s\nMENSAJE RECIBIDO\n%s\n"
+                              "De: %s\nFecha: %s\nTipo: %s\nContenido: %s\nOrigen: %s:%s\n%s\n",
+                              separador, separador, mensaje.remitente,
+                              timestamp_legible, mensaje.tipo, mensaje.contenido,
+                              paquete_recibido.direccion, paquete_recibido.puerto, separador,
+                              clave="mensajes")
                 
             except socket.timeout:
                 continue
             except json.JSONDecodeError:
-                print("Mensaje recibido no es un objeto Mensaje válido")
+                registro.aviso("Mensaje recibido no es un objeto Mensaje válido", clave="mensajes")
             except Exception as e:
-                print(f"Error al procesar mensaje: {e}")
+                registro.error("Error al procesar mensaje: %s", e, clave="mensajes")
                 
     except KeyboardInterrupt:
         print("\nServidor detenido por el usuario")
@@ -536,6 +840,10 @@ def mostrar_ayuda():
     print("  demo                                 - Demostración de envío simple")
     print("  ayuda                                - Mostrar esta ayuda")
     print()
+    print("Opciones de registro (cualquier comando):")
+    print("  --nivel-log depuracion|info|aviso|error  - Nivel mínimo de los mensajes")
+    print("  --limite-log N                           - Mensajes por segundo por tipo de evento")
+    print()
     print("Ejemplos:")
     print("  python script.py ejercicio_a 127.0.0.1 8080 'Hola mundo'")
     print("  python script.py servidor    # En una terminal")
@@ -554,6 +862,30 @@ def main():
         mostrar_ayuda()
         return
     
+    # Opciones del registro: --nivel-log depuracion|info|aviso|error y --limite-log N
+    argumentos = []
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == "--nivel-log" and i + 1 < len(sys.argv):
+            nivel = sys.argv[i + 1].lower()
+            if nivel not in RegistroAsincrono.NIVELES:
+                print(f"Error: nivel de registro desconocido '{sys.argv[i + 1]}' "
+                      f"(válidos: {', '.join(RegistroAsincrono.NIVELES)})", file=sys.stderr)
+                return
+            registro.nivel = RegistroAsincrono.NIVELES[nivel]
+            i += 2
+        elif sys.argv[i] == "--limite-log" and i + 1 < len(sys.argv):
+            registro.fijar_limite("datagramas", int(sys.argv[i + 1]))
+            registro.fijar_limite("mensajes", int(sys.argv[i + 1]))
+            i += 2
+        else:
+            argumentos.append(sys.argv[i])
+            i += 1
+    sys.argv[1:] = argumentos
+    if not argumentos:
+        mostrar_ayuda()
+        return
+    
     comando = sys.argv[1].lower()
     
     if comando == "ejercicio_a":